@@ -0,0 +1,32 @@
+"""Gunicorn settings, also picked up by the tiangolo/uvicorn-gunicorn start script.
+
+``MODEL_PRELOAD=true`` makes the master import the app, and with it every
+model, before forking ``WEB_CONCURRENCY`` workers that share the weights
+copy-on-write.
+"""
+
+import os
+
+from src import config
+
+workers = config.get_int('WEB_CONCURRENCY', 1)
+worker_class = 'uvicorn.workers.UvicornWorker'
+bind = config.get_str('BIND', f"{config.get_str('HOST', '0.0.0.0')}:{config.get_str('PORT', '8000')}")
+timeout = config.get_int('TIMEOUT', 600)
+graceful_timeout = config.get_int('GRACEFUL_TIMEOUT', 120)
+keepalive = config.get_int('KEEP_ALIVE', 5)
+loglevel = config.get_str('LOG_LEVEL', 'info')
+
+preload_app = config.get_bool('MODEL_PRELOAD', False)
+
+if preload_app and config.get_str('INFERENCE_EXECUTOR', 'thread') != 'thread':
+    raise ValueError("MODEL_PRELOAD needs INFERENCE_EXECUTOR=thread: "
+                     "a process pool loads its own copy of every model")
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """Give every worker its own share of cores for torch intra-op threads."""
+    threads = config.get_int('TORCH_NUM_THREADS', max(1, (os.cpu_count() or 1) // workers))
+    # pylint: disable=import-outside-toplevel
+    import torch
+    torch.set_num_threads(threads)
@@ -5,19 +5,79 @@ This module handles all API requests.
 @Author: Karthick T. Sharma
 """
 
+import asyncio
+import logging
+
 from fastapi import FastAPI
 
 import pytesseract
 
-from src.routers.guest import public
+from src import config
+from src.model import artifacts
+
+# Chạy offline khi đã có kho mô hình cục bộ; phải đặt trước khi import transformers
+artifacts.enable_offline_mode()
+
+# pylint: disable=wrong-import-position
+from src.loaders.executor import run_on_every_inference_worker, shutdown_inference_executor
+from src.loaders.model import warm_up_models, preload_models
+from src.inferenceserver import get_inference_service, remote_inference
+from src.service.jobs import get_job_runner, shutdown_job_runner
+from src.service.ocr import shutdown_ocr_service
+from src.service.pdf_extraction import shutdown_pdf_extractor
+from src.service.uploads import UploadLimitMiddleware
+from src.middleware import bearer_uid
+from src.routers.auth import auth
+from src.routers.guest import public, monitor, health
 from src.routers.user import user
 
 # FastAPI setup
 app = FastAPI()
 
-# Chỉ định đường dẫn đến tệp thực thi Tesseract nếu không nằm trong PATH
-pytesseract.pytesseract.tesseract_cmd = r'C:\Users\Admin\AppData\Local\Programs\Tesseract-OCR\tesseract.exe'  # Đường dẫn dành cho Windows
-# Đối với Ubuntu hoặc macOS, bạn có thể bỏ qua dòng này nếu Tesseract đã được thêm vào PATH
+# Nạp sẵn mô hình trong tiến trình master của gunicorn để các worker dùng chung bộ nhớ
+if config.get_bool('MODEL_PRELOAD', False) and not remote_inference():
+    preload_models()
 
+# Chỉ định đường dẫn đến tệp thực thi Tesseract nếu không nằm trong PATH, ví dụ trên Windows
+# TESSERACT_CMD=C:\Users\Admin\AppData\Local\Programs\Tesseract-OCR\tesseract.exe
+# Đối với Ubuntu hoặc macOS, bạn có thể bỏ qua biến này nếu Tesseract đã được thêm vào PATH
+if config.get_str('TESSERACT_CMD', ''):
+    pytesseract.pytesseract.tesseract_cmd = config.get_str('TESSERACT_CMD', '')
+
+# Giới hạn dung lượng upload theo request, theo người dùng và toàn server trước khi đọc body
+app.add_middleware(UploadLimitMiddleware, identify=bearer_uid)
+
+app.include_router(health.router)
+app.include_router(auth.router)
 app.include_router(public.router)
-app.include_router(user.router)
\ No newline at end of file
+app.include_router(monitor.router)
+app.include_router(user.router)
+
+
+@app.on_event("startup")
+async def start_model_warm_up():
+    """Load and warm up models in the background; the app serves traffic meanwhile."""
+    # với INFERENCE_SOCKET, mô hình nằm trong inference daemon
+    if config.get_bool('MODEL_WARMUP', True) and not remote_inference():
+        # với INFERENCE_EXECUTOR=process, mỗi tiến trình worker tự nạp và làm nóng mô hình
+        app.state.warm_up = asyncio.ensure_future(run_on_every_inference_worker(warm_up_models))
+
+
+@app.on_event("startup")
+async def recover_jobs():
+    """Fail the generation jobs left queued or running by a process that died."""
+    try:
+        await get_job_runner().recover()
+    except Exception as err:  # pylint: disable=broad-except
+        logging.error(f"Could not recover abandoned generation jobs: {err}")
+
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    """Let running inference stages finish before the worker exits."""
+    await shutdown_job_runner()
+    if remote_inference():
+        await get_inference_service().close()
+    shutdown_inference_executor()
+    shutdown_pdf_extractor()
+    shutdown_ocr_service()
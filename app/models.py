@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, Date, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, Date, DateTime, JSON
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -70,6 +70,29 @@ class Rating(Base):
 
     question = relationship("Question", back_populates="ratings")
 
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+
+    id = Column(String(36), primary_key=True)  # uuid4 trả về cho client
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False,
+                     index=True)
+    kind = Column(String(20), nullable=False)  # pdf, image, paragraph
+    topic = Column(String(100), nullable=False)
+    # queued, running, succeeded, failed
+    status = Column(String(20), nullable=False, default="queued")
+    chunks_done = Column(Integer, nullable=False, default=0)
+    # tăng dần khi tài liệu còn đang được đọc
+    chunks_total = Column(Integer, nullable=False, default=0)
+    question_ids = Column(JSON, nullable=False, default=list)  # kết quả từng phần, đã commit
+    errors = Column(JSON, nullable=False, default=list)  # {'sentence', 'error'} của các đoạn lỗi
+    error = Column(Text, nullable=True)  # lỗi làm dừng cả job
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    owner = Column(String(100), nullable=True)  # host:pid của tiến trình chạy job
+    # tiến trình chủ gia hạn định kỳ; quá hạn nghĩa là tiến trình đã chết
+    heartbeat_at = Column(DateTime, nullable=True)
+
 # src/models/base.py
 from sqlalchemy import Column, DateTime, func
 
@@ -0,0 +1,120 @@
+"""Benchmark assisted (speculative) greedy decoding with a small draft model.
+
+Usage (from the ``app`` directory)::
+
+    python -m scripts.bench_assisted --draft google-t5/t5-small --repeat 3
+
+Runs greedy decoding of the summarizer (and the question generator, when its
+vocabulary matches the draft's) on the ~300 character chunks of
+``scripts/corpus.py``, once plainly and once with ``assistant_model``, and
+reports wall-clock speedup, the share of drafted tokens the main model
+accepted and whether both runs decoded the same text.
+"""
+
+import argparse
+import time
+
+from transformers import AutoTokenizer
+
+from src.model import artifacts
+from src.model.backends import load_seq2seq
+from src.model.decoding import get_profile, token_budget
+from scripts.corpus import CHUNKS, ANSWERS
+
+MODELS = {
+    'summarizer': ('google-t5/t5-base', 512, lambda i: f"summarize: {CHUNKS[i]}"),
+    'question_gen': ('iarfmoose/t5-base-question-generator', 72,
+                     lambda i: f"context: {CHUNKS[i]} answer: {ANSWERS[i]}"),
+}
+
+
+class ForwardCounter:
+    """Forward hook counting calls of a module."""
+
+    def __init__(self, module):
+        self.calls = 0
+        module.register_forward_hook(self)
+
+    def __call__(self, module, args, output):
+        self.calls += 1
+
+
+def decode(model, tokenizer, prompt, max_new_tokens, assistant=None):
+    """Greedily decode one prompt.
+
+    Returns:
+        tuple(str, int, float): text, new tokens and seconds.
+    """
+    encode = tokenizer([prompt], return_tensors='pt', max_length=382, truncation=True)
+    start = time.perf_counter()
+    output = model.generate(**encode, num_beams=1, no_repeat_ngram_size=2,
+                            max_new_tokens=max_new_tokens, assistant_model=assistant)
+    seconds = time.perf_counter() - start
+    # the first position is the decoder start token
+    return (tokenizer.decode(output[0], skip_special_tokens=True),
+            output.shape[1] - 1, seconds)
+
+
+def bench(name, draft_name, precision, repeat):
+    """Compare plain and assisted greedy decoding of one model.
+
+    Returns:
+        dict: timings, acceptance rate and agreement, None on vocabulary mismatch.
+    """
+    model_name, model_max_length, make_prompt = MODELS[name]
+    tokenizer = AutoTokenizer.from_pretrained(artifacts.resolve(model_name))
+    draft_tokenizer = AutoTokenizer.from_pretrained(artifacts.resolve(draft_name))
+    if tokenizer.get_vocab() != draft_tokenizer.get_vocab():
+        return None
+
+    model = load_seq2seq(model_name, 'torch', precision)
+    draft = load_seq2seq(draft_name, 'torch', precision)
+    model_calls, draft_calls = ForwardCounter(model), ForwardCounter(draft)
+
+    ratio = get_profile('fast')['length_ratio']
+    prompts = [make_prompt(i) for i in range(len(CHUNKS))]
+    budgets = [token_budget(len(tokenizer(p).input_ids), ratio, 8, model_max_length, step=8)
+               for p in prompts]
+    decode(model, tokenizer, prompts[0], budgets[0])  # warm-up
+
+    report = {'plain': float('inf'), 'assisted': float('inf')}
+    for _ in range(repeat):
+        plain = [decode(model, tokenizer, p, b) for p, b in zip(prompts, budgets)]
+        report['plain'] = min(report['plain'], sum(r[2] for r in plain))
+
+        model_calls.calls = draft_calls.calls = 0
+        assisted = [decode(model, tokenizer, p, b, draft) for p, b in zip(prompts, budgets)]
+        report['assisted'] = min(report['assisted'], sum(r[2] for r in assisted))
+
+    # every verification pass keeps the accepted draft tokens plus one of its own
+    new_tokens = sum(r[1] for r in assisted)
+    accepted = new_tokens - model_calls.calls
+    report['acceptance'] = accepted / draft_calls.calls if draft_calls.calls else 0.0
+    report['tokens_per_pass'] = new_tokens / model_calls.calls
+    report['agreement'] = sum(a[0] == p[0] for a, p in zip(assisted, plain)) / len(prompts)
+    return report
+
+
+def main():
+    """Benchmark every model and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--draft', default='google-t5/t5-small')
+    parser.add_argument('--precision', default='fp32')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--models', nargs='+', default=list(MODELS), choices=list(MODELS))
+    args = parser.parse_args()
+
+    print(f"{'model':<14} {'plain s':>8} {'assisted s':>10} {'speedup':>8} "
+          f"{'accepted':>9} {'tok/pass':>9} {'same text':>10}")
+    for name in args.models:
+        report = bench(name, args.draft, args.precision, args.repeat)
+        if report is None:
+            print(f"{name:<14} skipped: vocabulary differs from {args.draft}")
+            continue
+        print(f"{name:<14} {report['plain']:>8.2f} {report['assisted']:>10.2f} "
+              f"{report['plain'] / report['assisted']:>7.2f}x {report['acceptance']:>8.0%} "
+              f"{report['tokens_per_pass']:>9.2f} {report['agreement']:>9.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Compare torch and ONNX Runtime backends on the summarizer and question generator.
+
+Usage (from the ``app`` directory)::
+
+    python -m scripts.bench_backends --repeat 3 --batch-size 8
+
+The first ONNX run exports and caches the graphs under ``ONNX_CACHE_DIR``;
+export time is reported separately from inference time.
+"""
+
+import argparse
+import time
+
+from src.model.abstractive_summarizer import AbstractiveSummarizer
+from src.model.question_generator import QuestionGenerator
+from scripts.corpus import CHUNKS, ANSWERS
+
+
+def time_calls(fn, batches, repeat):
+    """Return best wall-clock seconds of running ``fn`` over every batch.
+
+    Args:
+        fn (callable): batched model method.
+        batches (list(tuple)): positional arguments per call.
+        repeat (int): number of timed runs.
+
+    Returns:
+        tuple(float, list): best total seconds and outputs of the last run.
+    """
+    best, outputs = float('inf'), []
+    for _ in range(repeat):
+        outputs = []
+        start = time.perf_counter()
+        for args in batches:
+            outputs.extend(fn(*args))
+        best = min(best, time.perf_counter() - start)
+    return best, outputs
+
+
+def bench(model_cls, backend, make_batches, method, repeat):
+    """Load one model with one backend and time its batched method.
+
+    Returns:
+        dict: load time, inference time and outputs.
+    """
+    start = time.perf_counter()
+    model = model_cls(backend=backend)
+    load = time.perf_counter() - start
+
+    fn = getattr(model, method)
+    fn(*make_batches()[0])  # warm-up
+    seconds, outputs = time_calls(fn, make_batches(), repeat)
+    return {'load': load, 'seconds': seconds, 'outputs': outputs}
+
+
+def main():
+    """Run the benchmark and print one row per model and backend."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=len(CHUNKS))
+    args = parser.parse_args()
+
+    size = args.batch_size
+
+    def summary_batches():
+        return [(CHUNKS[i:i + size],) for i in range(0, len(CHUNKS), size)]
+
+    def question_batches():
+        return [(CHUNKS[i:i + size], ANSWERS[i:i + size]) for i in range(0, len(CHUNKS), size)]
+
+    cases = [
+        ('summarizer', AbstractiveSummarizer, summary_batches, 'summarize_batch'),
+        ('question_gen', QuestionGenerator, question_batches, 'generate_batch'),
+    ]
+
+    print(f"{'model':<14}{'backend':<9}{'load s':>9}{'infer s':>10}{'ms/item':>10}"
+          f"{'speedup':>9}{'same output':>13}")
+    for name, model_cls, make_batches, method in cases:
+        results = {backend: bench(model_cls, backend, make_batches, method, args.repeat)
+                   for backend in ('torch', 'onnx')}
+        base = results['torch']
+        for backend, res in results.items():
+            same = sum(a == b for a, b in zip(base['outputs'], res['outputs']))
+            print(f"{name:<14}{backend:<9}{res['load']:>9.1f}{res['seconds']:>10.2f}"
+                  f"{1000 * res['seconds'] / len(CHUNKS):>10.0f}"
+                  f"{base['seconds'] / res['seconds']:>8.2f}x"
+                  f"{same:>8}/{len(CHUNKS)}")
+
+
+if __name__ == '__main__':
+    main()
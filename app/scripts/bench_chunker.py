@@ -0,0 +1,77 @@
+"""Time the text chunkers on large inputs to check they scale linearly.
+
+Usage (from the ``app`` directory)::
+
+    python -m scripts.bench_chunker --sizes 1 10 --tokenizer google-t5/t5-base
+
+Inputs are built by repeating the benchmark corpus up to each size in MB.
+Without ``--tokenizer`` sentences are measured in words, which times the
+chunker itself rather than the tokenizer.
+"""
+
+import argparse
+import time
+
+from src.textprocessor import preprocess
+from scripts.corpus import CHUNKS
+
+
+def make_text(megabytes):
+    """Repeat the corpus until the text reaches ``megabytes`` MB."""
+    corpus = ' '.join(CHUNKS) + ' '
+    size = int(megabytes * 1024 * 1024)
+    return (corpus * (size // len(corpus) + 1))[:size]
+
+
+def make_counter(name):
+    """Return a token counter backed by the tokenizer of model ``name``."""
+    # pylint: disable=import-outside-toplevel
+    from transformers import AutoTokenizer
+    from src.model import artifacts
+
+    tokenizer = AutoTokenizer.from_pretrained(
+        artifacts.resolve(name), local_files_only=artifacts.offline())
+
+    def count_tokens(texts):
+        encode = tokenizer([f'summarize: {text}' for text in texts])
+        return [len(ids) for ids in encode['input_ids']]
+    return count_tokens
+
+
+def time_chunker(fn, text):
+    """Return wall-clock seconds and chunk count of one chunker run."""
+    start = time.perf_counter()
+    chunks = sum(1 for _ in fn(text))
+    return time.perf_counter() - start, chunks
+
+
+def main():
+    """Run the benchmark and print one row per chunker and input size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1, 10])
+    parser.add_argument('--max-tokens', type=int, default=256)
+    parser.add_argument('--overlap', type=int, default=0)
+    parser.add_argument('--tokenizer', default=None,
+                        help='model whose tokenizer measures sentences')
+    args = parser.parse_args()
+
+    count_tokens = make_counter(args.tokenizer) if args.tokenizer else preprocess.count_words
+    chunkers = {
+        'split_text': preprocess.split_text,
+        'iter_chunks': lambda text: preprocess.iter_chunks(
+            text, args.max_tokens, count_tokens, args.overlap),
+    }
+
+    print(f"{'chunker':<12} {'MB':>6} {'seconds':>9} {'MB/s':>8} {'chunks':>8} {'s/MB vs first':>14}")
+    for name, fn in chunkers.items():
+        first = None
+        for megabytes in args.sizes:
+            seconds, chunks = time_chunker(fn, make_text(megabytes))
+            per_mb = seconds / megabytes
+            first = first or per_mb
+            print(f"{name:<12} {megabytes:>6g} {seconds:>9.3f} {megabytes / seconds:>8.2f} "
+                  f"{chunks:>8} {per_mb / first:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
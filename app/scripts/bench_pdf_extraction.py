@@ -0,0 +1,56 @@
+"""Time page-parallel PDF text extraction with different pool sizes.
+
+Usage (from the ``app`` directory)::
+
+    python -m scripts.bench_pdf_extraction --pages 300 --workers 0 1 2 4
+
+The PDF is synthetic, several corpus paragraphs per page. ``0`` workers
+extracts on one thread, the way the upload handler used to.
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+from src.service.pdf_extraction import PdfExtractor
+from scripts.corpus import CHUNKS, make_pdf
+
+
+def bench(data, workers, pages_per_shard):
+    """Return wall-clock seconds and pages of one extraction run without cache."""
+    extractor = PdfExtractor(workers=workers, pages_per_shard=pages_per_shard)
+
+    async def run():
+        return sum([1 async for _ in extractor.iter_pages(io.BytesIO(data))])
+
+    try:
+        asyncio.run(run())  # start the pool outside the timing
+        start = time.perf_counter()
+        pages = asyncio.run(run())
+        return time.perf_counter() - start, pages
+    finally:
+        extractor.shutdown()
+
+
+def main():
+    """Run the benchmark and print one row per pool size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--pages-per-shard', type=int, default=8)
+    args = parser.parse_args()
+
+    page = ' '.join(CHUNKS[:4])
+    data = make_pdf([page] * args.pages)
+
+    print(f"{'workers':>7} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        seconds, pages = bench(data, workers, args.pages_per_shard)
+        baseline = baseline or seconds
+        print(f"{workers:>7} {seconds:>9.3f} {pages / seconds:>9.1f} {baseline / seconds:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Fill the local artifact store with every model the service loads.
+
+Usage (from the ``app`` directory, with network access)::
+
+    python -m scripts.build_artifacts [--force] [--only NAME ...]
+
+Transformer weights are re-saved as safetensors so workers memory-map them,
+then ``resources/artifacts/manifest.json`` is updated. Once the manifest
+exists the service starts offline (see ``src/model/artifacts.py``). In the
+container, run this in a build step so boot never touches the network.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+# the store must be built online even when a manifest already exists
+os.environ['MODEL_OFFLINE'] = 'false'
+
+# pylint: disable=wrong-import-position
+from src.ansgenerator.false_answer_generator import S2V_NAME, SENTENCE_MODEL, download_sense2vec
+from src.model import artifacts
+from src.model.keyword_extractor import EMBEDDING_MODEL, SPACY_PIPELINE
+
+# t5-small is the draft model of assisted decoding
+SEQ2SEQ_MODELS = ('google-t5/t5-base', 'iarfmoose/t5-base-question-generator',
+                  'google-t5/t5-small')
+SENTENCE_MODELS = (SENTENCE_MODEL, EMBEDDING_MODEL)
+
+
+# pylint: disable=import-outside-toplevel
+def save_seq2seq(name, out_dir):
+    """Save tokenizer, config and safetensors weights of a hub seq2seq model."""
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+    AutoTokenizer.from_pretrained(name).save_pretrained(out_dir)
+    AutoModelForSeq2SeqLM.from_pretrained(name).save_pretrained(out_dir, safe_serialization=True)
+
+
+def save_sentence_model(name, out_dir):
+    """Save a sentence-transformers model with safetensors weights."""
+    from sentence_transformers import SentenceTransformer
+    SentenceTransformer(name).save(out_dir, safe_serialization=True)
+
+
+def save_spacy_pipeline(name, out_dir):
+    """Save an installed (or freshly downloaded) spaCy pipeline."""
+    import spacy
+    if not spacy.util.is_package(name):
+        spacy.cli.download(name)
+    spacy.load(name).to_disk(out_dir)
+
+
+def save_sense2vec(_, out_dir):
+    """Download and unpack the sense2vec vectors."""
+    download_sense2vec(out_dir)
+    # the archive unpacks into s2v_old/, move its content up one level
+    inner = os.path.join(out_dir, 's2v_old')
+    for entry in os.listdir(inner):
+        shutil.move(os.path.join(inner, entry), out_dir)
+    os.rmdir(inner)
+
+
+def build(name, kind, save, force=False):
+    """Save one artifact into the store and register it in the manifest."""
+    dirname = artifacts.artifact_dirname(name)
+    target = os.path.join(artifacts.store_dir(), dirname)
+    if os.path.isdir(target) and name in artifacts.load_manifest() and not force:
+        print(f"= {name} (already stored)")
+        return
+
+    os.makedirs(artifacts.store_dir(), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=artifacts.store_dir())
+    try:
+        save(name, tmp_dir)
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.rename(tmp_dir, target)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    artifacts.register(name, dirname, kind)
+    print(f"+ {name} -> {target}")
+
+
+def main():
+    """Build every artifact (or the ones passed with ``--only``)."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--force', action='store_true', help="rebuild stored artifacts")
+    parser.add_argument('--only', nargs='+', help="logical names to build")
+    args = parser.parse_args()
+
+    jobs = ([(name, 'seq2seq', save_seq2seq) for name in SEQ2SEQ_MODELS]
+            + [(name, 'sentence_transformer', save_sentence_model) for name in SENTENCE_MODELS]
+            + [(SPACY_PIPELINE, 'spacy', save_spacy_pipeline),
+               (S2V_NAME, 'sense2vec', save_sense2vec)])
+    for name, kind, save in jobs:
+        if not args.only or name in args.only:
+            build(name, kind, save, args.force)
+
+    import nltk
+    nltk.download('punkt_tab', download_dir=os.path.join(artifacts.store_dir(), artifacts.NLTK_DIR))
+
+
+if __name__ == '__main__':
+    main()
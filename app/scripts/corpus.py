@@ -0,0 +1,100 @@
+"""Fixed corpus shared by the benchmark and evaluation scripts.
+
+Chunks are short paragraphs that fit one summarizer input.
+"""
+
+import io
+
+CHUNKS = [
+    "NLP enables computers to understand natural language as humans do. Whether the language "
+    "is spoken or written, natural language processing uses artificial intelligence to take "
+    "real-world input, process it, and make sense of it in a way a computer can understand.",
+    "Just as humans have different sensors such as ears to hear and eyes to see, computers have "
+    "programs to read and microphones to collect audio. And just as humans have a brain to "
+    "process that input, computers have a program to process their respective inputs.",
+    "Photosynthesis is the process by which green plants use sunlight to synthesize food from "
+    "carbon dioxide and water. It generally involves the green pigment chlorophyll and "
+    "generates oxygen as a by-product, which is released into the atmosphere.",
+    "The French Revolution was a period of political and societal change in France that began "
+    "with the Estates General of 1789 and ended with the coup of 18 Brumaire in November 1799 "
+    "and the formation of the French Consulate.",
+    "Manufacturing processes are the steps through which raw materials are transformed into a "
+    "final product. The process involves use of machinery, tools, power and labour, and it "
+    "adds greater value to the final product.",
+    "The mitochondrion is an organelle found in the cells of most eukaryotes. Mitochondria use "
+    "aerobic respiration to generate adenosine triphosphate, which is used throughout the cell "
+    "as a source of chemical energy.",
+    "Python is a high-level, general-purpose programming language. Its design philosophy "
+    "emphasizes code readability with the use of significant indentation, and it supports "
+    "multiple programming paradigms including structured and object-oriented programming.",
+    "The Mekong is a trans-boundary river in East Asia and Southeast Asia. It is the world's "
+    "twelfth-longest river and the third-longest in Asia, flowing through China, Myanmar, Laos, "
+    "Thailand, Cambodia and Vietnam before reaching the South China Sea.",
+]
+
+ANSWERS = [
+    "artificial intelligence",
+    "microphones",
+    "chlorophyll",
+    "1789",
+    "machinery",
+    "adenosine triphosphate",
+    "indentation",
+    "Vietnam",
+]
+
+
+def make_pdf(pages):
+    """Build a PDF with one page per item, without a PDF writing library.
+
+    Args:
+        pages (list(str or PIL.Image.Image)): text of a text page, ASCII without
+            parentheses or backslashes, or an image filling a scanned page.
+
+    Returns:
+        bytes: PDF file content.
+    """
+    count = len(pages)
+    kids = ' '.join(f'{4 + 2 * i} 0 R' for i in range(count))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{kids}] /Count {count} >>'.encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    images = []
+    for i, page in enumerate(pages):
+        resources = '/Font << /F1 3 0 R >>'
+        if isinstance(page, str):
+            lines = [page[j:j + 80] for j in range(0, len(page), 80)] or ['']
+            stream = ('BT /F1 10 Tf 12 TL 40 800 Td '
+                      + ' '.join(f'({line}) Tj T*' for line in lines) + ' ET').encode()
+        else:
+            # image XObjects are numbered after every page and content object
+            number = 4 + 2 * count + len(images)
+            images.append(page)
+            resources += f' /XObject << /Im0 {number} 0 R >>'
+            stream = b'q 595 0 0 842 0 0 cm /Im0 Do Q'
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       f'/Resources << {resources} >> /Contents {5 + 2 * i} 0 R >>'.encode())
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+
+    for image in images:
+        image = image.convert('L')
+        jpeg = io.BytesIO()
+        image.save(jpeg, 'JPEG')
+        objects.append(b'<< /Type /XObject /Subtype /Image /Width %d /Height %d '
+                       b'/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /DCTDecode '
+                       b'/Length %d >>\nstream\n%s\nendstream'
+                       % (image.width, image.height, jpeg.tell(), jpeg.getvalue()))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, xref)
+    return bytes(out)
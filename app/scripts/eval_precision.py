@@ -0,0 +1,107 @@
+"""Evaluate fp32 / int8 / bf16 precision modes of the summarizer and question generator.
+
+Usage (from the ``app`` directory)::
+
+    python -m scripts.eval_precision --backend torch --modes fp32 int8 bf16
+
+Each mode runs in its own subprocess so peak RSS is not polluted by the
+previous one. Output drift is measured against the fp32 outputs on the fixed
+corpus in ``scripts/corpus.py``: exact-match rate and mean character-level
+similarity.
+"""
+
+import argparse
+import difflib
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from scripts.corpus import CHUNKS, ANSWERS
+
+MODELS = ('summarizer', 'question_gen')
+
+
+def run_worker(model, backend, precision):
+    """Load one model in one precision, run the corpus and print a JSON report."""
+    # pylint: disable=import-outside-toplevel
+    if model == 'summarizer':
+        from src.model.abstractive_summarizer import AbstractiveSummarizer
+        instance = AbstractiveSummarizer(backend=backend, precision=precision)
+        call = lambda i: instance.summarize(CHUNKS[i])
+    else:
+        from src.model.question_generator import QuestionGenerator
+        instance = QuestionGenerator(backend=backend, precision=precision)
+        call = lambda i: instance.generate(CHUNKS[i], ANSWERS[i])
+
+    call(0)  # warm-up
+
+    outputs, latencies = [], []
+    for i in range(len(CHUNKS)):
+        start = time.perf_counter()
+        outputs.append(call(i))
+        latencies.append(time.perf_counter() - start)
+
+    # ru_maxrss is in KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'outputs': outputs, 'latencies': latencies, 'peak_rss_mb': peak_rss_mb}))
+
+
+def evaluate(model, backend, precision):
+    """Run one model/precision pair in a fresh interpreter.
+
+    Returns:
+        dict: report printed by ``run_worker``.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-m', 'scripts.eval_precision', '--worker',
+         model, backend, precision],
+        check=True, capture_output=True, text=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def drift(reference, outputs):
+    """Compare outputs with fp32 reference outputs.
+
+    Returns:
+        tuple(float, float): exact-match rate and mean similarity ratio.
+    """
+    exact = sum(a == b for a, b in zip(reference, outputs)) / len(reference)
+    similarity = sum(difflib.SequenceMatcher(None, a, b).ratio()
+                     for a, b in zip(reference, outputs)) / len(reference)
+    return exact, similarity
+
+
+def main():
+    """Evaluate every requested mode and print one row per model and precision."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', default='torch', choices=('torch', 'onnx'))
+    parser.add_argument('--modes', nargs='+', default=['fp32', 'int8', 'bf16'])
+    parser.add_argument('--worker', nargs=3, metavar=('MODEL', 'BACKEND', 'PRECISION'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    modes = ['fp32'] + [mode for mode in args.modes if mode != 'fp32']
+
+    print(f"{'model':<14}{'precision':<11}{'mean ms':>9}{'p95 ms':>9}{'peak RSS MB':>13}"
+          f"{'exact':>8}{'similarity':>12}")
+    for model in MODELS:
+        reference = None
+        for mode in modes:
+            report = evaluate(model, args.backend, mode)
+            reference = reference or report['outputs']
+            exact, similarity = drift(reference, report['outputs'])
+            latencies = sorted(report['latencies'])
+            mean_ms = 1000 * sum(latencies) / len(latencies)
+            p95_ms = 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            print(f"{model:<14}{mode:<11}{mean_ms:>9.0f}{p95_ms:>9.0f}"
+                  f"{report['peak_rss_mb']:>13.0f}{exact:>8.0%}{similarity:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
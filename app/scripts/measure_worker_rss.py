@@ -0,0 +1,99 @@
+"""Measure per-worker private memory of gunicorn with and without model preload.
+
+Usage (from the ``app`` directory)::
+
+    python -m scripts.measure_worker_rss --workers 1 2 4 8
+
+For each worker count the app is started twice, once with ``MODEL_PRELOAD``
+and once without, and every worker's ``/proc/<pid>/smaps_rollup`` is read
+once ``/ready`` answers 200. Private pages are what a worker does not share
+with the master or its siblings, so with preload they should stay roughly
+flat as workers are added while Pss drops.
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import psutil
+
+FIELDS = ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty')
+
+
+def read_smaps_rollup(pid):
+    """Return the memory counters of one process in MiB.
+
+    Returns:
+        dict: one entry per ``FIELDS`` name.
+    """
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup', encoding='utf-8') as file:
+        for line in file:
+            name, _, rest = line.partition(':')
+            if name in FIELDS:
+                values[name] = int(rest.split()[0]) / 1024  # kB
+    return values
+
+
+def wait_ready(port, timeout):
+    """Poll ``/ready`` until every model is warmed up."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/ready', timeout=5) as resp:
+                if resp.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(2)
+    raise TimeoutError(f"app on port {port} not ready after {timeout}s")
+
+
+def measure(workers, preload, port, timeout):
+    """Start gunicorn, wait until ready and return the counters of each worker.
+
+    Returns:
+        list(dict): smaps_rollup counters per worker.
+    """
+    env = {**os.environ, 'WEB_CONCURRENCY': str(workers), 'BIND': f'127.0.0.1:{port}',
+           'MODEL_PRELOAD': 'true' if preload else 'false', 'INFERENCE_EXECUTOR': 'thread'}
+    master = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_conf.py', 'main:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # /ready is answered by one worker; give the others the same time to warm up
+        wait_ready(port, timeout)
+        time.sleep(5)
+        children = psutil.Process(master.pid).children()
+        return [read_smaps_rollup(child.pid) for child in children]
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=60)
+
+
+def main():
+    """Measure every worker count and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=int, default=900, help="seconds to wait for /ready")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'preload':>7} " + ' '.join(f'{f + " MiB":>18}' for f in FIELDS)
+          + f" {'private total MiB':>18}")
+    for workers in args.workers:
+        for preload in (False, True):
+            reports = measure(workers, preload, args.port, args.timeout)
+            mean = {f: sum(r[f] for r in reports) / len(reports) for f in FIELDS}
+            private = sum(r['Private_Clean'] + r['Private_Dirty'] for r in reports)
+            print(f"{workers:>7} {str(preload):>7} "
+                  + ' '.join(f'{mean[f]:>18.1f}' for f in FIELDS) + f" {private:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
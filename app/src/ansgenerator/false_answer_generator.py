@@ -14,9 +14,45 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sentence_transformers import SentenceTransformer
 from sense2vec import Sense2Vec
 
+from ..model import artifacts
 from ..textprocessor import preprocess
 import tempfile
 
+SENTENCE_MODEL = 'all-MiniLM-L12-v2'
+S2V_NAME = 's2v_reddit_2015_md'
+S2V_URL = ("https://github.com/explosion/sense2vec/releases/download/"
+           "v1.0.0/s2v_reddit_2015_md.tar.gz")
+
+
+def download_sense2vec(dest):
+    """Download the sense2vec vectors and extract them to ``dest/s2v_old``.
+
+    Args:
+        dest (str): where the archive is extracted.
+    """
+    with urllib.request.urlopen(S2V_URL) as req:
+        # save downloaded to a temp file first
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(req.read())
+            temp_file_path = temp_file.name
+
+    with tarfile.open(temp_file_path, mode='r:gz') as file:
+        def is_within_directory(directory, target):
+            abs_directory = os.path.abspath(directory)
+            abs_target = os.path.abspath(target)
+            prefix = os.path.commonprefix([abs_directory, abs_target])
+            return prefix == abs_directory
+
+        def safe_extract(tar, path=".", members=None, *, numeric_owner=False):
+            for member in tar.getmembers():
+                member_path = os.path.join(path, member.name)
+                if not is_within_directory(path, member_path):
+                    raise Exception("Attempted Path Traversal in Tar File")
+            tar.extractall(path, members, numeric_owner=numeric_owner)
+
+        safe_extract(file, dest)
+    os.remove(temp_file_path)
+
 
 class FalseAnswerGenerator:
     """Generate false answers within same context."""
@@ -31,40 +67,19 @@ class FalseAnswerGenerator:
 
            https://www.sbert.net/
         """
-        self._sentence_model = SentenceTransformer('all-MiniLM-L12-v2')
+        self._sentence_model = SentenceTransformer(
+            artifacts.resolve(SENTENCE_MODEL), local_files_only=artifacts.offline())
 
     def __init_sense2vec(self):
         """Initialize word vectors to get similar words.
 
         https://github.com/explosion/sense2vec
         """
-        if not os.path.isdir(os.getcwd() + '/s2v_old'):
-            s2v_url = "https://github.com/explosion/sense2vec/releases/download/"
-            s2v_ver_url = s2v_url + "v1.0.0/s2v_reddit_2015_md.tar.gz"
-
-            with urllib.request.urlopen(s2v_ver_url) as req:
-                # save downloaded to a temp file first
-                with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                    temp_file.write(req.read())
-                    temp_file_path = temp_file.name
-
-            with tarfile.open(temp_file_path, mode='r:gz') as file:
-                def is_within_directory(directory, target):
-                    abs_directory = os.path.abspath(directory)
-                    abs_target = os.path.abspath(target)
-                    prefix = os.path.commonprefix([abs_directory, abs_target])
-                    return prefix == abs_directory
-
-                def safe_extract(tar, path=".", members=None, *, numeric_owner=False):
-                    for member in tar.getmembers():
-                        member_path = os.path.join(path, member.name)
-                        if not is_within_directory(path, member_path):
-                            raise Exception("Attempted Path Traversal in Tar File")
-                    tar.extractall(path, members, numeric_owner=numeric_owner)
-
-                safe_extract(file)
-
-        self._s2v = Sense2Vec().from_disk("s2v_old")
+        path = artifacts.resolve(S2V_NAME, fallback=os.path.join(os.getcwd(), 's2v_old'))
+        if not os.path.isdir(path):
+            download_sense2vec(os.path.dirname(path))
+
+        self._s2v = Sense2Vec().from_disk(path)
 
     def __get_embedding(self, answer, distractors):
         """Returns sentence model embedding of answer and distractors.
@@ -0,0 +1,115 @@
+"""This module holds runtime settings read from environment variables.
+
+Every setting has a default that matches the behaviour of a single worker
+running on one CPU host, so nothing has to be exported for local development.
+"""
+
+import os
+
+
+def get_str(name, default):
+    """Read a string setting.
+
+    Args:
+        name (str): environment variable name.
+        default (str): value used when the variable is not set.
+
+    Returns:
+        str: setting value.
+    """
+    return os.environ.get(name, default)
+
+
+def get_int(name, default):
+    """Read an integer setting.
+
+    Args:
+        name (str): environment variable name.
+        default (int): value used when the variable is not set.
+
+    Returns:
+        int: setting value.
+    """
+    value = os.environ.get(name)
+    return default if value in (None, '') else int(value)
+
+
+def get_float(name, default):
+    """Read a float setting.
+
+    Args:
+        name (str): environment variable name.
+        default (float): value used when the variable is not set.
+
+    Returns:
+        float: setting value.
+    """
+    value = os.environ.get(name)
+    return default if value in (None, '') else float(value)
+
+
+def get_bool(name, default):
+    """Read a boolean setting ("1", "true", "yes" and "on" are truthy).
+
+    Args:
+        name (str): environment variable name.
+        default (bool): value used when the variable is not set.
+
+    Returns:
+        bool: setting value.
+    """
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def model_setting(prefix, name, default=None):
+    """Read a per-model setting, falling back to the shared ``MODEL_`` one.
+
+    ``model_setting('SUMMARIZER', 'BACKEND')`` reads ``SUMMARIZER_BACKEND``,
+    then ``MODEL_BACKEND``, then returns ``default``.
+
+    Args:
+        prefix (str): upper case model prefix.
+        name (str): upper case setting name.
+        default (str, optional): value used when neither variable is set.
+
+    Returns:
+        str: setting value.
+    """
+    return get_str(f'{prefix}_{name}', None) or get_str(f'MODEL_{name}', default)
+
+
+def model_replicas(prefix):
+    """Number of replicas of one model, e.g. ``SUMMARIZER_REPLICAS`` or ``MODEL_REPLICAS``.
+
+    Args:
+        prefix (str): upper case model prefix.
+
+    Returns:
+        int: replica count.
+    """
+    return int(model_setting(prefix, 'REPLICAS', '1'))
+
+
+def scheduler_settings(prefix, max_batch_size=8, max_wait_ms=10, sort_window=4):
+    """Batching scheduler settings of one model, e.g. ``SUMMARIZER_MAX_BATCH_SIZE``.
+
+    A scheduler keeps one batch in flight per replica of its model.
+
+    Args:
+        prefix (str): upper case model prefix.
+        max_batch_size (int, optional): default batch size bound. Defaults to 8.
+        max_wait_ms (int, optional): default batching window. Defaults to 10.
+        sort_window (int, optional): default batches regrouped by length. Defaults to 4.
+
+    Returns:
+        dict: keyword arguments for ``BatchScheduler``.
+    """
+    return {
+        'max_batch_size': get_int(f'{prefix}_MAX_BATCH_SIZE', max_batch_size),
+        'max_wait_ms': get_float(f'{prefix}_MAX_WAIT_MS', max_wait_ms),
+        'max_in_flight': model_replicas(prefix),
+        'sort_window': get_int(f'{prefix}_SORT_WINDOW', sort_window),
+    }
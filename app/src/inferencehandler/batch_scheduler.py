@@ -0,0 +1,248 @@
+"""This module merges concurrent single-item model requests into batched calls."""
+
+import asyncio
+import logging
+from collections import Counter
+
+from .inference_handler import length_sorted_batches
+
+
+class BatchScheduler:
+    """Queue items from concurrent callers and run them through one batched call.
+
+    A batch is closed when it reaches ``max_batch_size`` items or when
+    ``max_wait_ms`` has passed since its first item was queued, whichever comes
+    first. Each caller awaits only the output of its own item.
+
+    Items submitted with different ``group`` values (e.g. decoding profiles)
+    never share a call; ``batch_fn`` receives the group as second argument.
+
+    Up to ``max_in_flight`` batches run at once, e.g. one per model replica;
+    the next batch keeps filling up while every slot is busy.
+
+    Given a ``length`` function, the scheduler takes up to ``sort_window``
+    batches worth of queued items at once and regroups them by length, so
+    short inputs are not padded to the length of long ones.
+    """
+
+    def __init__(self, batch_fn, name, max_batch_size=8, max_wait_ms=10, executor=None,
+                 max_in_flight=1, length=None, sort_window=1):
+        """Initialize scheduler.
+
+        Args:
+            batch_fn (callable): takes a list of items and their group, returns one
+                output per item.
+            name (str): model name used in logs and stats.
+            max_batch_size (int, optional): upper bound of items per call. Defaults to 8.
+            max_wait_ms (float, optional): how long a batch waits to fill up. Defaults to 10.
+            executor (concurrent.futures.Executor, optional): where ``batch_fn`` runs.
+                Defaults to the event loop's default thread pool.
+            max_in_flight (int, optional): batches running at once. Defaults to 1.
+            length (callable, optional): length of an item, e.g. ``len``. Items
+                keep their queue order when None.
+            sort_window (int, optional): batches worth of items sorted by length
+                together. Defaults to 1.
+        """
+        if max_batch_size < 1:
+            raise ValueError("'max_batch_size' must be at least 1")
+        if max_in_flight < 1:
+            raise ValueError("'max_in_flight' must be at least 1")
+        if sort_window < 1:
+            raise ValueError("'sort_window' must be at least 1")
+
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_in_flight = max_in_flight
+        self.sort_window = sort_window
+        self._length = length
+        self._batch_fn = batch_fn
+        self._executor = executor
+
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._slots = None
+        self._running = set()
+
+        self._batch_sizes = Counter()
+        self._max_queue_depth = 0
+        self._items = 0
+        self._failures = 0
+
+    @property
+    def queue_depth(self):
+        """int: number of items waiting for a batch slot."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_worker(self):
+        """Start the batching task on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._running = set()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item, group=None):
+        """Queue one item and wait for its output.
+
+        Args:
+            item (any): single input accepted by ``batch_fn``.
+            group (hashable, optional): only items of the same group are batched together.
+
+        Returns:
+            any: output produced for this item.
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, group, future))
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def submit_many(self, items, group=None):
+        """Queue several items and wait for all of their outputs.
+
+        Args:
+            items (list): inputs accepted by ``batch_fn``.
+            group (hashable, optional): only items of the same group are batched together.
+
+        Returns:
+            list: outputs in input order.
+        """
+        return list(await asyncio.gather(*(self.submit(item, group) for item in items)))
+
+    async def _run(self):
+        """Collect queued items into batches, dispatching up to ``max_in_flight`` at once."""
+        while True:
+            # wait for a free slot first so the next batch fills up meanwhile
+            await self._slots.acquire()
+            batches = self._cut(await self._collect())
+            for i, (group, members) in enumerate(batches):
+                if i:
+                    await self._slots.acquire()
+                task = self._loop.create_task(self._dispatch_group(group, members))
+                self._running.add(task)
+                task.add_done_callback(self.__release)
+
+    async def _collect(self):
+        """Wait for queued items, up to ``sort_window`` batches of them.
+
+        Returns once a full batch is queued and nothing more is waiting, or
+        ``max_wait`` after the first item.
+
+        Returns:
+            list(tuple(any, hashable, asyncio.Future)): queued items with their
+            groups and futures.
+        """
+        window = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(window) < self.max_batch_size * self.sort_window:
+            if not self._queue.empty():
+                window.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0 or len(window) >= self.max_batch_size:
+                break
+            try:
+                window.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return window
+
+    def _cut(self, window):
+        """Cut collected items into batches of one group each.
+
+        With a ``length`` function, the items of a group are sorted by length
+        first, so each batch pads its inputs to little more than their own length.
+
+        Args:
+            window (list(tuple(any, hashable, asyncio.Future))): collected items.
+
+        Returns:
+            list(tuple(hashable, list(tuple(any, asyncio.Future)))): group and
+            items with their futures of every batch.
+        """
+        groups = {}
+        for item, group, future in window:
+            groups.setdefault(group, []).append((item, future))
+
+        batches = []
+        for group, members in groups.items():
+            if self._length is None:
+                order = [list(range(i, min(i + self.max_batch_size, len(members))))
+                         for i in range(0, len(members), self.max_batch_size)]
+            else:
+                order = length_sorted_batches(
+                    [self._length(item) for item, _ in members], self.max_batch_size)
+            batches.extend((group, [members[i] for i in batch]) for batch in order)
+        return batches
+
+    def __release(self, task):
+        """Free the slot of a finished batch."""
+        self._running.discard(task)
+        self._slots.release()
+
+    async def _dispatch_group(self, group, members):
+        """Run the items of one group and resolve their futures.
+
+        Args:
+            group (hashable): group shared by every item.
+            members (list(tuple(any, asyncio.Future))): items with their futures.
+        """
+        items = [item for item, _ in members]
+        self._batch_sizes[len(items)] += 1
+        self._items += len(items)
+
+        try:
+            outputs = await self._call(items, group)
+            # a missing output would leave its caller waiting forever
+            if len(outputs) != len(items):
+                raise ValueError(f"{self.name} returned {len(outputs)} outputs "
+                                 f"for {len(items)} items")
+        except Exception as err:  # pylint: disable=broad-except
+            self._failures += 1
+            logging.error(f"{self.name} batch of {len(items)} failed: {err}")
+            for _, future in members:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for (_, future), output in zip(members, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    async def _call(self, items, group):
+        """Run ``batch_fn`` without blocking the event loop.
+
+        Args:
+            items (list): batch inputs.
+            group (hashable): group shared by the inputs.
+
+        Returns:
+            list: batch outputs.
+        """
+        return await self._loop.run_in_executor(self._executor, self._batch_fn, items, group)
+
+    def stats(self):
+        """Return queue and batching counters.
+
+        Returns:
+            dict: queue depth, processed items and batch size histogram.
+        """
+        return {
+            'name': self.name,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'max_in_flight': self.max_in_flight,
+            'sort_window': self.sort_window,
+            'in_flight': len(self._running),
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self._max_queue_depth,
+            'batches': sum(self._batch_sizes.values()),
+            'items': self._items,
+            'failures': self._failures,
+            'batch_size_histogram': dict(sorted(self._batch_sizes.items())),
+        }
@@ -3,42 +3,156 @@
 @Author: Karthick T. Sharma
 """
 
+from src import config
 
-def get_all_summary(model, context):
+
+def length_sorted_batches(lengths, max_batch_size):
+    """Group item indices into batches of items of similar length.
+
+    Items are sorted by length before being cut into batches, so each batch
+    pads its inputs to little more than their own length.
+
+    Args:
+        lengths (list(int)): length of each item.
+        max_batch_size (int): upper bound of items per batch.
+
+    Returns:
+        list(list(int)): indices of the items of each batch.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    return [order[i:i + max_batch_size] for i in range(0, len(order), max_batch_size)]
+
+
+def run_batched(batch_fn, items, max_batch_size, key=len):
+    """Run items through a batched model call in length-sorted batches.
+
+    Args:
+        batch_fn (callable): takes a list of items, returns one output per item.
+        items (list): model inputs.
+        max_batch_size (int): upper bound of items per call.
+        key (callable, optional): length of an item. Defaults to ``len``.
+
+    Returns:
+        list: output per item, in input order.
+    """
+    outputs = [None] * len(items)
+    for batch in length_sorted_batches([key(item) for item in items], max_batch_size):
+        for i, output in zip(batch, batch_fn([items[i] for i in batch])):
+            outputs[i] = output
+    return outputs
+
+
+def get_all_summary(model, context, max_batch_size=None):
     """Generate summary of input corpus.
 
     Args:
-        model (OnnxT5): T5 transformer for summarization.
+        model (AbstractiveSummarizer): T5 transformer for summarization.
         context (str): Bunch of unprocessed text.
+        max_batch_size (int, optional): chunks per forward pass.
+            Defaults to ``SUMMARIZER_MAX_BATCH_SIZE``.
 
     Returns:
         tuple(list(str), list(str)): tuple of, list of summarized text chunks and list of
         original text chuncks.
     """
-    summary = []
+    max_batch_size = max_batch_size or config.scheduler_settings('SUMMARIZER')['max_batch_size']
     splitted_text = model.preprocess_input(context)
-
-    for txt in splitted_text:
-        summary.append(model.summarize(txt))
+    summary = run_batched(model.summarize_batch, splitted_text, max_batch_size)
 
     return summary, splitted_text
 
 
-def get_all_questions(model, context, answer):
+def get_all_questions(model, context, answer, max_batch_size=None):
     """Return list of generated questions.
 
     Args:
-        model (OnnxT5): T5 transformer for question generation.
+        model (QuestionGenerator): T5 transformer for question generation.
         context (list(str)): list of context for generating questions.
         answer (list(str)): list of answers for question which will be generated.
+        max_batch_size (int, optional): pairs per forward pass.
+            Defaults to ``QUESTION_GEN_MAX_BATCH_SIZE``.
 
     Returns:
         list(str): list of questions within given context
     """
-    questions = []
+    max_batch_size = max_batch_size or config.scheduler_settings('QUESTION_GEN')['max_batch_size']
+    pairs = list(zip(context, answer))
+
+    return run_batched(
+        lambda batch: model.generate_batch([cont for cont, _ in batch], [ans for _, ans in batch]),
+        pairs, max_batch_size, key=lambda pair: len(pair[0]) + len(pair[1]))
+
+
+def split_context(context):
+    """Split bulk text into the chunks the summarizer accepts.
+
+    Args:
+        context (str): Bunch of unprocessed text.
+
+    Returns:
+        list(str): text chunks.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.loaders import summarizer
+    return summarizer.preprocess_input(context)
 
-    for cont, ans in zip(context, answer):
-        questions.append(model.generate(cont, ans))
 
-    # squeezing the 2d list to 1d
-    return questions
+def summarize_batch(contexts, profile=None):
+    """Summarize a batch of text chunks queued by the summarizer scheduler.
+
+    Args:
+        contexts (list(str)): text chunks.
+        profile (str, optional): decoding profile shared by the batch.
+
+    Returns:
+        list(str): summary per chunk, in input order.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.loaders import summarizer
+    return summarizer.summarize_batch(contexts, profile)
+
+
+def generate_question_batch(pairs, profile=None):
+    """Generate questions for a batch queued by the question generator scheduler.
+
+    Args:
+        pairs (list(tuple(str, str))): (context, answer) pairs.
+        profile (str, optional): decoding profile shared by the batch.
+
+    Returns:
+        list(str): question per pair, in input order.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.loaders import question_gen
+    return question_gen.generate_batch([context for context, _ in pairs],
+                                       [answer for _, answer in pairs], profile)
+
+
+def extract_keywords(original_list, summarized_list):
+    """Extract keywords common to each original chunk and its summary.
+
+    Args:
+        original_list (list(str)): original text chunks.
+        summarized_list (list(str)): summary of each chunk.
+
+    Returns:
+        list(list(str)): keywords per chunk.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.loaders import keyword_extractor
+    return keyword_extractor.get_keywords(
+        original_list=original_list, summarized_list=summarized_list)
+
+
+def generate_false_answers(filtered_kws):
+    """Generate correct answers and distractors from extracted keywords.
+
+    Args:
+        filtered_kws (list(list(str))): keywords per chunk.
+
+    Returns:
+        tuple(list(str), list(str)): correct answers and all answers.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.loaders import false_ans_gen
+    return false_ans_gen.get_output(filtered_kws=filtered_kws)
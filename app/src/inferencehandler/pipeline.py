@@ -0,0 +1,316 @@
+"""This module runs items through a chain of stages with the stages overlapping.
+
+Each stage has its own workers and reads from a bounded queue fed by the
+stage before it, so item i can be in the last stage while item i + 1 is in
+the first one. For a document of many chunks, end-to-end latency approaches
+the cost of the slowest stage instead of the sum of all stages, and the
+bounded queues keep a fast stage from running far ahead of a slow one.
+"""
+
+import asyncio
+import logging
+import time
+
+from src import config
+from src.textprocessor.preprocess import ends_sentence, split_sentences
+
+_DONE = object()
+
+
+class Stage:
+    """One step of a pipeline: an async function applied to every item."""
+
+    def __init__(self, name, fn, workers=1):
+        """Initialize stage.
+
+        Args:
+            name (str): stage name used in stats.
+            fn (callable): async function taking an item and returning the next stage's item.
+            workers (int, optional): items the stage processes at once. Defaults to 1.
+        """
+        if workers < 1:
+            raise ValueError(f"stage '{name}' needs at least one worker")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+
+
+class Pipeline:
+    """Run items through stages connected by bounded queues."""
+
+    def __init__(self, stages, max_queue_size=4):
+        """Initialize pipeline.
+
+        Args:
+            stages (list(Stage)): stages in execution order.
+            max_queue_size (int, optional): items waiting between two stages. Defaults to 4.
+        """
+        self.stages = list(stages)
+        self.max_queue_size = max_queue_size
+        self._stats = {stage.name: {'items': 0, 'busy_seconds': 0.0, 'max_queue_depth': 0}
+                       for stage in self.stages}
+
+    async def run(self, items):
+        """Run every item through every stage.
+
+        Args:
+            items (list): inputs of the first stage.
+
+        Returns:
+            list: output of the last stage per item, in input order.
+        """
+        return [output async for output in self.stream(items)]
+
+    async def stream(self, items):
+        """Run items through every stage, yielding outputs as soon as they are ready.
+
+        Items are pulled from ``items`` only as fast as the first queue drains,
+        so an iterator producing them lazily (e.g. page by page) never runs far
+        ahead of the stages, and memory stays bounded by the queue sizes.
+
+        Args:
+            items (iterable or async iterable): inputs of the first stage.
+
+        Yields:
+            any: output of the last stage per item, in input order.
+        """
+        queues = [asyncio.Queue(self.max_queue_size) for _ in range(len(self.stages) + 1)]
+        running = [stage.workers for stage in self.stages]
+        failed = asyncio.get_running_loop().create_future()
+
+        async def feed():
+            index = 0
+            if hasattr(items, '__aiter__'):
+                async for item in items:
+                    await queues[0].put((index, item))
+                    index += 1
+            else:
+                for index, item in enumerate(items):
+                    await queues[0].put((index, item))
+            for _ in range(self.stages[0].workers):
+                await queues[0].put(_DONE)
+
+        async def work(k, stage):
+            stats = self._stats[stage.name]
+            while True:
+                stats['max_queue_depth'] = max(stats['max_queue_depth'], queues[k].qsize())
+                entry = await queues[k].get()
+                if entry is _DONE:
+                    break
+                index, item = entry
+                start = time.perf_counter()
+                output = await stage.fn(item)
+                stats['busy_seconds'] += time.perf_counter() - start
+                stats['items'] += 1
+                await queues[k + 1].put((index, output))
+
+            # the last worker of a stage to finish tells every worker of the next one
+            running[k] -= 1
+            if running[k] == 0:
+                downstream = self.stages[k + 1].workers if k + 1 < len(self.stages) else 1
+                for _ in range(downstream):
+                    await queues[k + 1].put(_DONE)
+
+        async def guard(coro):
+            try:
+                await coro
+            except Exception as err:  # pylint: disable=broad-except
+                if not failed.done():
+                    failed.set_exception(err)
+
+        tasks = [asyncio.ensure_future(guard(feed()))]
+        tasks += [asyncio.ensure_future(guard(work(k, stage)))
+                  for k, stage in enumerate(self.stages) for _ in range(stage.workers)]
+        ready, next_index = {}, 0
+        try:
+            while True:
+                get = asyncio.ensure_future(queues[-1].get())
+                await asyncio.wait({get, failed}, return_when=asyncio.FIRST_COMPLETED)
+                if failed.done():
+                    get.cancel()
+                    failed.result()
+                entry = await get
+                if entry is _DONE:
+                    break
+                index, output = entry
+                ready[index] = output
+                while next_index in ready:
+                    yield ready.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if failed.done():
+                failed.exception()
+
+    def stats(self):
+        """Return items processed, busy time and peak input queue depth of each stage.
+
+        Returns:
+            dict: stats per stage name.
+        """
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+def question_pipeline(inference, profile=None):
+    """Build the question generation pipeline over text chunks.
+
+    Each chunk is summarized, its keywords extracted, answers and distractors
+    picked and one question generated per answer, against the chunk's own
+    summary. Worker counts come from ``PIPELINE_<STAGE>_WORKERS``.
+
+    Args:
+        inference (InferenceService or InferenceClient): runs the model stages.
+        profile (str, optional): requested decoding profile.
+
+    Returns:
+        Pipeline: pipeline taking chunks and returning one dict per chunk with
+        ``questions``, ``crct_ans`` and ``all_answers``. A chunk is a text, or
+        a dict with the text under ``chunk`` whose other keys are carried along.
+    """
+    async def summarize(chunk):
+        item = dict(chunk) if isinstance(chunk, dict) else {'chunk': chunk}
+        (item['summary'],) = await inference.summarize([item['chunk']], profile)
+        return item
+
+    async def keywords(item):
+        (item['keywords'],) = await inference.extract_keywords([item['chunk']], [item['summary']])
+        return item
+
+    async def distractors(item):
+        item['crct_ans'], item['all_answers'] = await inference.generate_false_answers(
+            [item['keywords']])
+        return item
+
+    async def questions(item):
+        pairs = [(item['summary'], answer) for answer in item['crct_ans']]
+        item['questions'] = await inference.generate_questions(pairs, profile) if pairs else []
+        return item
+
+    def workers(stage, default):
+        return config.get_int(f'PIPELINE_{stage.upper()}_WORKERS', default)
+
+    return Pipeline([
+        Stage('summarize', summarize, workers('summarize', 4)),
+        Stage('keywords', keywords, workers('keywords', 1)),
+        Stage('distractors', distractors, workers('distractors', 1)),
+        Stage('questions', questions, workers('questions', 4)),
+    ], max_queue_size=config.get_int('PIPELINE_QUEUE_SIZE', 4))
+
+
+def isolate_errors(stages):
+    """Wrap stages so that a failing item is marked instead of failing the pipeline.
+
+    The error message is stored under ``error`` on the item, a dict, and the
+    later stages pass the item through untouched, so the other chunks of a
+    document are still generated and the failed one can be reported.
+
+    Args:
+        stages (list(Stage)): stages taking and returning dict items.
+
+    Returns:
+        list(Stage): wrapped stages.
+    """
+    def isolated(stage):
+        async def run(item):
+            if item.get('error'):
+                return item
+            try:
+                return await stage.fn(item)
+            except Exception as err:  # pylint: disable=broad-except
+                logging.warning(f"Stage '{stage.name}' failed on a chunk: {err}")
+                return dict(item, error=str(err) or type(err).__name__)
+        return Stage(stage.name, run, stage.workers)
+
+    return [isolated(stage) for stage in stages]
+
+
+async def translate_within_budget(inference, translate, chunk):
+    """Translate a chunk into parts whose translation fits the summarizer input.
+
+    The chunk is packed by source words, but its translation is what the
+    summarizer reads, and it would cut off any tokens past its budget. The
+    translation is measured with the summarizer's own chunker
+    (``split_context``); a chunk that does not fit is halved between its
+    sentences and each half translated again, so every part still names the
+    sentences it came from. A single sentence over the budget is cut into
+    the chunker's pieces.
+
+    Args:
+        inference (InferenceService or InferenceClient): measures with ``split_context``.
+        translate (callable): async function translating a text.
+        chunk (dict): ``chunk`` text, its ``sentences`` and ``first`` sentence
+            index, as ``stream_chunks`` yields it.
+
+    Returns:
+        list(dict): translated parts, same keys as ``chunk``, in order.
+    """
+    async def fit(sentences, first, text):
+        pieces = await inference.split_context(text)
+        if len(pieces) <= 1:
+            return [dict(chunk, chunk=text, sentences=sentences, first=first)]
+        if len(sentences) == 1:
+            return [dict(chunk, chunk=piece, sentences=sentences, first=first)
+                    for piece in pieces]
+        half = len(sentences) // 2
+        head, tail = sentences[:half], sentences[half:]
+        head_text, tail_text = await asyncio.gather(
+            translate(' '.join(head)), translate(' '.join(tail)))
+        return [*await fit(head, first, head_text), *await fit(tail, first + half, tail_text)]
+
+    return await fit(chunk['sentences'], chunk['first'], await translate(chunk['chunk']))
+
+
+def _pieces(sentence, max_words):
+    """Cut a sentence longer than ``max_words`` words between words."""
+    words = sentence.split()
+    return [' '.join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
+
+
+async def stream_chunks(pages, max_words=150):
+    """Group the sentences of a document into chunks as its pages stream in.
+
+    Sentences are packed greedily into chunks of at most ``max_words`` words,
+    so a document costs one pipeline pass per chunk instead of one per
+    sentence. They are kept as written, before translation, so each chunk can
+    name the sentences it came from when it fails. A sentence cut by a page
+    break is joined with its end on the next page, and a sentence longer
+    than ``max_words`` is cut between words.
+
+    Args:
+        pages (async iterable(str)): text of each page, in order.
+        max_words (int, optional): words per chunk. Defaults to 150.
+
+    Yields:
+        dict: ``chunk`` text, the ``sentences`` it holds and the index of
+        its ``first`` sentence in the document.
+    """
+    chunk, words, first = [], 0, 0
+
+    def pack(sentences):
+        nonlocal chunk, words, first
+        for sentence in sentences:
+            for piece in _pieces(sentence, max_words):
+                size = len(piece.split())
+                if chunk and words + size > max_words:
+                    yield {'chunk': ' '.join(chunk), 'sentences': chunk, 'first': first}
+                    first += len(chunk)
+                    chunk, words = [], 0
+                chunk.append(piece)
+                words += size
+
+    carry = ''
+    async for page in pages:
+        sentences = split_sentences(f'{carry} {page}')
+        carry = ''
+        # the last sentence of a page may go on on the next one
+        if (sentences and not ends_sentence(sentences[-1])
+                and len(sentences[-1].split()) < max_words):
+            carry = sentences.pop()
+        for item in pack(sentences):
+            yield item
+    for item in pack(split_sentences(carry)):
+        yield item
+    if chunk:
+        yield {'chunk': ' '.join(chunk), 'sentences': chunk, 'first': first}
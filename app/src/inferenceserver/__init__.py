@@ -0,0 +1,38 @@
+"""
+Inference daemon shared by the API workers of a host.
+
+The daemon (``python -m src.inferenceserver``) loads every model once and
+serves the pipeline stages of ``InferenceService`` over a Unix domain socket.
+With ``INFERENCE_SOCKET`` set, API workers call it through ``InferenceClient``
+instead of loading models themselves, so they can be scaled for I/O without
+multiplying model memory, and the daemon batches across all of them.
+"""
+
+from src import config
+
+_service = None
+
+
+def remote_inference():
+    """bool: whether models live in the inference daemon (``INFERENCE_SOCKET`` is set)."""
+    return bool(config.get_str('INFERENCE_SOCKET', ''))
+
+
+def get_inference_service():
+    """Return the pipeline stages of this process: a daemon client or the local models.
+
+    Returns:
+        InferenceClient or InferenceService: object with the pipeline stage methods.
+    """
+    global _service  # pylint: disable=global-statement
+    if _service is None:
+        # pylint: disable=import-outside-toplevel
+        if remote_inference():
+            from .client import InferenceClient
+            timeout = config.get_float('INFERENCE_TIMEOUT', 0)
+            _service = InferenceClient(config.get_str('INFERENCE_SOCKET', ''),
+                                       timeout=timeout or None)
+        else:
+            from .service import InferenceService
+            _service = InferenceService()
+    return _service
@@ -0,0 +1,51 @@
+"""Run the inference daemon: ``python -m src.inferenceserver``.
+
+Listens on ``INFERENCE_SOCKET`` (default ``/tmp/gen-question/inference.sock``)
+and warms every model up before accepting connections unless ``MODEL_WARMUP``
+is false.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+
+from src import config
+from src.model import artifacts
+
+artifacts.enable_offline_mode()
+
+# pylint: disable=wrong-import-position
+from src.loaders.executor import run_in_inference_executor, shutdown_inference_executor
+from src.loaders.model import warm_up_models
+from .server import InferenceServer
+from .service import InferenceService, RPC_METHODS
+
+DEFAULT_SOCKET = os.path.join('/tmp', 'gen-question', 'inference.sock')
+
+
+async def main():
+    """Warm up the models, then serve until SIGINT or SIGTERM."""
+    path = config.get_str('INFERENCE_SOCKET', '') or DEFAULT_SOCKET
+    server = InferenceServer(InferenceService(), path, RPC_METHODS)
+
+    if config.get_bool('MODEL_WARMUP', True):
+        await run_in_inference_executor(warm_up_models)
+    await server.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    serving = asyncio.ensure_future(server.serve_forever())
+    await stop.wait()
+    logging.info("Stopping inference server")
+    serving.cancel()
+    await server.close()
+    shutdown_inference_executor()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=config.get_str('LOG_LEVEL', 'info').upper())
+    asyncio.run(main())
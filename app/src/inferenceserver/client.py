@@ -0,0 +1,146 @@
+"""
+Client of the inference daemon.
+
+``InferenceClient`` has the methods of ``InferenceService`` and forwards each
+call over one multiplexed Unix socket connection per event loop. It is what
+API workers use instead of loading models when ``INFERENCE_SOCKET`` is set.
+"""
+
+import asyncio
+import itertools
+
+from .protocol import ProtocolError, read_message, write_message
+
+
+class InferenceError(RuntimeError):
+    """The daemon failed to run a call."""
+
+    def __init__(self, error_type, message):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+
+
+class InferenceClient:
+    """Call ``InferenceService`` methods in the inference daemon."""
+
+    def __init__(self, path, timeout=None):
+        """Initialize client; the connection is opened on first call.
+
+        Args:
+            path (str): socket path of the daemon.
+            timeout (float, optional): seconds to wait for one call. Waits forever when None.
+        """
+        self.path = path
+        self.timeout = timeout
+
+        self._ids = itertools.count()
+        self._loop = None
+        self._writer = None
+        self._reader_task = None
+        self._pending = {}
+        self._connect_lock = None
+        self._write_lock = None
+
+    async def __connect(self):
+        """Open the connection of the running event loop if it is not open."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._writer = None
+            self._pending = {}
+            self._connect_lock = asyncio.Lock()
+            self._write_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self._writer is None or self._reader_task.done():
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+                self._reader_task = loop.create_task(self.__read_responses(reader))
+
+    async def __read_responses(self, reader):
+        """Resolve the future of each response; fail every pending call on disconnect."""
+        error = ConnectionError(f"inference server at {self.path} closed the connection")
+        try:
+            while True:
+                response = await read_message(reader)
+                if response is None:
+                    break
+                future = self._pending.pop(response.get('id'), None)
+                if future is None or future.done():
+                    continue
+                if 'error' in response:
+                    future.set_exception(self.__error(response['error']))
+                else:
+                    future.set_result(response.get('result'))
+        except (ProtocolError, ConnectionError) as err:
+            error = ConnectionError(f"inference server connection failed: {err}")
+        finally:
+            self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    @staticmethod
+    def __error(error):
+        """Turn an error response into an exception, keeping ValueError for bad input."""
+        if error.get('type') == 'ValueError':
+            return ValueError(error.get('message'))
+        return InferenceError(error.get('type'), error.get('message'))
+
+    async def call(self, method, **params):
+        """Call one daemon method.
+
+        Args:
+            method (str): method name.
+
+        Returns:
+            any: JSON-decoded result.
+        """
+        await self.__connect()
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        try:
+            async with self._write_lock:
+                await write_message(
+                    self._writer, {'id': request_id, 'method': method, 'params': params})
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self):
+        """Close the connection of the running event loop."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
+
+    async def split_context(self, context):
+        """See ``InferenceService.split_context``."""
+        return await self.call('split_context', context=context)
+
+    async def summarize(self, contexts, profile=None):
+        """See ``InferenceService.summarize``."""
+        return await self.call('summarize', contexts=contexts, profile=profile)
+
+    async def generate_questions(self, pairs, profile=None):
+        """See ``InferenceService.generate_questions``."""
+        return await self.call('generate_questions', pairs=[list(pair) for pair in pairs],
+                               profile=profile)
+
+    async def extract_keywords(self, original_list, summarized_list):
+        """See ``InferenceService.extract_keywords``."""
+        return await self.call('extract_keywords', original_list=original_list,
+                               summarized_list=summarized_list)
+
+    async def generate_false_answers(self, filtered_kws):
+        """See ``InferenceService.generate_false_answers``."""
+        crct_ans, all_answers = await self.call('generate_false_answers',
+                                                filtered_kws=filtered_kws)
+        return crct_ans, all_answers
+
+    async def model_status(self):
+        """See ``InferenceService.model_status``."""
+        return await self.call('model_status')
@@ -0,0 +1,79 @@
+"""
+Wire format of the inference daemon.
+
+Every message is a 4-byte big-endian length followed by that many bytes of
+UTF-8 JSON. A request is ``{"id", "method", "params"}``, its response
+``{"id", "result"}`` or ``{"id", "error": {"type", "message"}}``. Ids let one
+connection carry many requests at once; responses come back in the order the
+calls finish.
+"""
+
+import asyncio
+import json
+import struct
+
+HEADER = struct.Struct('>I')
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+class ProtocolError(ValueError):
+    """A peer sent a frame that is not a valid message."""
+
+
+def encode_message(message):
+    """Frame one message.
+
+    Args:
+        message (dict): JSON-serializable message.
+
+    Returns:
+        bytes: length prefix and payload.
+    """
+    payload = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    if len(payload) > MAX_MESSAGE_BYTES:
+        raise ProtocolError(f"message of {len(payload)} bytes exceeds {MAX_MESSAGE_BYTES}")
+    return HEADER.pack(len(payload)) + payload
+
+
+async def write_message(writer, message):
+    """Send one message.
+
+    Args:
+        writer (asyncio.StreamWriter): connection.
+        message (dict): JSON-serializable message.
+    """
+    writer.write(encode_message(message))
+    await writer.drain()
+
+
+async def read_message(reader):
+    """Receive one message.
+
+    Args:
+        reader (asyncio.StreamReader): connection.
+
+    Returns:
+        dict: message, None when the peer closed the connection between messages.
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as err:
+        if not err.partial:
+            return None
+        raise ProtocolError("connection closed inside a frame header") from err
+
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise ProtocolError(f"frame of {size} bytes exceeds {MAX_MESSAGE_BYTES}")
+    try:
+        payload = await reader.readexactly(size)
+    except asyncio.IncompleteReadError as err:
+        raise ProtocolError("connection closed inside a frame") from err
+
+    try:
+        message = json.loads(payload.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as err:
+        raise ProtocolError(f"frame is not UTF-8 JSON: {err}") from err
+    if not isinstance(message, dict):
+        raise ProtocolError("message must be a JSON object")
+    return message
@@ -0,0 +1,119 @@
+"""
+Unix domain socket server of the inference daemon.
+
+Every request on a connection runs as its own task, so one API worker can
+have many calls in flight and the schedulers behind ``InferenceService``
+batch them with the calls of every other worker.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+
+from .protocol import ProtocolError, read_message, write_message
+
+
+class InferenceServer:
+    """Serve the methods of a service object over a Unix domain socket."""
+
+    def __init__(self, service, path, methods):
+        """Initialize server.
+
+        Args:
+            service (object): object whose async methods are called.
+            path (str): socket path.
+            methods (tuple(str)): names of the methods clients may call.
+        """
+        self.service = service
+        self.path = path
+        self.methods = frozenset(methods)
+        self._server = None
+        self._tasks = set()
+
+    async def start(self):
+        """Bind the socket, replacing a stale one left by a crashed daemon."""
+        if os.path.exists(self.path):
+            if self.__in_use():
+                raise OSError(f"an inference server is already listening on {self.path}")
+            os.unlink(self.path)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        self._server = await asyncio.start_unix_server(self.__handle_connection, path=self.path)
+        # API workers may run as another user of the same group
+        os.chmod(self.path, 0o660)
+        logging.info(f"Inference server listening on {self.path}")
+
+    def __in_use(self):
+        """Check whether another process accepts connections on the socket path."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                return False
+        return True
+
+    async def serve_forever(self):
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop accepting connections, wait for running calls and remove the socket."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def __handle_connection(self, reader, writer):
+        """Read requests until the client disconnects, answering each as it finishes."""
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                request = await read_message(reader)
+                if request is None:
+                    break
+                task = asyncio.ensure_future(self.__answer(request, writer, write_lock))
+                for pending in (tasks, self._tasks):
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+        except ProtocolError as err:
+            logging.warning(f"Dropping inference client: {err}")
+        except ConnectionError:
+            pass
+        finally:
+            # a client that stopped sending still gets the answers of its running calls
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def __answer(self, request, writer, write_lock):
+        """Run one request and send its result or error."""
+        response = {'id': request.get('id')}
+        method = request.get('method')
+        try:
+            if method not in self.methods:
+                raise ValueError(f"unknown method '{method}'")
+            result = await getattr(self.service, method)(**(request.get('params') or {}))
+            response['result'] = result
+        except Exception as err:  # pylint: disable=broad-except
+            if not isinstance(err, ValueError):
+                logging.exception(f"Inference call {method} failed")
+            response['error'] = {'type': type(err).__name__, 'message': str(err)}
+
+        try:
+            async with write_lock:
+                try:
+                    await write_message(writer, response)
+                except ProtocolError as err:
+                    # the result is too large for one frame; the caller still gets an answer
+                    await write_message(writer, {
+                        'id': response['id'],
+                        'error': {'type': 'ValueError', 'message': str(err)}})
+        except ConnectionError as err:
+            logging.warning(f"Could not answer {method}: {err}")
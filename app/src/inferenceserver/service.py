@@ -0,0 +1,86 @@
+"""
+Pipeline stages served by the inference daemon.
+
+``InferenceService`` runs every model stage in this process: summarizer and
+question generator calls go through their batching schedulers, the other
+stages run on the inference executor. The daemon exposes these methods over
+its socket and ``InferenceClient`` mirrors them, so callers use either one.
+"""
+
+from src.inferencehandler import inference_handler
+from src.loaders import summarizer_scheduler, question_scheduler, model_status
+from src.loaders.executor import run_in_inference_executor
+from src.model.decoding import select_profile
+
+# methods the daemon accepts over its socket
+RPC_METHODS = ('split_context', 'summarize', 'generate_questions', 'extract_keywords',
+               'generate_false_answers', 'model_status')
+
+
+class InferenceService:
+    """Run pipeline stages on the models loaded in this process."""
+
+    async def split_context(self, context):
+        """Split bulk text into the chunks the summarizer accepts.
+
+        Args:
+            context (str): input corpus.
+
+        Returns:
+            list(str): text chunks.
+        """
+        return await run_in_inference_executor(inference_handler.split_context, context)
+
+    async def summarize(self, contexts, profile=None):
+        """Summarize text chunks, batched with concurrent callers.
+
+        Args:
+            contexts (list(str)): text chunks.
+            profile (str, optional): requested decoding profile. When not given,
+                the summarizer default, degraded under load.
+
+        Returns:
+            list(str): summary per chunk.
+        """
+        group = select_profile(profile, summarizer_scheduler.queue_depth)
+        return await summarizer_scheduler.submit_many(contexts, group=group)
+
+    async def generate_questions(self, pairs, profile=None):
+        """Generate one question per (context, answer) pair, batched with concurrent callers.
+
+        Args:
+            pairs (list(list(str))): (context, answer) pairs.
+            profile (str, optional): requested decoding profile.
+
+        Returns:
+            list(str): question per pair.
+        """
+        group = select_profile(profile, question_scheduler.queue_depth)
+        return await question_scheduler.submit_many([tuple(pair) for pair in pairs], group=group)
+
+    async def extract_keywords(self, original_list, summarized_list):
+        """Extract keywords common to each chunk and its summary.
+
+        Returns:
+            list(list(str)): keywords per chunk.
+        """
+        return await run_in_inference_executor(
+            inference_handler.extract_keywords, original_list, summarized_list)
+
+    async def generate_false_answers(self, filtered_kws):
+        """Pick correct answers and distractors from the keywords of each chunk.
+
+        Returns:
+            tuple(list(str), list(list(str))): correct answers and all answers.
+        """
+        crct_ans, all_answers = await run_in_inference_executor(
+            inference_handler.generate_false_answers, filtered_kws)
+        return crct_ans, all_answers
+
+    async def model_status(self):
+        """Return load state of every model in this process.
+
+        Returns:
+            dict: status per model name.
+        """
+        return model_status()
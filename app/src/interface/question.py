@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 
 class AllAns(BaseModel):
     """All answers model."""
@@ -17,15 +17,19 @@ class IUpdateQuestion(BaseModel):
 
 # body classes for req n' res
 # pylint: disable=too-few-public-methods
+DecodingProfile = Literal['fast', 'balanced', 'quality']
+
 class ModelInput(BaseModel):
     """General request model structure for flutter incoming req."""
     uid: Optional[str] = None
     context: str
     name: str
+    profile: Optional[DecodingProfile] = None
 
 class ICreateQuestion(BaseModel):
     context: str
     name: str
+    profile: Optional[DecodingProfile] = None
 
 class IExportQuestion(BaseModel):
     """Request model for exporting questions."""
@@ -0,0 +1,173 @@
+"""
+Dedicated executor for CPU-bound inference stages.
+
+Model calls run here instead of inside ``async def`` handlers, so the event
+loop keeps serving login, listing and rating while a document is generated.
+``INFERENCE_EXECUTOR`` selects a ``thread`` pool (models shared with the API
+process) or a ``process`` pool (each worker process loads its own models).
+Each process of a ``process`` pool is warmed up by a task of its own.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src import config
+
+_executor = None
+_workers = 0
+
+# set in every process of a process pool, see ``run_on_every_inference_worker``
+_rendezvous = None
+
+# models of the pipeline stages that run on the inference executor
+STAGE_MODELS = ('SUMMARIZER', 'KEYWORD_EXTRACTOR', 'FALSE_ANS_GEN', 'QUESTION_GEN')
+
+
+def make_process_pool(workers, initializer=None, initargs=()):
+    """Return a process pool of ``workers`` spawned processes.
+
+    Args:
+        workers (int): worker processes.
+        initializer (callable, optional): run in every worker process when it starts.
+        initargs (tuple, optional): arguments of ``initializer``.
+
+    Returns:
+        ProcessPoolExecutor: new pool.
+    """
+    # spawn: forking after torch started its OpenMP threads can deadlock
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=initializer, initargs=initargs)
+
+
+def _set_rendezvous(barrier):
+    """Keep the barrier shared by all processes of the inference pool."""
+    global _rendezvous  # pylint: disable=global-statement
+    _rendezvous = barrier
+
+
+def _pinned(fn, timeout):
+    """Wait until every pool process holds one of these tasks, then run ``fn``.
+
+    A process blocked at the barrier cannot pick up a second task, so each
+    of the pool's tasks runs in a different process.
+    """
+    try:
+        _rendezvous.wait(timeout)
+    except threading.BrokenBarrierError:
+        logging.warning("Not every inference worker started in time; "
+                        "some may run this task twice and others not at all")
+    return fn()
+
+
+def default_inference_workers():
+    """Return one thread per replica of every pipeline stage's model.
+
+    Each stage of a document pipeline (and each scheduler, per replica) has
+    a call in flight, so fewer threads would run the stages one after another.
+
+    Returns:
+        int: thread count.
+    """
+    return sum(config.model_replicas(prefix) for prefix in STAGE_MODELS)
+
+
+def get_inference_executor():
+    """Return the process-wide inference executor, creating it on first use."""
+    global _executor, _workers  # pylint: disable=global-statement
+    if _executor is None:
+        kind = config.get_str('INFERENCE_EXECUTOR', 'thread')
+        # every process of a process pool loads its own models, so default to one
+        workers = config.get_int(
+            'INFERENCE_WORKERS', default_inference_workers() if kind == 'thread' else 1)
+
+        if kind == 'thread':
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+        elif kind == 'process':
+            barrier = multiprocessing.get_context('spawn').Barrier(workers)
+            _executor = make_process_pool(workers, _set_rendezvous, (barrier,))
+        else:
+            raise ValueError(f"INFERENCE_EXECUTOR must be 'thread' or 'process', got '{kind}'")
+
+        _workers = workers
+        logging.info(f"Inference executor: {kind} pool with {workers} worker(s)")
+    return _executor
+
+
+async def run_in_inference_executor(fn, *args, **kwargs):
+    """Run a CPU-bound inference function on the inference executor.
+
+    With a process pool ``fn`` and its arguments must be picklable, so pass
+    module-level functions (see ``inference_handler``) instead of bound model methods.
+
+    Args:
+        fn (callable): function to run.
+
+    Returns:
+        any: return value of ``fn``.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_inference_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_on_every_inference_worker(fn, timeout=300):
+    """Run a function once in every process of the inference executor, e.g. a warm-up.
+
+    Threads share the models of this process, so a thread pool runs ``fn`` once.
+
+    Args:
+        fn (callable): picklable function without arguments.
+        timeout (float, optional): seconds to wait for every process to start
+            before running ``fn`` anyway. Defaults to 300.
+
+    Returns:
+        list: return value of ``fn`` per process.
+    """
+    executor = get_inference_executor()
+    if not isinstance(executor, ProcessPoolExecutor):
+        return [await run_in_inference_executor(fn)]
+    loop = asyncio.get_running_loop()
+    return list(await asyncio.gather(*(
+        loop.run_in_executor(executor, _pinned, fn, timeout) for _ in range(_workers))))
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run blocking I/O (e.g. translation requests) on the default thread pool.
+
+    Args:
+        fn (callable): function to run.
+
+    Returns:
+        any: return value of ``fn``.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+async def iterate_blocking(iterator):
+    """Pull items from a blocking iterator (e.g. a PDF page reader) on the default thread pool.
+
+    Args:
+        iterator (iterator): iterator whose ``next`` may block.
+
+    Yields:
+        any: items of ``iterator``, one ``next`` call at a time.
+    """
+    done = object()
+    while (item := await run_blocking(next, iterator, done)) is not done:
+        yield item
+
+
+def shutdown_inference_executor():
+    """Stop the inference executor, waiting for running stages to finish."""
+    global _executor  # pylint: disable=global-statement
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+# models of the pipeline stages that run on the inference executor
+STAGE_MODELS = ('SUMMARIZER', 'KEYWORD_EXTRACTOR', 'FALSE_ANS_GEN', 'QUESTION_GEN')
@@ -0,0 +1,165 @@
+"""
+Lazily resolved model handles.
+
+A handle stands in for a model singleton: it builds the model on first
+attribute access (or in the background warm-up) and reports its load state,
+so importing ``src.loaders`` never blocks on loading weights. A handle with
+a warm-up inference stays ``loaded`` until that inference has run, and only
+then turns ``ready``. A handle can be unloaded to free memory and is rebuilt
+on its next use.
+"""
+
+import logging
+import threading
+import time
+
+PENDING = 'pending'
+LOADING = 'loading'
+LOADED = 'loaded'
+WARMING = 'warming'
+READY = 'ready'
+FAILED = 'failed'
+EVICTED = 'evicted'
+
+
+class LazyModel:
+    """Build a model on first use and proxy attribute access to it."""
+
+    def __init__(self, name, factory, warm_up=None):
+        """Initialize handle.
+
+        Args:
+            name (str): model name used in logs and status reports.
+            factory (callable): builds the model, takes no arguments.
+            warm_up (callable, optional): runs one dummy inference on the built model.
+        """
+        self.name = name
+        self.state = PENDING
+        self.error = None
+        self.load_seconds = None
+        self.warm_up_seconds = None
+        self.reloads = 0
+        self.evictions = 0
+        self.reload_seconds = 0.0
+        # set by ModelManager, which is told about every use and load
+        self.manager = None
+
+        self._factory = factory
+        self._warm_up = warm_up
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the model, building it if needed (thread-safe).
+
+        Returns:
+            any: model instance.
+        """
+        instance = self._instance
+        if instance is not None:
+            if self.manager is not None:
+                self.manager.touch(self)
+            return instance
+
+        with self._lock:
+            if self._instance is None:
+                reload = self.state == EVICTED
+                if self.manager is not None:
+                    self.manager.loading(self)
+                self.state = LOADING
+                start = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                except Exception as err:
+                    self.state = FAILED
+                    self.error = str(err)
+                    logging.error(f"Loading {self.name} failed: {err}")
+                    if self.manager is not None:
+                        self.manager.load_failed(self)
+                    raise
+                self.load_seconds = time.perf_counter() - start
+                self.error = None
+                # a reload after eviction was warmed up before
+                self.state = LOADED if self.__needs_warm_up() else READY
+                if reload:
+                    self.reloads += 1
+                    self.reload_seconds += self.load_seconds
+                action = 'reloaded' if reload else 'loaded'
+                logging.info(f"{self.name} {action} in {self.load_seconds:.1f}s")
+                if self.manager is not None:
+                    self.manager.loaded(self)
+            return self._instance
+
+    def unload(self):
+        """Drop the model so its memory can be freed; the next use rebuilds it.
+
+        Never blocks: a handle that is being loaded right now is left alone.
+        Calls already running on the model keep it alive until they return.
+
+        Returns:
+            bool: whether the model was unloaded.
+        """
+        if not self._lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+            return False
+        try:
+            if self._instance is None:
+                return False
+            self._instance = None
+            self.state = EVICTED
+            self.evictions += 1
+            logging.info(f"{self.name} unloaded")
+            return True
+        finally:
+            self._lock.release()
+
+    @property
+    def loaded(self):
+        """bool: whether the model is in memory."""
+        return self._instance is not None
+
+    def __needs_warm_up(self):
+        return self._warm_up is not None and self.warm_up_seconds is None
+
+    def warm_up(self):
+        """Load the model and run one dummy inference to warm its caches.
+
+        The handle turns ``ready`` only once the inference has run; a failing
+        warm-up marks it ``failed``.
+        """
+        model = self.get()
+        if not self.__needs_warm_up():
+            return
+        self.state = WARMING
+        start = time.perf_counter()
+        try:
+            self._warm_up(model)
+        except Exception as err:
+            self.state = FAILED
+            self.error = str(err)
+            raise
+        self.warm_up_seconds = time.perf_counter() - start
+        # an eviction during warm-up wins
+        if self.state == WARMING:
+            self.state = READY
+
+    def status(self):
+        """Return load state and timings.
+
+        Returns:
+            dict: state, error and timings in seconds.
+        """
+        return {
+            'state': self.state,
+            'error': self.error,
+            'load_seconds': self.load_seconds,
+            'warm_up_seconds': self.warm_up_seconds,
+            'evictions': self.evictions,
+            'reloads': self.reloads,
+            'reload_seconds': self.reload_seconds,
+        }
+
+    def __getattr__(self, attr):
+        """Proxy everything else to the model, loading it on first use."""
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
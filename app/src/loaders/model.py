@@ -1,10 +1,174 @@
-from src.ansgenerator.false_answer_generator import FalseAnswerGenerator
-from src.model.abstractive_summarizer import AbstractiveSummarizer
-from src.model.question_generator import QuestionGenerator
-from src.model.keyword_extractor import KeywordExtractor
+"""
+Model singletons shared by the pipeline.
+
+Every model is a lazily resolved handle: importing this module loads no
+weights. A model is built on first use or by ``warm_up_models``, which the
+app runs in the background at startup. With ``MODEL_PRELOAD`` the gunicorn
+master builds them with ``preload_models`` before forking its workers.
+"""
+
+import gc
+import logging
+
+from src import config
+from src.inferencehandler import inference_handler
+from src.inferencehandler.batch_scheduler import BatchScheduler
+from src.loaders.executor import get_inference_executor
+from src.loaders.lazy_model import (
+    LazyModel, PENDING, LOADING, LOADED, WARMING, READY, FAILED, EVICTED)
+from src.loaders.model_manager import ModelManager
+from src.loaders.model_pool import ModelPool, parse_cpus
+
+WARM_UP_TEXT = ("Natural language processing enables computers to understand human "
+                "language. It is used in translation, search and question answering.")
+
+
+# pylint: disable=import-outside-toplevel
+def _build_summarizer():
+    from src.model.abstractive_summarizer import AbstractiveSummarizer
+    return AbstractiveSummarizer()
+
+
+def _build_question_gen():
+    from src.model.question_generator import QuestionGenerator
+    return QuestionGenerator()
+
+
+def _build_false_ans_gen():
+    from src.ansgenerator.false_answer_generator import FalseAnswerGenerator
+    return FalseAnswerGenerator()
+
+
+def _build_keyword_extractor():
+    from src.model.keyword_extractor import KeywordExtractor
+    return KeywordExtractor()
+
+
+def _handle(name, prefix, factory, warm_up):
+    """Return a single lazy model, or a replica pool when ``{prefix}_REPLICAS`` > 1."""
+    replicas = config.model_replicas(prefix)
+    if replicas == 1:
+        return LazyModel(name, factory, warm_up=warm_up)
+
+    cpus = config.model_setting(prefix, 'CPUS')
+    return ModelPool(name, factory, replicas=replicas, warm_up=warm_up,
+                     cpus=parse_cpus(cpus) if cpus else None)
+
 
 # initialize question and ans models
-summarizer = AbstractiveSummarizer()
-question_gen = QuestionGenerator()
-false_ans_gen = FalseAnswerGenerator()
-keyword_extractor = KeywordExtractor()
\ No newline at end of file
+summarizer = _handle(
+    'summarizer', 'SUMMARIZER', _build_summarizer,
+    warm_up=lambda model: model.summarize(WARM_UP_TEXT))
+question_gen = _handle(
+    'question_gen', 'QUESTION_GEN', _build_question_gen,
+    warm_up=lambda model: model.generate(WARM_UP_TEXT, 'computers'))
+false_ans_gen = _handle(
+    'false_ans_gen', 'FALSE_ANS_GEN', _build_false_ans_gen,
+    warm_up=lambda model: model.get_output([['computer']]))
+keyword_extractor = _handle(
+    'keyword_extractor', 'KEYWORD_EXTRACTOR', _build_keyword_extractor,
+    warm_up=lambda model: model.filter_keywords(WARM_UP_TEXT, WARM_UP_TEXT))
+
+MODELS = (summarizer, question_gen, false_ans_gen, keyword_extractor)
+
+# keep the loaded models within MODEL_MEMORY_BUDGET_MB by evicting idle ones
+model_manager = None
+if config.get_int('MODEL_MEMORY_BUDGET_MB', 0) > 0:
+    model_manager = ModelManager(
+        [replica.handle for handle in MODELS if isinstance(handle, ModelPool)
+         for replica in handle.replicas]
+        + [handle for handle in MODELS if isinstance(handle, LazyModel)],
+        budget_bytes=config.get_int('MODEL_MEMORY_BUDGET_MB', 0) * 1024 * 1024)
+
+# merge concurrent requests into batched generate() calls
+# with similar-length inputs regrouped so batches pad little
+summarizer_scheduler = BatchScheduler(
+    inference_handler.summarize_batch, name='summarizer',
+    executor=get_inference_executor(), length=len,
+    **config.scheduler_settings('SUMMARIZER'))
+question_scheduler = BatchScheduler(
+    inference_handler.generate_question_batch, name='question_gen',
+    executor=get_inference_executor(), length=lambda pair: len(pair[0]) + len(pair[1]),
+    **config.scheduler_settings('QUESTION_GEN'))
+
+
+def model_status():
+    """Return load state of every model handle in this process.
+
+    Returns:
+        dict: status per model name.
+    """
+    return {handle.name: handle.status() for handle in MODELS}
+
+
+def combine_model_status(statuses):
+    """Return the least advanced status of every model across worker processes.
+
+    Args:
+        statuses (list(dict)): ``model_status`` of each process.
+
+    Returns:
+        dict: status per model name.
+    """
+    order = (FAILED, PENDING, LOADING, LOADED, WARMING, EVICTED, READY)
+    combined = {}
+    for process in statuses:
+        for name, status in process.items():
+            if name not in combined or (order.index(status['state'])
+                                        < order.index(combined[name]['state'])):
+                combined[name] = status
+    return combined
+
+
+def pool_stats():
+    """Return utilization and wait times of every replica pool in this process.
+
+    Returns:
+        dict: pool stats per model name.
+    """
+    return {handle.name: handle.stats() for handle in MODELS if isinstance(handle, ModelPool)}
+
+
+def memory_stats():
+    """Return memory budget use, evictions and reload costs in this process.
+
+    Returns:
+        dict: model manager stats, empty without a memory budget.
+    """
+    return model_manager.stats() if model_manager is not None else {}
+
+
+def warm_up_models():
+    """Load every model and run one dummy inference on each.
+
+    A failing model is logged and reported but does not stop the others.
+
+    Returns:
+        dict: status per model name after warm-up.
+    """
+    for handle in MODELS:
+        if handle.warm_up_seconds is not None:
+            continue
+        try:
+            handle.warm_up()
+        except Exception as err:  # pylint: disable=broad-except
+            logging.error(f"Warm-up of {handle.name} failed: {err}")
+    logging.info(f"Models ready: {[h.name for h in MODELS if h.state == READY]}")
+    return model_status()
+
+
+def preload_models():
+    """Load every model in this process so forked workers share the weights.
+
+    Only the weights are loaded: running inference here would start torch's
+    OpenMP thread pool, which does not survive ``fork``. Workers warm up after
+    forking. Tensor storage and numpy vector buffers live outside Python
+    objects, so workers only copy a page when they write to it. ``gc.freeze``
+    keeps the collector from writing to the headers of every object loaded
+    so far, which would otherwise copy those pages in every worker.
+    """
+    for handle in MODELS:
+        handle.get()
+    gc.collect()
+    gc.freeze()
+    logging.info(f"Preloaded {len(MODELS)} models, {gc.get_freeze_count()} objects frozen")
@@ -0,0 +1,143 @@
+"""
+Memory budget for the model handles of this process.
+
+Small nodes cannot keep every model resident. ``ModelManager`` watches the
+``LazyModel`` handles it manages, charges each loaded model the resident
+memory its load added, and unloads least recently used models whenever the
+total would exceed ``MODEL_MEMORY_BUDGET_MB``. An evicted model is rebuilt
+on its next use, so every pipeline stage keeps working at the cost of the
+reload, which is recorded per model.
+"""
+
+import ctypes
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+
+def rss_bytes():
+    """Return the resident memory of this process."""
+    # pylint: disable=import-outside-toplevel
+    import psutil
+    return psutil.Process().memory_info().rss
+
+
+def release_memory():
+    """Collect garbage and hand freed heap pages back to the OS (glibc only)."""
+    gc.collect()
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class ModelManager:
+    """Evict least recently used models to stay within a memory budget."""
+
+    def __init__(self, handles, budget_bytes, measure=rss_bytes, release=release_memory):
+        """Initialize manager and attach it to every handle.
+
+        Args:
+            handles (list(LazyModel)): handles to manage.
+            budget_bytes (int): memory the loaded models may use together.
+            measure (callable, optional): returns the resident bytes of the process.
+            release (callable, optional): frees memory after an eviction.
+        """
+        self.budget_bytes = budget_bytes
+        self.handles = list(handles)
+
+        self._measure = measure
+        self._release = release
+        self._lock = threading.RLock()
+        # one load at a time, so the memory a load adds is attributed to it alone
+        self._load_lock = threading.Lock()
+        self._before = None
+        self._sizes = {}
+        self._lru = OrderedDict()
+        self._counters = {'evictions': 0, 'eviction_seconds': 0.0, 'over_budget': 0}
+
+        for handle in self.handles:
+            handle.manager = self
+            if handle.loaded:
+                self._lru[handle.name] = handle
+
+    @property
+    def used_bytes(self):
+        """int: memory charged to the models that are loaded right now."""
+        with self._lock:
+            return sum(self._sizes.get(name, 0) for name in self._lru)
+
+    def touch(self, handle):
+        """Mark a model as just used."""
+        with self._lock:
+            if handle.name in self._lru:
+                self._lru.move_to_end(handle.name)
+
+    def loading(self, handle):
+        """Make room before a model loads, using its size from an earlier load."""
+        self._load_lock.acquire()  # pylint: disable=consider-using-with
+        try:
+            self.__evict(self._sizes.get(handle.name, 0), keep=handle)
+            self._before = self._measure()
+        except BaseException:
+            self._load_lock.release()
+            raise
+
+    def loaded(self, handle):
+        """Charge a freshly loaded model and evict others if it broke the budget."""
+        try:
+            size = max(0, self._measure() - self._before)
+            with self._lock:
+                self._sizes[handle.name] = size
+                self._lru[handle.name] = handle
+                self._lru.move_to_end(handle.name)
+            self.__evict(0, keep=handle)
+        finally:
+            self._load_lock.release()
+
+    def load_failed(self, handle):  # pylint: disable=unused-argument
+        """Let the next load start after a failed one."""
+        self._load_lock.release()
+
+    def __evict(self, incoming, keep):
+        """Unload least recently used models until ``incoming`` more bytes fit."""
+        with self._lock:
+            candidates = [h for h in self._lru.values() if h is not keep]
+            while self.used_bytes + incoming > self.budget_bytes and candidates:
+                victim = candidates.pop(0)
+                start = time.perf_counter()
+                if victim.unload():
+                    del self._lru[victim.name]
+                    self._release()
+                    self._counters['evictions'] += 1
+                    self._counters['eviction_seconds'] += time.perf_counter() - start
+                    logging.info(f"Evicted {victim.name} ({self._sizes[victim.name] >> 20}MB) "
+                                 f"to fit {keep.name}")
+            if self.used_bytes + incoming > self.budget_bytes:
+                self._counters['over_budget'] += 1
+                logging.warning(f"{keep.name} does not fit in the model memory budget "
+                                f"({self.budget_bytes >> 20}MB), loading it anyway")
+
+    def stats(self):
+        """Return budget use, eviction counters and the reload cost of every model.
+
+        Returns:
+            dict: manager counters and per-model sizes and reload costs.
+        """
+        with self._lock:
+            return {
+                'budget_bytes': self.budget_bytes,
+                'used_bytes': self.used_bytes,
+                **self._counters,
+                'models': {
+                    handle.name: {
+                        'loaded': handle.name in self._lru,
+                        'size_bytes': self._sizes.get(handle.name),
+                        'evictions': handle.evictions,
+                        'reloads': handle.reloads,
+                        'reload_seconds': handle.reload_seconds,
+                    } for handle in self.handles
+                },
+            }
@@ -0,0 +1,273 @@
+"""
+Pools of model replicas for concurrent inference.
+
+Concurrent ``generate()`` calls on one model fight over the same intra-op
+threads. A pool holds N replicas of a model instead; each runs on its own
+thread, pinned to a slice of the CPUs with ``sched_setaffinity`` and using
+as many torch threads as its slice has cores. Callers check a replica out,
+run on it and check it back in, waiting when every replica is busy.
+
+A pool stands in for a ``LazyModel`` handle: method calls on it are routed
+through a free replica, so code calling ``summarizer.summarize_batch(...)``
+does not change.
+"""
+
+import contextlib
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.loaders.lazy_model import LazyModel, PENDING, LOADING, LOADED, WARMING, READY, FAILED
+
+
+def parse_cpus(spec):
+    """Parse a CPU list such as ``0-7,16-23``.
+
+    Args:
+        spec (str): comma separated CPU ids and ranges.
+
+    Returns:
+        list(int): sorted CPU ids.
+    """
+    cpus = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        cpus.update(range(int(first), int(last or first) + 1))
+    return sorted(cpus)
+
+
+def split_cpus(cpus, parts):
+    """Split CPUs into ``parts`` contiguous slices of (nearly) equal size.
+
+    With fewer CPUs than parts, slices wrap around and share CPUs.
+
+    Returns:
+        list(list(int)): CPU slice per part.
+    """
+    cpus = list(cpus)
+    if len(cpus) < parts:
+        return [[cpus[i % len(cpus)]] for i in range(parts)]
+    size, extra = divmod(len(cpus), parts)
+    slices, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        slices.append(cpus[start:end])
+        start = end
+    return slices
+
+
+def set_torch_threads(count):
+    """Set the intra-op thread count of torch for the calling thread."""
+    # pylint: disable=import-outside-toplevel
+    import torch
+    torch.set_num_threads(count)
+
+
+class Replica:
+    """One model replica with its dedicated, CPU-pinned thread."""
+
+    def __init__(self, handle, cpus, set_threads):
+        """Initialize replica.
+
+        Args:
+            handle (LazyModel): builds the replica's model.
+            cpus (list(int)): CPUs the replica's thread is pinned to.
+            set_threads (callable): sets the intra-op thread count, takes the count.
+        """
+        self.handle = handle
+        self.cpus = cpus
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=handle.name,
+            initializer=self.__pin, initargs=(set_threads,))
+
+    def __pin(self, set_threads):
+        """Pin the replica thread; OpenMP workers it starts inherit the affinity."""
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, self.cpus)
+        set_threads(len(self.cpus))
+
+    def call(self, fn, *args, **kwargs):
+        """Run ``fn(model, *args, **kwargs)`` on the replica thread and wait for it."""
+        return self._executor.submit(
+            lambda: fn(self.handle.get(), *args, **kwargs)).result()
+
+    def shutdown(self):
+        """Stop the replica thread."""
+        self._executor.shutdown(wait=True)
+
+
+class ModelPool:
+    """N replicas of a model with checkout / checkin semantics."""
+
+    def __init__(self, name, factory, replicas=1, warm_up=None, cpus=None,
+                 set_threads=set_torch_threads):
+        """Initialize pool.
+
+        Args:
+            name (str): model name used in logs and status reports.
+            factory (callable): builds one replica, takes no arguments.
+            replicas (int, optional): number of replicas. Defaults to 1.
+            warm_up (callable, optional): runs one dummy inference on a replica.
+            cpus (list(int), optional): CPUs shared out between replicas.
+                Defaults to the CPUs this process may run on.
+            set_threads (callable, optional): sets the intra-op thread count of
+                a replica thread. Defaults to ``torch.set_num_threads``.
+        """
+        if replicas < 1:
+            raise ValueError(f"replicas must be at least 1, got {replicas}")
+        if cpus is None:
+            cpus = (sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity')
+                    else list(range(os.cpu_count() or 1)))
+
+        self.name = name
+        self.replicas = [
+            Replica(LazyModel(f'{name}[{i}]', factory, warm_up), slice_, set_threads)
+            for i, slice_ in enumerate(split_cpus(cpus, replicas))]
+
+        self._free = queue.Queue()
+        for replica in self.replicas:
+            self._free.put(replica)
+
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._waiting = 0
+        self._counters = {'checkouts': 0, 'timeouts': 0, 'wait_seconds': 0.0,
+                          'max_wait_seconds': 0.0, 'busy_seconds': 0.0}
+
+    @contextlib.contextmanager
+    def checkout(self, timeout=None):
+        """Borrow a free replica for the duration of a ``with`` block.
+
+        Args:
+            timeout (float, optional): seconds to wait for a free replica. Waits forever when None.
+
+        Yields:
+            Replica: replica reserved for the caller.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self._waiting += 1
+        try:
+            replica = self._free.get(timeout=timeout)
+        except queue.Empty:
+            with self._lock:
+                self._counters['timeouts'] += 1
+            raise TimeoutError(f"no {self.name} replica free after {timeout}s") from None
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        checked_out = time.perf_counter()
+        wait = checked_out - start
+        with self._lock:
+            self._counters['checkouts'] += 1
+            self._counters['wait_seconds'] += wait
+            self._counters['max_wait_seconds'] = max(self._counters['max_wait_seconds'], wait)
+        try:
+            yield replica
+        finally:
+            with self._lock:
+                self._counters['busy_seconds'] += time.perf_counter() - checked_out
+            self._free.put(replica)
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """Run ``fn(model, *args, **kwargs)`` on a free replica.
+
+        Args:
+            fn (callable): takes the replica's model first.
+            timeout (float, optional): seconds to wait for a free replica.
+
+        Returns:
+            any: return value of ``fn``.
+        """
+        with self.checkout(timeout) as replica:
+            return replica.call(fn, *args, **kwargs)
+
+    def get(self):
+        """Load every replica and return the first one's model."""
+        for replica in self.replicas:
+            replica.handle.get()
+        return self.replicas[0].handle.get()
+
+    @property
+    def loaded(self):
+        """bool: whether every replica is in memory."""
+        return all(replica.handle.loaded for replica in self.replicas)
+
+    @property
+    def state(self):
+        """str: least advanced load state of the replicas."""
+        states = {replica.handle.state for replica in self.replicas}
+        for state in (FAILED, PENDING, LOADING, LOADED, WARMING):
+            if state in states:
+                return state
+        return READY
+
+    @property
+    def warm_up_seconds(self):
+        """float: slowest replica warm-up, None until every replica is warmed up."""
+        seconds = [replica.handle.warm_up_seconds for replica in self.replicas]
+        return None if None in seconds else max(seconds)
+
+    def warm_up(self):
+        """Load and warm up every replica on its own pinned thread."""
+        for replica in self.replicas:
+            replica.call(lambda _, handle=replica.handle: handle.warm_up())
+
+    def stats(self):
+        """Return utilization and checkout wait times.
+
+        Returns:
+            dict: pool counters.
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            checkouts = self._counters['checkouts']
+            return {
+                'name': self.name,
+                'replicas': len(self.replicas),
+                'cpus': [replica.cpus for replica in self.replicas],
+                'in_use': len(self.replicas) - self._free.qsize(),
+                'waiting': self._waiting,
+                **self._counters,
+                'mean_wait_seconds': self._counters['wait_seconds'] / checkouts if checkouts else 0.0,
+                'utilization': self._counters['busy_seconds'] / (elapsed * len(self.replicas)),
+            }
+
+    def status(self):
+        """Return load state and timings of every replica.
+
+        Returns:
+            dict: aggregated state plus per-replica status.
+        """
+        errors = [replica.handle.error for replica in self.replicas if replica.handle.error]
+        load_seconds = [replica.handle.load_seconds for replica in self.replicas]
+        return {
+            'state': self.state,
+            'error': errors[0] if errors else None,
+            'load_seconds': None if None in load_seconds else sum(load_seconds),
+            'warm_up_seconds': self.warm_up_seconds,
+            'replicas': [replica.handle.status() for replica in self.replicas],
+        }
+
+    def shutdown(self):
+        """Stop every replica thread."""
+        for replica in self.replicas:
+            replica.shutdown()
+
+    def __getattr__(self, attr):
+        """Route model method calls through a free replica, loading replicas on first use."""
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        value = getattr(self.get(), attr)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            return self.run(lambda model: getattr(model, attr)(*args, **kwargs))
+        return call
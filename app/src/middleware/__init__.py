@@ -1 +1 @@
-from .authority import JWTBearer
\ No newline at end of file
+from .authority import JWTBearer, bearer_uid
\ No newline at end of file
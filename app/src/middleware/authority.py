@@ -7,6 +7,24 @@ import jwt
 
 from models import User
 
+JWT_SECRET = "your_jwt_secret"
+
+
+def bearer_uid(scope) -> str:
+    """Return the uid of the bearer token of an ASGI request, or the client address.
+
+    Used to key per-user limits before the route dependencies run.
+    """
+    headers = dict(scope.get('headers') or [])
+    scheme, _, token = headers.get(b'authorization', b'').decode('latin-1').partition(' ')
+    if scheme == 'Bearer':
+        try:
+            return str(jwt.decode(token, JWT_SECRET, algorithms=["HS256"]).get("uid"))
+        except jwt.InvalidTokenError:
+            pass
+    client = scope.get('client')
+    return client[0] if client else ''
+
 class JWTBearer(HTTPBearer):
     def __init__(self, db: AsyncSession, auto_error: bool = True):
         super(JWTBearer, self).__init__(auto_error=auto_error)
@@ -26,7 +44,7 @@ class JWTBearer(HTTPBearer):
 
     async def verify_jwt(self, token: str) -> User:
         try:
-            payload = jwt.decode(token, "your_jwt_secret", algorithms=["HS256"])
+            payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
             uid = payload.get("uid")
 
             query = select(User).where(User.id == uid)
@@ -3,17 +3,33 @@
 @Author: Karthick T. Sharma
 """
 
+from src import config
 from .model import Model
+from .decoding import get_profile
 from ..textprocessor import postprocess, preprocess
 
 
 class AbstractiveSummarizer(Model):
     """Summarize input context."""
 
-    def __init__(self):
-        """Initialize corpus summarizer."""
+    default_profile = 'balanced'
+    token_max_length = 256
+
+    def __init__(self, backend=None, precision=None, draft_model=None):
+        """Initialize corpus summarizer.
+
+        Args:
+            backend (str, optional): inference backend. Defaults to ``SUMMARIZER_BACKEND``.
+            precision (str, optional): weight precision. Defaults to ``SUMMARIZER_PRECISION``.
+            draft_model (str, optional): draft model of assisted greedy decoding.
+                Defaults to ``SUMMARIZER_DRAFT_MODEL``.
+        """
         # NOTE: Default
-        super().__init__(model_name='google-t5/t5-base')
+        super().__init__(model_name='google-t5/t5-base',
+                         backend=backend or config.model_setting('SUMMARIZER', 'BACKEND'),
+                         precision=precision or config.model_setting('SUMMARIZER', 'PRECISION'),
+                         draft_model=(draft_model
+                                      or config.model_setting('SUMMARIZER', 'DRAFT_MODEL')))
         # super().__init__(model_name='t5-base', path_id='1-50SZ_WIHX4A6mkpsz-t0EAF_VhtHb-9')
         # super().__init__(model_name='t5-small', path_id='1ODslrpbSXB0HWAGymYmyJn5nFO8GELpd')
 
@@ -26,17 +42,49 @@ class AbstractiveSummarizer(Model):
         Returns:
             list(str): processed text chunks.
         """
-        return preprocess.split_text(model_input)
+        return list(self.iter_chunks(model_input))
+
+    def iter_chunks(self, model_input):
+        """Split text into chunks whose summarizer prompt fits ``token_max_length``.
+
+        Args:
+            model_input (str): bulk text that needs to be processed.
+
+        Yields:
+            str: processed text chunk.
+        """
+        return preprocess.iter_chunks(
+            model_input, max_tokens=self.token_max_length,
+            count_tokens=lambda texts: self.count_tokens(
+                [f'summarize: {text}' for text in texts]),
+            overlap=config.get_int('SUMMARIZER_CHUNK_OVERLAP', 0))
 
-    def summarize(self, context):
+    def summarize(self, context, profile=None):
         """Generate abstrative summary of given context.
 
         Args:
             context (str): input corpus.
+            profile (str, optional): decoding profile. Defaults to ``default_profile``.
 
         Returns:
            str: summarized text.
         """
-        return postprocess.postprocess_summary(super().inference(
-            num_beams=3, no_repeat_ngram_size=2, model_max_length=512,
-            num_return_sequences=1, summarize=context))
+        return self.summarize_batch([context], profile)[0]
+
+    def summarize_batch(self, contexts, profile=None):
+        """Generate abstrative summaries of several contexts in one batched pass.
+
+        Args:
+            contexts (list(str)): input corpora.
+            profile (str, optional): decoding profile. Defaults to ``default_profile``.
+
+        Returns:
+           list(str): summarized text per context, in input order.
+        """
+        settings = get_profile(profile or self.default_profile)
+        outputs = super().inference_batch(
+            [{'summarize': context} for context in contexts],
+            num_beams=settings['num_beams'], no_repeat_ngram_size=2, model_max_length=512,
+            num_return_sequences=1, token_max_length=self.token_max_length,
+            early_stopping=settings['early_stopping'], length_ratio=settings['length_ratio'])
+        return [postprocess.postprocess_summary(output) for output in outputs]
@@ -0,0 +1,137 @@
+"""
+This module resolves model names to a local artifact store.
+
+The store lives in ``ARTIFACT_DIR`` (``resources/artifacts``). Its
+``manifest.json`` maps the logical name code asks for (a hub name such as
+``google-t5/t5-base``) to a directory inside the store holding the tokenizer,
+config and safetensors weights. safetensors files are memory-mapped on load,
+so starting a worker pages the weights in instead of deserializing a copy.
+
+Once the manifest exists the service runs offline: the Hugging Face hub
+clients are switched to offline mode and a model missing from the store is an
+error instead of a download. ``python -m scripts.build_artifacts`` fills the
+store.
+"""
+
+import json
+import os
+import tempfile
+
+from src import config
+
+MANIFEST_NAME = 'manifest.json'
+NLTK_DIR = 'nltk_data'
+
+
+def store_dir():
+    """Return the root directory of the artifact store."""
+    return config.get_str('ARTIFACT_DIR', os.path.join('resources', 'artifacts'))
+
+
+def manifest_path():
+    """Return the path of the store manifest."""
+    return os.path.join(store_dir(), MANIFEST_NAME)
+
+
+def load_manifest():
+    """Read the store manifest.
+
+    Returns:
+        dict: entry per logical model name, empty when the store was never built.
+    """
+    try:
+        with open(manifest_path(), encoding='utf-8') as file:
+            return json.load(file)['models']
+    except FileNotFoundError:
+        return {}
+
+
+def offline():
+    """bool: whether models must come from the store (``MODEL_OFFLINE``).
+
+    Defaults to True as soon as the store has a manifest.
+    """
+    return config.get_bool('MODEL_OFFLINE', os.path.isfile(manifest_path()))
+
+
+def enable_offline_mode():
+    """Stop the Hugging Face clients from reaching the hub when running offline.
+
+    Must run before ``transformers`` or ``huggingface_hub`` is imported, since
+    both read these variables once at import time.
+    """
+    if offline():
+        os.environ.setdefault('HF_HUB_OFFLINE', '1')
+        os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+        os.environ.setdefault('HF_HUB_DISABLE_TELEMETRY', '1')
+
+
+def resolve(name, fallback=None):
+    """Return where a model should be loaded from.
+
+    Args:
+        name (str): logical model name.
+        fallback (str, optional): location used outside the store when online.
+            Defaults to ``name`` itself (a hub name).
+
+    Returns:
+        str: local directory inside the store, or ``fallback`` when the model
+        is not stored and the service is online.
+    """
+    entry = load_manifest().get(name)
+    if entry is not None:
+        path = os.path.join(store_dir(), entry['path'])
+        if os.path.isdir(path):
+            return path
+    if offline():
+        raise FileNotFoundError(
+            f"'{name}' is not in the artifact store {manifest_path()} and MODEL_OFFLINE is set; "
+            "build it with `python -m scripts.build_artifacts`")
+    return name if fallback is None else fallback
+
+
+def register(name, path, kind):
+    """Add or replace a manifest entry.
+
+    The manifest is rewritten atomically, so a worker starting while the store
+    is being built never reads half of it.
+
+    Args:
+        name (str): logical model name.
+        path (str): directory of the artifact, relative to the store root.
+        kind (str): loader the artifact is meant for, e.g. ``seq2seq``.
+    """
+    os.makedirs(store_dir(), exist_ok=True)
+    models = load_manifest()
+    models[name] = {'path': path, 'kind': kind}
+
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir(), suffix='.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        json.dump({'version': 1, 'models': models}, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path())
+
+
+def artifact_dirname(name):
+    """Return the store directory name of a logical model name."""
+    return name.strip('/').replace('/', '--')
+
+
+def ensure_nltk_data(package, resource):
+    """Make an NLTK data package available, downloading it only when online.
+
+    Args:
+        package (str): NLTK package id, e.g. ``punkt_tab``.
+        resource (str): resource path checked with ``nltk.data.find``.
+    """
+    # pylint: disable=import-outside-toplevel
+    import nltk
+
+    local_dir = os.path.abspath(os.path.join(store_dir(), NLTK_DIR))
+    if local_dir not in nltk.data.path:
+        nltk.data.path.insert(0, local_dir)
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        if offline():
+            raise
+        nltk.download(package, quiet=True)
@@ -0,0 +1,181 @@
+"""
+This module loads seq2seq weights for the configured inference backend.
+
+``torch`` runs the plain Hugging Face model. ``onnx`` exports the encoder,
+decoder and decoder-with-past graphs once (the setup fastT5 used to give us),
+caches them on disk and runs ``generate()``/beam search through ONNX Runtime
+on CPU.
+
+Weights come from the local artifact store when it holds the model (see
+``artifacts``), otherwise from the Hugging Face hub.
+
+Each backend can load weights in one of ``PRECISIONS``: full ``fp32``, dynamic
+``int8`` quantization of the linear layers, or ``bf16`` (torch only, on CPUs
+with native bfloat16 support).
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+
+from transformers import AutoModelForSeq2SeqLM
+
+from src import config
+from . import artifacts
+
+BACKENDS = ('torch', 'onnx')
+PRECISIONS = ('fp32', 'int8', 'bf16')
+
+
+def onnx_export_dir(model_name):
+    """Return the cache directory holding exported ONNX graphs of a model.
+
+    Args:
+        model_name (str): Hugging Face model name or path.
+
+    Returns:
+        str: directory path.
+    """
+    cache_dir = config.get_str('ONNX_CACHE_DIR', os.path.join('resources', 'onnx'))
+    return os.path.join(cache_dir, model_name.strip('/').replace('/', '--'))
+
+
+def cpu_supports_bf16():
+    """Check whether the CPU has native bfloat16 instructions (AVX512-BF16 or AMX).
+
+    Returns:
+        bool: True if bf16 matmuls are hardware accelerated.
+    """
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as cpuinfo:
+            flags = cpuinfo.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+
+def load_torch(model_name, precision='fp32'):
+    """Load PyTorch weights for inference.
+
+    Args:
+        model_name (str): Hugging Face model name or path.
+        precision (str, optional): one of ``PRECISIONS``. Defaults to 'fp32'.
+
+    Returns:
+        transformers.PreTrainedModel: model in eval mode.
+    """
+    # pylint: disable=import-outside-toplevel
+    import torch
+
+    source = artifacts.resolve(model_name)
+    # stored weights are safetensors, which from_pretrained memory-maps
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        source, local_files_only=artifacts.offline(),
+        use_safetensors=True if source != model_name else None).eval()
+
+    if precision == 'int8':
+        return torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8)
+    if precision == 'bf16':
+        if not cpu_supports_bf16():
+            logging.warning(f"CPU has no native bf16 support, loading {model_name} in fp32")
+            return model
+        return model.to(torch.bfloat16)
+    return model
+
+
+def quantize_onnx_graphs(src_dir, dst_dir):
+    """Write a copy of exported graphs with int8 dynamically quantized weights.
+
+    Args:
+        src_dir (str): directory holding fp32 ``.onnx`` graphs and configs.
+        dst_dir (str): output directory.
+    """
+    # pylint: disable=import-outside-toplevel
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(dst_dir) or '.')
+    try:
+        for name in os.listdir(src_dir):
+            src = os.path.join(src_dir, name)
+            if name.endswith('.onnx'):
+                quantize_dynamic(src, os.path.join(tmp_dir, name), weight_type=QuantType.QInt8)
+            elif os.path.isfile(src) and not name.endswith('.onnx_data'):
+                shutil.copy(src, tmp_dir)
+        try:
+            os.rename(tmp_dir, dst_dir)
+        except OSError:
+            # another worker finished the same quantization first
+            pass
+    finally:
+        # gone after a successful rename; left over after a failed quantization
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_onnx(model_name, precision='fp32'):
+    """Load exported ONNX graphs, exporting and caching them on first use.
+
+    Args:
+        model_name (str): Hugging Face model name or path.
+        precision (str, optional): 'fp32' or 'int8'. Defaults to 'fp32'.
+
+    Returns:
+        optimum.onnxruntime.ORTModelForSeq2SeqLM: ONNX Runtime model with ``generate()``.
+    """
+    # pylint: disable=import-outside-toplevel
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    if precision == 'bf16':
+        raise ValueError("bf16 is only available for the torch backend")
+
+    export_dir = onnx_export_dir(model_name)
+    options = {'use_cache': True, 'use_merged': False, 'provider': 'CPUExecutionProvider'}
+
+    if not os.path.isfile(os.path.join(export_dir, 'config.json')):
+        logging.info(f"Exporting {model_name} to ONNX in {export_dir} ...")
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            artifacts.resolve(model_name), export=True,
+            local_files_only=artifacts.offline(), **options)
+
+        # export into a temp dir first so concurrent workers never load a half-written graph
+        os.makedirs(os.path.dirname(export_dir) or '.', exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(export_dir) or '.')
+        try:
+            model.save_pretrained(tmp_dir)
+            try:
+                os.rename(tmp_dir, export_dir)
+            except OSError:
+                # another worker finished the same export first
+                pass
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if precision == 'int8':
+        int8_dir = export_dir + '-int8'
+        if not os.path.isfile(os.path.join(int8_dir, 'config.json')):
+            logging.info(f"Quantizing ONNX graphs of {model_name} to int8 ...")
+            quantize_onnx_graphs(export_dir, int8_dir)
+        export_dir = int8_dir
+
+    return ORTModelForSeq2SeqLM.from_pretrained(export_dir, **options)
+
+
+def load_seq2seq(model_name, backend, precision='fp32'):
+    """Load a seq2seq model for the given backend.
+
+    Args:
+        model_name (str): Hugging Face model name or path.
+        backend (str): one of ``BACKENDS``.
+        precision (str, optional): one of ``PRECISIONS``. Defaults to 'fp32'.
+
+    Returns:
+        any: model object exposing ``generate()``.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got '{precision}'")
+    if backend == 'torch':
+        return load_torch(model_name, precision)
+    if backend == 'onnx':
+        return load_onnx(model_name, precision)
+    raise ValueError(f"backend must be one of {BACKENDS}, got '{backend}'")
@@ -0,0 +1,74 @@
+"""
+This module holds named decoding profiles that trade output quality for speed.
+
+A profile sets the beam count, early stopping and an output length budget
+derived from the input length (``length_ratio`` output tokens per input
+token), so a short chunk can never decode up to the model's hard length cap.
+"""
+
+import math
+
+from src import config
+
+PROFILES = {
+    'fast': {'num_beams': 1, 'early_stopping': False, 'length_ratio': 0.5},
+    'balanced': {'num_beams': 3, 'early_stopping': True, 'length_ratio': 0.8},
+    'quality': {'num_beams': 5, 'early_stopping': True, 'length_ratio': 1.0},
+}
+
+
+def get_profile(name):
+    """Return the settings of a decoding profile.
+
+    Args:
+        name (str): one of ``PROFILES``.
+
+    Returns:
+        dict: num_beams, early_stopping and length_ratio.
+    """
+    if name not in PROFILES:
+        raise ValueError(f"profile must be one of {tuple(PROFILES)}, got '{name}'")
+    return PROFILES[name]
+
+
+def token_budget(input_tokens, length_ratio, min_new_tokens, max_new_tokens, step=1):
+    """Return how many tokens may be decoded for an input of given length.
+
+    Args:
+        input_tokens (int): input length in tokens.
+        length_ratio (float): output tokens allowed per input token.
+        min_new_tokens (int): floor, so very short inputs still produce a sentence.
+        max_new_tokens (int): hard cap of the model.
+        step (int, optional): round the budget up to a multiple of this, so inputs
+            of similar length share a budget and can be batched. Defaults to 1.
+
+    Returns:
+        int: max new tokens.
+    """
+    budget = math.ceil(input_tokens * length_ratio / step) * step
+    return max(min_new_tokens, min(budget, max_new_tokens))
+
+
+def select_profile(requested, queue_depth):
+    """Pick the profile of a request, degrading to cheaper ones under load.
+
+    An explicitly requested profile is always honoured. Otherwise the model
+    default is used until the scheduler queue crosses
+    ``DECODING_BALANCED_QUEUE_DEPTH`` (then ``balanced``) or
+    ``DECODING_FAST_QUEUE_DEPTH`` (then ``fast``).
+
+    Args:
+        requested (str): profile asked for by the caller, or None.
+        queue_depth (int): items waiting in the model's scheduler.
+
+    Returns:
+        str: profile name, None to keep the model default.
+    """
+    if requested:
+        get_profile(requested)
+        return requested
+    if queue_depth >= config.get_int('DECODING_FAST_QUEUE_DEPTH', 64):
+        return 'fast'
+    if queue_depth >= config.get_int('DECODING_BALANCED_QUEUE_DEPTH', 16):
+        return 'balanced'
+    return None
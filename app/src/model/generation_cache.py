@@ -0,0 +1,206 @@
+"""
+This module memoizes model outputs keyed by model, decoding parameters and input.
+
+Two tiers: an in-process LRU of recent outputs and an on-disk SQLite table
+shared by every worker on the host, evicted least-recently-used once it grows
+past a byte budget. Decoding in this repo is deterministic (beam search /
+greedy), so a cached output is the exact string a fresh run would decode.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src import config
+
+_cache = None
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different copies of a text share a key.
+
+    Args:
+        text (str): model input.
+
+    Returns:
+        str: normalized text.
+    """
+    return ' '.join(text.split())
+
+
+class GenerationCache:
+    """Two-tier (memory LRU + SQLite) cache of decoded model outputs."""
+
+    def __init__(self, path=None, memory_items=2048, max_bytes=512 * 1024 * 1024):
+        """Initialize cache.
+
+        Args:
+            path (str, optional): SQLite file of the disk tier. Disk tier is off when None.
+            memory_items (int, optional): entries kept in the in-process LRU. Defaults to 2048.
+            max_bytes (int, optional): size budget of the disk tier. Defaults to 512MB.
+        """
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0,
+                          'memory_evictions': 0, 'disk_evictions': 0}
+
+        self._path = path or None
+        self._pid = None
+        self._conn = None
+        self._disk_bytes = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._disk_bytes = self.__disk_size()
+
+    @property
+    def _db(self):
+        """SQLite connection of this process, None when the disk tier is off.
+
+        A connection must not cross ``fork``, so workers forked from a
+        preloading master open their own.
+        """
+        if self._path is None:
+            return None
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self._path, timeout=30, check_same_thread=False,
+                                         isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS generations ('
+                               'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                               'size INTEGER NOT NULL, accessed REAL NOT NULL)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS generations_accessed '
+                               'ON generations (accessed)')
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_key(model_name, params, text):
+        """Build the cache key of one model call.
+
+        Args:
+            model_name (str): model name or path.
+            params (dict): every setting that changes the decoded output.
+            text (str): model input.
+
+        Returns:
+            str: hex digest.
+        """
+        payload = json.dumps([model_name, params, normalize_text(text)], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return cached output or None.
+
+        Args:
+            key (str): key from ``make_key``.
+
+        Returns:
+            str or list(str): cached output, None on miss.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute('SELECT value FROM generations WHERE key = ?',
+                                       (key,)).fetchone()
+                if row is not None:
+                    self._db.execute('UPDATE generations SET accessed = ? WHERE key = ?',
+                                     (time.time(), key))
+                    self._counters['disk_hits'] += 1
+                    value = json.loads(row[0])
+                    self.__remember(key, value)
+                    return value
+
+            self._counters['misses'] += 1
+            return None
+
+    def put(self, key, value):
+        """Store a decoded output in both tiers.
+
+        Args:
+            key (str): key from ``make_key``.
+            value (str or list(str)): decoded output.
+        """
+        with self._lock:
+            self.__remember(key, value)
+            if self._db is None:
+                return
+
+            encoded = json.dumps(value)
+            size = len(key) + len(encoded.encode('utf-8'))
+            self._db.execute('INSERT OR REPLACE INTO generations VALUES (?, ?, ?, ?)',
+                             (key, encoded, size, time.time()))
+            self._disk_bytes += size
+            if self._disk_bytes > self.max_bytes:
+                self.__evict_disk()
+
+    def __remember(self, key, value):
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+            self._counters['memory_evictions'] += 1
+
+    def __disk_size(self):
+        """Return the byte size of every disk entry (other workers write here too)."""
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM generations').fetchone()[0]
+
+    def __evict_disk(self):
+        """Delete least recently used disk entries until the tier is at 90% of its budget."""
+        self._disk_bytes = self.__disk_size()
+        target = int(self.max_bytes * 0.9)
+
+        while self._disk_bytes > target:
+            rows = self._db.execute('SELECT key, size FROM generations '
+                                    'ORDER BY accessed LIMIT 256').fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._disk_bytes <= target:
+                    break
+                self._db.execute('DELETE FROM generations WHERE key = ?', (key,))
+                self._disk_bytes -= size
+                self._counters['disk_evictions'] += 1
+
+    def stats(self):
+        """Return hit, miss and eviction counters.
+
+        Returns:
+            dict: counters and tier sizes.
+        """
+        with self._lock:
+            lookups = sum(self._counters[k] for k in ('memory_hits', 'disk_hits', 'misses'))
+            hits = self._counters['memory_hits'] + self._counters['disk_hits']
+            return {
+                **self._counters,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'memory_items': len(self._memory),
+                'disk_bytes': self._disk_bytes,
+                'max_disk_bytes': self.max_bytes if self._path is not None else 0,
+            }
+
+
+def get_generation_cache():
+    """Return the process-wide generation cache, or None when it is disabled."""
+    global _cache  # pylint: disable=global-statement
+    if _cache is None and config.get_bool('GENERATION_CACHE', True):
+        path = config.get_str('GENERATION_CACHE_PATH',
+                              os.path.join('resources', 'cache', 'generation.sqlite3'))
+        _cache = GenerationCache(
+            path=path or None,
+            memory_items=config.get_int('GENERATION_CACHE_MEMORY_ITEMS', 2048),
+            max_bytes=config.get_int('GENERATION_CACHE_MAX_MB', 512) * 1024 * 1024)
+        logging.info(f"Generation cache enabled (disk tier: {path or 'off'})")
+    return _cache
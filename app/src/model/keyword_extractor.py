@@ -6,8 +6,17 @@ https://github.com/TimSchopf/KeyphraseVectorizers
 @Author: Karthick T. Sharma
 """
 
+import spacy
 from keyphrase_vectorizers import KeyphraseCountVectorizer
 from keybert import KeyBERT
+from sentence_transformers import SentenceTransformer
+
+from . import artifacts
+
+# KeyBERT's and KeyphraseCountVectorizer's default models
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+SPACY_PIPELINE = 'en_core_web_sm'
+SPACY_EXCLUDE = ['parser', 'attribute_ruler', 'lemmatizer', 'ner']
 
 
 class KeywordExtractor:
@@ -17,8 +26,13 @@ class KeywordExtractor:
         """Initialize keyword extration model (KeyBERT) and keypharse vectorizer
         for meaningful keywords.
         """
-        self.__kw_model = KeyBERT()
-        self.__vectorizer = KeyphraseCountVectorizer()
+        self.__kw_model = KeyBERT(model=SentenceTransformer(
+            artifacts.resolve(EMBEDDING_MODEL), local_files_only=artifacts.offline()))
+        # the vectorizer downloads its spaCy pipeline on first use unless handed a loaded one
+        pipeline = artifacts.resolve(SPACY_PIPELINE)
+        if pipeline != SPACY_PIPELINE:
+            pipeline = spacy.load(pipeline, exclude=SPACY_EXCLUDE)
+        self.__vectorizer = KeyphraseCountVectorizer(spacy_pipeline=pipeline)
 
     def __extract_keywords(self, text):
         """Extract keywords from corpus using KeyBERT.
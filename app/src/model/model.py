@@ -6,27 +6,71 @@ Refactored to use Hugging Face Flan-T5 (no fastT5 dependency)
 @Modified: LinhGPT
 """
 
+import logging
 import os
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import AutoTokenizer
+
+from src import config
+from . import artifacts
+from .backends import load_seq2seq
+from .decoding import token_budget
+from .generation_cache import get_generation_cache
 
 
 class Model:
     """Generalized T5/Flan-T5 model for text generation."""
 
-    def __init__(self, model_name: str = "google/flan-t5-base"):
+    def __init__(self, model_name: str = "google/flan-t5-base", backend: str = None,
+                 precision: str = None, draft_model: str = None):
         """
         Load model and tokenizer into memory.
 
         Args:
             model_name (str): Name or path of the Hugging Face model.
+            backend (str): ``torch`` or ``onnx``. Defaults to ``MODEL_BACKEND``.
+            precision (str): ``fp32``, ``int8`` or ``bf16``. Defaults to ``MODEL_PRECISION``.
+            draft_model (str): small model sharing the tokenizer that proposes
+                tokens for assisted greedy decoding. Disabled when None, or with
+                a warning when it does not fit this model.
         """
         os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-        print(f"🔹 Loading model: {model_name} ...")
-        self.__tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.__model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        self.model_name = model_name
+        self.backend = backend or config.get_str("MODEL_BACKEND", "torch")
+        self.precision = precision or config.get_str("MODEL_PRECISION", "fp32")
+
+        print(f"🔹 Loading model: {model_name} ({self.backend}, {self.precision}) ...")
+        self.__tokenizer = AutoTokenizer.from_pretrained(
+            artifacts.resolve(model_name), local_files_only=artifacts.offline())
+        self.__model = load_seq2seq(model_name, self.backend, self.precision)
+        self.__draft = self.__load_draft(draft_model) if draft_model else None
+        self.draft_model_name = draft_model if self.__draft is not None else None
+        self.cache = get_generation_cache()
         print("✅ Model and tokenizer loaded successfully.\n")
 
+    def __load_draft(self, draft_model: str):
+        """Load the draft model of assisted decoding if it fits the main model.
+
+        Returns:
+            PreTrainedModel: draft model, or None when it cannot assist this
+            model, which then decodes without it.
+        """
+        if self.backend != "torch":
+            logging.warning(f"Assisted decoding needs the torch backend, {self.model_name} "
+                            f"uses '{self.backend}'; ignoring draft model {draft_model}")
+            return None
+
+        draft_tokenizer = AutoTokenizer.from_pretrained(
+            artifacts.resolve(draft_model), local_files_only=artifacts.offline())
+        # the main model verifies draft tokens by id, so both must map ids to the same pieces
+        if draft_tokenizer.get_vocab() != self.__tokenizer.get_vocab():
+            logging.warning(f"Draft model {draft_model} does not share the vocabulary of "
+                            f"{self.model_name}; decoding without it")
+            return None
+
+        print(f"🔹 Loading draft model: {draft_model} ...")
+        return load_seq2seq(draft_model, "torch", self.precision)
+
     def tokenize_corpus(self, text: str, max_length: int):
         """Tokenize model input text."""
         encode = self.__tokenizer.encode_plus(
@@ -38,10 +82,142 @@ class Model:
         )
         return encode["input_ids"], encode["attention_mask"]
 
+    def tokenize_batch(self, texts: list, max_length: int):
+        """Tokenize a batch of model inputs, padding only up to the longest item."""
+        encode = self.__tokenizer(
+            texts,
+            return_tensors="pt",
+            max_length=max_length,
+            truncation=True,
+            padding="longest",
+        )
+        return encode["input_ids"], encode["attention_mask"]
+
     def __extract_dict(self, input_dict):
         """Extract key-value pairs into a string format."""
         return " ".join(f"{k}: {v}" for k, v in input_dict.items())
 
+    def count_tokens(self, texts: list, max_length: int = None):
+        """Return the number of input tokens of each text (after truncation)."""
+        encode = self.__tokenizer(
+            texts, max_length=max_length, truncation=max_length is not None)
+        return [len(ids) for ids in encode["input_ids"]]
+
+    def __generate(self, texts: list, token_max_length: int, generate_kwargs: dict):
+        """Run one batched generate() call and decode its output.
+
+        Greedy single-sequence calls go through assisted decoding when a draft
+        model is loaded; its output is the main model's greedy output.
+        """
+        if (self.__draft is not None and generate_kwargs["num_beams"] == 1
+                and generate_kwargs["num_return_sequences"] == 1):
+            # assisted generation only verifies one sequence at a time
+            outputs = []
+            for text in texts:
+                input_ids, attention_mask = self.tokenize_batch([text], token_max_length)
+                outputs.extend(self.__model.generate(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    assistant_model=self.__draft,
+                    **generate_kwargs,
+                ))
+        else:
+            input_ids, attention_mask = self.tokenize_batch(texts, token_max_length)
+            outputs = self.__model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                **generate_kwargs,
+            )
+
+        decoded = self.__tokenizer.batch_decode(
+            outputs, skip_special_tokens=True, clean_up_tokenization_spaces=True
+        )
+
+        num_return_sequences = generate_kwargs["num_return_sequences"]
+        if num_return_sequences == 1:
+            return decoded
+        return [
+            decoded[i:i + num_return_sequences]
+            for i in range(0, len(decoded), num_return_sequences)
+        ]
+
+    def inference_batch(
+        self,
+        inputs: list,
+        num_beams: int = 4,
+        no_repeat_ngram_size: int = 2,
+        model_max_length: int = 128,
+        num_return_sequences: int = 1,
+        token_max_length: int = 256,
+        early_stopping: bool = True,
+        length_ratio: float = None,
+        min_new_tokens: int = 8,
+    ):
+        """
+        Generate model output text for a batch of inputs in one forward pass.
+
+        Outputs already in the generation cache are not decoded again. Items
+        are only grouped with items of the same output budget, so an item's
+        output never depends on what else is in the batch.
+
+        Args:
+            inputs (list(dict)): one dict of prompt fields per item, the same
+                fields ``inference`` takes as keyword arguments.
+            length_ratio (float): when set, decode at most ``length_ratio`` tokens
+                per input token (at least ``min_new_tokens``, at most
+                ``model_max_length``) instead of always allowing ``model_max_length``.
+
+        Returns:
+            list: decoded output per input item, or a list of
+            ``num_return_sequences`` outputs per item when more than one is requested.
+        """
+        if not inputs:
+            return []
+
+        texts = [self.__extract_dict(item) for item in inputs]
+        settings = {
+            "num_beams": num_beams,
+            "num_return_sequences": num_return_sequences,
+            "no_repeat_ngram_size": no_repeat_ngram_size,
+            "early_stopping": early_stopping,
+        }
+
+        if length_ratio is None:
+            limits = [("max_length", model_max_length)] * len(texts)
+        else:
+            limits = [
+                ("max_new_tokens", token_budget(
+                    n, length_ratio, min_new_tokens, model_max_length, step=8))
+                for n in self.count_tokens(texts, token_max_length)
+            ]
+
+        results = [None] * len(texts)
+        keys = [None] * len(texts)
+        if self.cache is not None:
+            for i, text in enumerate(texts):
+                keys[i] = self.cache.make_key(self.model_name, {
+                    **settings, limits[i][0]: limits[i][1],
+                    "token_max_length": token_max_length,
+                    "backend": self.backend, "precision": self.precision,
+                }, text)
+                results[i] = self.cache.get(keys[i])
+
+        pending = {}
+        for i, result in enumerate(results):
+            if result is None:
+                pending.setdefault(limits[i], []).append(i)
+
+        for (limit_name, limit), indices in pending.items():
+            outputs = self.__generate(
+                [texts[i] for i in indices], token_max_length,
+                {**settings, limit_name: limit})
+            for i, output in zip(indices, outputs):
+                results[i] = output
+                if self.cache is not None:
+                    self.cache.put(keys[i], output)
+
+        return results
+
     def inference(
         self,
         num_beams: int = 4,
@@ -54,24 +230,11 @@ class Model:
         """
         Generate model output text.
         """
-        text = self.__extract_dict(kwargs)
-        input_ids, attention_mask = self.tokenize_corpus(text, token_max_length)
-
-        outputs = self.__model.generate(
-            input_ids=input_ids,
-            attention_mask=attention_mask,
+        return self.inference_batch(
+            [kwargs],
             num_beams=num_beams,
-            num_return_sequences=num_return_sequences,
             no_repeat_ngram_size=no_repeat_ngram_size,
-            max_length=model_max_length,
-            early_stopping=True,
-        )
-
-        decoded = [
-            self.__tokenizer.decode(
-                output, skip_special_tokens=True, clean_up_tokenization_spaces=True
-            )
-            for output in outputs
-        ]
-
-        return decoded[0] if num_return_sequences == 1 else decoded
+            model_max_length=model_max_length,
+            num_return_sequences=num_return_sequences,
+            token_max_length=token_max_length,
+        )[0]
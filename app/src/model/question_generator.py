@@ -3,29 +3,68 @@
 @Author: Karthick T. Sharma
 """
 
+from src import config
 from .model import Model
+from .decoding import get_profile
 from ..textprocessor import postprocess
 
 
 class QuestionGenerator(Model):
     """Generate question from context and answer."""
 
-    def __init__(self):
-        """Initialize question generator."""
-        super().__init__(model_name='iarfmoose/t5-base-question-generator')
+    default_profile = 'quality'
+
+    def __init__(self, backend=None, precision=None, draft_model=None):
+        """Initialize question generator.
+
+        Args:
+            backend (str, optional): inference backend. Defaults to ``QUESTION_GEN_BACKEND``.
+            precision (str, optional): weight precision. Defaults to ``QUESTION_GEN_PRECISION``.
+            draft_model (str, optional): draft model of assisted greedy decoding.
+                Defaults to ``QUESTION_GEN_DRAFT_MODEL``.
+        """
+        super().__init__(model_name='iarfmoose/t5-base-question-generator',
+                         backend=backend or config.model_setting('QUESTION_GEN', 'BACKEND'),
+                         precision=precision or config.model_setting('QUESTION_GEN', 'PRECISION'),
+                         draft_model=(draft_model
+                                      or config.model_setting('QUESTION_GEN', 'DRAFT_MODEL')))
         # super().__init__(model_name='t5-question',
         #                  path_id='1_0dPLdv8WNtSYQdKEWxFc03IR-szs0kB')
 
-    def generate(self, context, answer):
+    def generate(self, context, answer, profile=None):
         """Generate abstrative summary of given context.
 
         Args:
             context (str): input corpus.
             ans (str): ans for question that needs to be generated.
+            profile (str, optional): decoding profile. Defaults to ``default_profile``.
 
         Returns:
            str: generated question.
         """
-        return postprocess.postprocess_question(super().inference(
-            num_beams=5, no_repeat_ngram_size=2, model_max_length=72,
-            token_max_length=382, context=context, answer=answer))
+        return self.generate_batch([context], [answer], profile)[0]
+
+    def generate_batch(self, contexts, answers, profile=None):
+        """Generate questions for several (context, answer) pairs in one batched pass.
+
+        Args:
+            contexts (list(str)): input corpora.
+            answers (list(str)): answer for each question that needs to be generated.
+            profile (str, optional): decoding profile. Defaults to ``default_profile``.
+
+        Returns:
+           list(str): generated question per pair, in input order.
+
+        Raises:
+            ValueError: when there is not one answer per context.
+        """
+        if len(contexts) != len(answers):
+            raise ValueError(f"got {len(contexts)} contexts but {len(answers)} answers")
+        settings = get_profile(profile or self.default_profile)
+        outputs = super().inference_batch(
+            [{'context': context, 'answer': answer}
+             for context, answer in zip(contexts, answers)],
+            num_beams=settings['num_beams'], no_repeat_ngram_size=2, model_max_length=72,
+            token_max_length=382, early_stopping=settings['early_stopping'],
+            length_ratio=settings['length_ratio'])
+        return [postprocess.postprocess_question(output) for output in outputs]
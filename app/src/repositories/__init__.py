@@ -4,4 +4,5 @@ from .topic import TopicRepository
 from .rating import RatingRepository
 from .comment import CommentRepository
 from .question import QuestionRepository
-from .choice import ChoiceRepository
\ No newline at end of file
+from .choice import ChoiceRepository
+from .job import JobRepository
\ No newline at end of file
@@ -0,0 +1,119 @@
+from src.loaders.database import get_database
+from sqlalchemy import select, update, func, or_, and_
+from fastapi import HTTPException
+from datetime import datetime
+from typing import List, Dict
+
+import uuid
+
+from models import GenerationJob
+
+
+class JobRepository:
+    def __init__(self):
+        self.db = get_database()
+
+    # create
+    async def create(self, uid: int, kind: str, topic: str, owner: str = None) -> Dict[str, any]:
+        """Persist a queued generation job.
+
+        Args:
+            uid (int): id of the user submitting the job.
+            kind (str): pdf, image or paragraph.
+            topic (str): topic of the questions.
+            owner (str, optional): process that runs the job.
+
+        Returns:
+            dict: job state.
+        """
+        now = datetime.utcnow()
+        job = GenerationJob(id=str(uuid.uuid4()), user_id=uid, kind=kind, topic=topic,
+                            status="queued", chunks_done=0, chunks_total=0,
+                            question_ids=[], errors=[], created_at=now, owner=owner,
+                            heartbeat_at=now)
+        async with self.db.get_session() as session:
+            session.add(job)
+            await session.commit()
+        return self.to_dict(job)
+
+    # get one
+    async def find_for_user(self, uid: int, job_id: str) -> Dict[str, any]:
+        """Return a job of a user.
+
+        Raises:
+            HTTPException: 404 when the job does not exist or belongs to another user.
+        """
+        async with self.db.get_session() as session:
+            job = await session.get(GenerationJob, job_id)
+        if job is None or job.user_id != uid:
+            raise HTTPException(status_code=404, detail="job.not_found")
+        return self.to_dict(job)
+
+    # get many
+    async def list_for_user(self, uid: int, page: int = 1, limit: int = 20):
+        """Return a page of a user's jobs, newest first, and the user's job count.
+
+        Returns:
+            tuple[list[dict], int]: jobs and total jobs of the user.
+        """
+        async with self.db.get_session() as session:
+            total = await session.scalar(
+                select(func.count()).select_from(GenerationJob).where(GenerationJob.user_id == uid))
+            result = await session.execute(
+                select(GenerationJob)
+                .where(GenerationJob.user_id == uid)
+                .order_by(GenerationJob.created_at.desc())
+                .offset((page - 1) * limit)
+                .limit(limit))
+            jobs: List[GenerationJob] = result.scalars().all()
+        return [self.to_dict(job) for job in jobs], total
+
+    # update
+    async def update(self, job_id: str, **values):
+        """Persist new state of a job, e.g. its status, progress or partial results."""
+        async with self.db.get_session() as session:
+            await session.execute(
+                update(GenerationJob).where(GenerationJob.id == job_id).values(**values))
+            await session.commit()
+
+    async def heartbeat(self, job_ids: List[str]):
+        """Record that the process owning these jobs is still running them."""
+        async with self.db.get_session() as session:
+            await session.execute(
+                update(GenerationJob).where(GenerationJob.id.in_(job_ids))
+                .values(heartbeat_at=datetime.utcnow()))
+            await session.commit()
+
+    async def fail_stale(self, cutoff: datetime, error: str) -> int:
+        """Mark failed the queued and running jobs without a heartbeat since ``cutoff``.
+
+        Returns:
+            int: jobs marked failed.
+        """
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                update(GenerationJob)
+                .where(GenerationJob.status.in_(("queued", "running")),
+                       or_(GenerationJob.heartbeat_at < cutoff,
+                           and_(GenerationJob.heartbeat_at.is_(None),
+                                GenerationJob.created_at < cutoff)))
+                .values(status="failed", error=error, finished_at=datetime.utcnow()))
+            await session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def to_dict(job: GenerationJob) -> Dict[str, any]:
+        return {
+            'job_id': job.id,
+            'kind': job.kind,
+            'topic': job.topic,
+            'status': job.status,
+            'chunks_done': job.chunks_done,
+            'chunks_total': job.chunks_total,
+            'question_ids': job.question_ids or [],
+            'errors': job.errors or [],
+            'error': job.error,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
@@ -4,14 +4,20 @@ from sqlalchemy.orm import selectinload
 from fastapi import HTTPException
 from typing import List, Dict
 
+import asyncio
+import logging
+import time
 import uuid
 
 
 
 from models import Question, Choice, Comment, Rating
+from src import config
 from src.utils import vietnamese_to_english, english_to_vietnamese
-from src.loaders import summarizer, keyword_extractor, false_ans_gen, question_gen
-from src.inferencehandler import inference_handler
+from src.loaders.executor import iterate_blocking, run_blocking
+from src.inferenceserver import get_inference_service
+from src.inferencehandler.pipeline import (
+    Pipeline, Stage, isolate_errors, question_pipeline, stream_chunks, translate_within_budget)
 from .user import UserRepository
 
 class QuestionRepository:
@@ -29,14 +35,14 @@ class QuestionRepository:
         Returns:
             dict: results saved to Firestore
         """
-        request.context = vietnamese_to_english(request.context)
-        request.name = vietnamese_to_english(request.name)
+        request.context = await run_blocking(vietnamese_to_english, request.context)
+        request.name = await run_blocking(vietnamese_to_english, request.name)
 
         await self.user_repo.update_generator_working_status(request, True)
-        questions, crct_ans, all_ans = await self.generate_questions_and_answers(request.context)
+        questions, crct_ans, all_ans = await self.generate_questions_and_answers(request.context, request.profile)
         await self.user_repo.update_generator_working_status(request, False)
 
-        results = self.send_results_to_db(request, questions, crct_ans, all_ans, request.context)
+        results = await self.send_results_to_db(request, questions, crct_ans, all_ans, request.context)
         return results
 
     # get one
@@ -172,30 +178,199 @@ class QuestionRepository:
         return question
     
     # other
-    def generate_questions_and_answers(context: str):
+    async def generate_questions_and_answers(self, context: str, profile: str = None):
         """Generate questions and answers from given context.
 
+        Chunks flow through a stage pipeline (summarize, keywords, distractors,
+        questions), so the stages of different chunks overlap. Stages run on the
+        models of this process, or in the inference daemon when
+        ``INFERENCE_SOCKET`` is set; summarizer and question generator calls are
+        batched with those of concurrent requests.
+
         Args:
             context (str): input corpus used to generate question.
+            profile (str, optional): decoding profile. When not given, each model
+                uses its default and degrades to cheaper profiles under load.
 
         Returns:
             tuple[list[str], list[str], list[list[str]]]:
             questions, correct answers, and all answer choices.
         """
-        summary, splitted_text = inference_handler.get_all_summary(
-            model=summarizer, context=context
-        )
-        filtered_kws = keyword_extractor.get_keywords(
-            original_list=splitted_text, summarized_list=summary
-        )
-
-        crct_ans, all_answers = false_ans_gen.get_output(filtered_kws=filtered_kws)
-        questions = inference_handler.get_all_questions(
-            model=question_gen, context=summary, answer=crct_ans
-        )
-
+        inference = get_inference_service()
+        splitted_text = await inference.split_context(context)
+        chunks = await question_pipeline(inference, profile).run(splitted_text)
+
+        questions, crct_ans, all_answers = [], [], []
+        for chunk in chunks:
+            questions.extend(chunk['questions'])
+            crct_ans.extend(chunk['crct_ans'])
+            all_answers.extend(chunk['all_answers'])
         return questions, crct_ans, all_answers
     
+    async def generate_and_store_document(self, pages, uid: int, topic: str, profile: str = None,
+                                          dedup=None, failed: list = None, progress: dict = None):
+        """Generate questions from a whole document in one pipeline pass, committed in batches.
+
+        The sentences of the document are packed into chunks of about
+        ``DOCUMENT_CHUNK_WORDS`` words, and every chunk is translated and
+        generated on its own, so the model calls of a document grow with its
+        chunks, not its sentences. A chunk whose translation is over the
+        summarizer's token budget is split between its sentences and
+        translated again rather than truncated. Pages are chunked as they arrive and each
+        chunk enters the pipeline as soon as it is ready, so the first
+        questions are stored while later pages are still being read. A batch
+        is committed once it holds ``DOCUMENT_COMMIT_BATCH_SIZE`` questions or
+        ``DOCUMENT_COMMIT_INTERVAL_S`` seconds have passed since the last
+        commit. A chunk whose generation fails does not stop the others; its
+        sentences are reported in ``failed``. With ``dedup``, repeated lines
+        and near-duplicate sentences are dropped before chunking and the model
+        calls they would have cost are recorded in its stats.
+
+        Args:
+            pages (iterable or async iterable(str)): text of each page, in Vietnamese.
+            uid (int): id of the user owning the questions.
+            topic (str): topic of the questions.
+            profile (str, optional): decoding profile.
+            dedup (Deduplicator, optional): deduplicator of this document.
+            failed (list, optional): receives ``{'sentence', 'error'}`` for
+                every sentence of a chunk that failed.
+            progress (dict, optional): kept up to date with ``chunks_done`` and
+                ``chunks_total``, the translated chunks so far until the document ends.
+
+        Yields:
+            list[dict]: questions of one committed batch.
+        """
+        inference = get_inference_service()
+        generation = question_pipeline(inference, profile)
+
+        async def translate_text(text):
+            return await run_blocking(vietnamese_to_english, text)
+
+        async def translate(item):
+            return dict(item, parts=await translate_within_budget(inference, translate_text, item))
+
+        # translation re-splits chunks, so it feeds the generation stages through its own pipeline
+        translation = Pipeline(
+            isolate_errors([
+                Stage('translate', translate, config.get_int('PIPELINE_TRANSLATE_WORKERS', 4))]),
+            max_queue_size=generation.max_queue_size)
+        pipeline = Pipeline(isolate_errors(generation.stages),
+                            max_queue_size=generation.max_queue_size)
+        if not hasattr(pages, '__aiter__'):
+            pages = iterate_blocking(iter(pages))
+        if dedup is not None:
+            pages = dedup.iter_pages(pages)
+        sizes = []
+        progress = progress if progress is not None else {}
+        progress.update(chunks_done=0, chunks_total=0)
+
+        async def chunks():
+            async for chunk in stream_chunks(pages, config.get_int('DOCUMENT_CHUNK_WORDS', 150)):
+                sizes.append(len(chunk['chunk']))
+                yield chunk
+
+        async def translated():
+            async for item in translation.stream(chunks()):
+                # a chunk whose translation failed goes on with its error, to be reported
+                for part in item.get('parts') or [item]:
+                    progress['chunks_total'] += 1
+                    yield part
+
+        batch_size = config.get_int('DOCUMENT_COMMIT_BATCH_SIZE', 16)
+        interval = config.get_float('DOCUMENT_COMMIT_INTERVAL_S', 2.0)
+        batch, last_commit = [], time.monotonic()
+        async for item in pipeline.stream(translated()):
+            progress['chunks_done'] += 1
+            if item.get('error'):
+                if failed is not None:
+                    failed.extend({'sentence': sentence, 'error': item['error']}
+                                  for sentence in item['sentences'])
+                continue
+            for idx, (question, answer) in enumerate(zip(item['questions'], item['crct_ans'])):
+                batch.append((item['chunk'], question, answer,
+                              item['all_answers'][idx * 4:(idx + 1) * 4]))
+            if batch and (len(batch) >= batch_size or time.monotonic() - last_commit >= interval):
+                yield await self.store_questions(uid, topic, batch)
+                batch, last_commit = [], time.monotonic()
+        if batch:
+            yield await self.store_questions(uid, topic, batch)
+
+        if dedup is not None:
+            saved = dedup.record_generation(progress['chunks_total'], sum(sizes),
+                                            len(translation.stages) + len(pipeline.stages))
+            logging.info(f"Dedup of '{topic}' removed {dedup.stats()['lines_removed']} lines and "
+                         f"{dedup.stats()['sentences_removed']} sentences, "
+                         f"about {saved} model calls")
+
+    async def store_questions(self, uid: int, topic: str, generated: list, tags: list = None):
+        """Translate generated questions back to Vietnamese and commit them in one transaction.
+
+        Args:
+            uid (int): id of the user owning the questions.
+            topic (str): topic of the questions.
+            generated (list[tuple]): context, question, correct answer and the
+                four choices of each question, in English.
+            tags (list[str], optional): tags of every question.
+
+        Returns:
+            list[dict]: stored questions.
+        """
+        texts = list(dict.fromkeys(
+            text for context, question, answer, choices in generated
+            for text in (context, question, answer, *choices)))
+        translated = dict(zip(texts, await asyncio.gather(
+            *(run_blocking(english_to_vietnamese, text) for text in texts))))
+
+        tags_str = ",".join(tags) if tags else None
+        new_questions = [
+            Question(
+                user_id=uid,
+                topic=topic,
+                context=translated[context],
+                question_text=translated[question],
+                correct_choice=translated[answer],
+                tags=tags_str,
+                choices=[Choice(choice_text=translated[choice]) for choice in choices],
+            )
+            for context, question, answer, choices in generated
+        ]
+        async with self.db.get_session() as session:
+            session.add_all(new_questions)
+            await session.commit()
+
+        return [self.__to_dict(question) for question in new_questions]
+
+    async def get_by_ids(self, question_ids: List[int]) -> List[Dict[str, any]]:
+        """Return stored questions with their choices, in the order of ``question_ids``.
+
+        Args:
+            question_ids (list[int]): ids, e.g. the partial results of a generation job.
+
+        Returns:
+            list[dict]: questions still stored; deleted ones are skipped.
+        """
+        if not question_ids:
+            return []
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                select(Question)
+                .where(Question.id.in_(question_ids))
+                .options(selectinload(Question.choices)))
+            by_id = {question.id: question for question in result.scalars().all()}
+        return [self.__to_dict(by_id[id]) for id in question_ids if id in by_id]
+
+    @staticmethod
+    def __to_dict(question: Question) -> Dict[str, any]:
+        return {
+            'question_id': question.id,
+            'topic': question.topic,
+            'context': question.context,
+            'question_text': question.question_text,
+            'choices': [choice.choice_text for choice in question.choices],
+            'correct_choice': question.correct_choice,
+            'tags': question.tags,
+        }
+
     async def send_results_to_db(self, uid: str, topic: str, questions: list, crct_ans: list, all_ans: list, context: str, tags: list):
         """Gửi câu hỏi đã tạo vào cơ sở dữ liệu MySQL"""
         self.__validate(questions=questions, crct_ans=crct_ans, all_ans=all_ans)
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+import asyncio
+
+from src import config
+from src.loaders.lazy_model import LOADED, READY, EVICTED
+from src.loaders.model import combine_model_status, model_status
+from src.inferenceserver import get_inference_service, remote_inference
+from src.inferenceserver.client import InferenceError
+from src.utils import res_ok
+
+
+router = APIRouter(
+    tags=["health"],       # Hiển thị trong docs (Swagger UI)
+)
+
+@router.get('/ready')
+async def get_readiness(request: Request):
+    """Report per-model load state.
+
+    Responds 200 once every model is loaded and warmed up (or was, before being
+    evicted under the memory budget), 503 before that. With ``MODEL_WARMUP``
+    off there is no warm-up to wait for, so a loaded model counts as ready.
+    Endpoints that need no model (auth, listing, rating) serve traffic either way.
+
+    Returns:
+        JSONResponse: load state per model
+    """
+    statuses = model_status()
+
+    # with an inference daemon the models live there; a stuck daemon is not ready
+    if remote_inference():
+        try:
+            statuses = await asyncio.wait_for(get_inference_service().model_status(),
+                                              config.get_float('READY_TIMEOUT', 2))
+        except (OSError, InferenceError, asyncio.TimeoutError):
+            statuses = {}
+
+    # with a process pool the models live in the workers, not in this process;
+    # the warm-up reports once every worker process has warmed up its models
+    warm_up = getattr(request.app.state, 'warm_up', None)
+    if config.get_str('INFERENCE_EXECUTOR', 'thread') == 'process':
+        if warm_up is not None and warm_up.done() and warm_up.exception() is None:
+            statuses = combine_model_status(warm_up.result())
+
+    # an evicted model is reloaded on its next use
+    ready_states = (READY, EVICTED)
+    if not config.get_bool('MODEL_WARMUP', True) and not remote_inference():
+        ready_states += (LOADED,)
+    ready = bool(statuses) and all(
+        status['state'] in ready_states for status in statuses.values())
+    return JSONResponse(status_code=200 if ready else 503,
+                        content=res_ok(data=statuses, code="READY" if ready else "NOT_READY"))
@@ -0,0 +1,100 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.loaders import summarizer_scheduler, question_scheduler, pool_stats, memory_stats
+from src.model.generation_cache import get_generation_cache
+from src.service.jobs import get_job_runner
+from src.service.ocr import get_ocr_service
+from src.service.pdf_extraction import get_pdf_extractor
+from src.service.uploads import get_upload_quota
+from src.textprocessor.dedup import dedup_totals
+from src.utils import res_ok
+
+
+router = APIRouter(
+    prefix="/monitor",      # Các endpoint theo dõi tải của mô hình
+    tags=["monitor"],       # Hiển thị trong docs (Swagger UI)
+)
+
+@router.get('/schedulers')
+async def get_scheduler_stats():
+    """Report queue depth and batch size histogram of every batching scheduler.
+
+    Returns:
+        JSONResponse: scheduler stats keyed by model name
+    """
+    stats = {s.name: s.stats() for s in (summarizer_scheduler, question_scheduler)}
+    return JSONResponse(status_code=200, content=res_ok(data=stats))
+
+@router.get('/cache')
+async def get_cache_stats():
+    """Report hit, miss and eviction counters of the generation cache.
+
+    Returns:
+        JSONResponse: cache counters, empty when the cache is disabled
+    """
+    cache = get_generation_cache()
+    return JSONResponse(status_code=200, content=res_ok(data=cache.stats() if cache else {}))
+
+@router.get('/pools')
+async def get_pool_stats():
+    """Report utilization and checkout wait times of every model replica pool.
+
+    Returns:
+        JSONResponse: pool stats keyed by model name, empty without pools
+    """
+    return JSONResponse(status_code=200, content=res_ok(data=pool_stats()))
+
+@router.get('/memory')
+async def get_memory_stats():
+    """Report model memory budget use, evictions and reload costs.
+
+    Returns:
+        JSONResponse: model manager stats, empty without MODEL_MEMORY_BUDGET_MB
+    """
+    return JSONResponse(status_code=200, content=res_ok(data=memory_stats()))
+
+@router.get('/pdf')
+async def get_pdf_stats():
+    """Report pages extracted, pages/sec and cache hits of PDF text extraction.
+
+    Returns:
+        JSONResponse: extraction counters
+    """
+    return JSONResponse(status_code=200, content=res_ok(data=get_pdf_extractor().stats()))
+
+@router.get('/ocr')
+async def get_ocr_stats():
+    """Report images OCRed, seconds per megapixel and cache hits of the OCR pool.
+
+    Returns:
+        JSONResponse: OCR counters
+    """
+    return JSONResponse(status_code=200, content=res_ok(data=get_ocr_service().stats()))
+
+@router.get('/uploads')
+async def get_upload_stats():
+    """Report upload bytes in flight, caps and rejected uploads.
+
+    Returns:
+        JSONResponse: upload quota counters
+    """
+    return JSONResponse(status_code=200, content=res_ok(data=get_upload_quota().stats()))
+
+@router.get('/dedup')
+async def get_dedup_stats():
+    """Report lines and sentences dropped as duplicates and the model calls they saved.
+
+    Returns:
+        JSONResponse: dedup counters summed over documents
+    """
+    return JSONResponse(status_code=200, content=res_ok(data=dedup_totals()))
+
+@router.get('/jobs')
+async def get_job_stats():
+    """Report generation jobs waiting, running, finished and rejected in this worker.
+
+    Returns:
+        JSONResponse: job runner counters
+    """
+    return JSONResponse(status_code=200, content=res_ok(data=get_job_runner().stats()))
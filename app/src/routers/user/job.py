@@ -0,0 +1,103 @@
+from fastapi import APIRouter, HTTPException, UploadFile, Request, File, Query
+from fastapi.responses import JSONResponse
+from typing import List
+
+import os
+
+from src.repositories import JobRepository, QuestionRepository
+from src.interface import *
+from src.utils import res_ok
+from src.loaders.executor import run_blocking
+from src.service.jobs import JobQueueFull, get_job_runner, read_images, read_pdf
+from src.service.uploads import spool_to_disk
+
+
+router = APIRouter(
+    prefix="/jobs",      # Sinh câu hỏi chạy nền: gửi job, theo dõi tiến độ, lấy kết quả
+    tags=["jobs"],       # Hiển thị trong docs (Swagger UI)
+)
+
+async def submit(user_id, kind: str, topic: str, pages, profile=None, files=()):
+    """Queue a generation job and answer 202 with its id.
+
+    Args:
+        user_id (int): id of the user owning the questions.
+        kind (str): pdf, image or paragraph.
+        topic (str): topic of the questions.
+        pages (iterable or async iterable(str)): text of each page, read when the job runs.
+        profile (DecodingProfile, optional): decoding profile.
+        files (list(str), optional): temporary upload copies removed when the job ends.
+
+    Returns:
+        JSONResponse: queued job
+    """
+    try:
+        job = await get_job_runner().submit(user_id, kind, topic, pages, profile, files)
+    except Exception as e:
+        # job không được nhận thì không có worker nào xoá file tạm
+        for path in files:
+            os.remove(path)
+        if isinstance(e, JobQueueFull):
+            raise HTTPException(status_code=503, detail="job.queue_full")
+        raise
+    return JSONResponse(status_code=202, content=res_ok(data=job, code="ACCEPTED"))
+
+# create
+@router.post("/pdf")
+async def submit_pdf_job(request: Request, file: UploadFile = File(...),
+                         profile: DecodingProfile | None = Query(None)):
+    user_id = request.state.user["uid"]
+    if file.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="file.not_pdf")
+
+    # File tạm của upload bị xoá khi request kết thúc nên phải chép ra trước khi trả về
+    path = await run_blocking(spool_to_disk, file.file, '.pdf')
+    topic = os.path.splitext(file.filename)[0]
+    return await submit(user_id, "pdf", topic, read_pdf(path), profile, [path])
+
+@router.post("/image")
+async def submit_image_job(request: Request, file: List[UploadFile] = File(...),
+                           profile: DecodingProfile | None = Query(None)):
+    user_id = request.state.user["uid"]
+    if not all(upload.content_type.startswith("image/") for upload in file):
+        raise HTTPException(status_code=400, detail="file.not_image")
+
+    paths = [await run_blocking(spool_to_disk, upload.file) for upload in file]
+    topic = os.path.splitext(file[0].filename)[0]
+    return await submit(user_id, "image", topic, read_images(paths), profile, paths)
+
+@router.post("/paragraph")
+async def submit_paragraph_job(body: ICreateQuestion, request: Request):
+    user_id = request.state.user["uid"]
+    return await submit(user_id, "paragraph", body.name, [body.context], body.profile)
+
+# index
+@router.get("/")
+async def list_jobs(request: Request, page: int = Query(1, ge=1),
+                    limit: int = Query(20, ge=1, le=100)):
+    """List the user's jobs, newest first."""
+    user_id = request.state.user["uid"]
+    jobs, total = await JobRepository().list_for_user(user_id, page, limit)
+    return JSONResponse(status_code=200, content=res_ok(data=jobs, page=page, limit=limit,
+                                                        total_items=total))
+
+# get one
+@router.get("/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """Report a job's status, progress (chunks done/total) and failed sentences."""
+    user_id = request.state.user["uid"]
+    job = await JobRepository().find_for_user(user_id, job_id)
+    return JSONResponse(status_code=200, content=res_ok(data=job))
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str, request: Request):
+    """Return the questions a job has committed so far, also while it is running."""
+    user_id = request.state.user["uid"]
+    job = await JobRepository().find_for_user(user_id, job_id)
+    questions = await QuestionRepository().get_by_ids(job['question_ids'])
+    result = {
+        "job": job,
+        "success": questions,
+        "fail": job['errors']
+    }
+    return JSONResponse(status_code=200, content=res_ok(data=result))
@@ -1,17 +1,18 @@
 from fastapi import APIRouter, HTTPException, UploadFile, Request, File, Query
 from fastapi.responses import JSONResponse, FileResponse
-from PIL import Image
-from PyPDF2 import PdfReader
-from typing import Dict
+from typing import Dict, List
 from pathlib import Path
 
 
-import io, os, re, pytesseract
+import os
 
 from src.repositories import QuestionRepository, ChoiceRepository
 from src.interface import *
 from src.service import *
 from src.utils import res_ok
+from src.service.ocr import get_ocr_service
+from src.service.pdf_extraction import get_pdf_extractor
+from src.textprocessor.dedup import new_deduplicator
 
 
 router = APIRouter(
@@ -19,124 +20,80 @@ router = APIRouter(
     tags=["questions"],       # Hiển thị trong docs (Swagger UI)
 )
 
+async def generate_document(pages, user_id, topic: str, profile=None, dedup=None):
+    """Generate and store questions of a whole document in one pipeline pass.
+
+    Args:
+        pages (iterable or async iterable(str)): text of each page, in Vietnamese.
+        user_id (int): id of the user owning the questions.
+        topic (str): topic of the questions.
+        profile (DecodingProfile, optional): decoding profile.
+        dedup (Deduplicator, optional): deduplicator of this document.
+
+    Returns:
+        dict: stored questions, failed sentences and dedup counters.
+    """
+    question_repo = QuestionRepository()
+    new_questions = []
+    error_sentences = []
+    try:
+        async for batch in question_repo.generate_and_store_document(
+                pages, user_id, topic, profile, dedup, failed=error_sentences):
+            new_questions.extend(batch)
+    except Exception as e:
+        if not new_questions:
+            raise HTTPException(status_code=500, detail=f"Error processing document: {e}")
+        # các lô đã commit vẫn được giữ lại
+        print(f"Lỗi khi xử lí tài liệu: {topic}. Lỗi: {e}")
+        error_sentences.append({'sentence': None, 'error': str(e)})
+
+    return {
+        "success": new_questions,
+        "fail": error_sentences,
+        "dedup": dedup.stats() if dedup else None
+    }
+
 # create
 @router.post("/pdf")
-async def generate_questions_from_pdf(request: Request, file: UploadFile = File(...),) -> Dict[str, str]:
-    question_repo = QuestionRepository()
+async def generate_questions_from_pdf(request: Request, file: UploadFile = File(...),
+                                      profile: DecodingProfile | None = Query(None)) -> Dict[str, str]:
     user_id = request.state.user["uid"]
     # Kiểm tra định dạng file
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="file.not_pdf")
 
-    try:
-        # Đọc nội dung của file PDF
-        file_read = await file.read()
-        pdf_reader = PdfReader(io.BytesIO(file_read))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() or ""
-        print(text)
-        
-        # Lấy tên file làm topic, bỏ phần ".pdf"
-        topic = os.path.splitext(file.filename)[0]
-        print(topic)
-
-        # Khởi tạo danh sách kết quả trước khi vòng lặp bắt đầu
-        new_questions = []
-        error_sentences = []
-
-        # Tạo biểu thức chính quy để tìm các dấu ngắt câu
-        sentence_delimiters = r'[.!?\n]'
-
-        # Tách đoạn văn thành các câu
-        sentences = re.split(sentence_delimiters, text)
-
-        # Loại bỏ các câu rỗng
-        sentences = [sentence.strip() for sentence in sentences if sentence.strip()]
-        print(sentences)
-
-        # Gửi yêu cầu cho mỗi câu và thu thập kết quả
-        for sentence in sentences:
-            try:
-                new_question = question_repo.generate_and_store_questions(ModelInput(context=sentence, uid=user_id, name=topic))
-                new_questions.append(new_question)
-            except Exception as e:
-                print(f"Lỗi khi xử lí câu: {sentence}. Lỗi: {e}")
-                error_sentences.append({'sentence': sentence, 'error': str(e)})
-                continue
-        
-        result = {
-            "success": new_questions,
-            "fail": error_sentences
-        }
-        return JSONResponse(status_code=200, content=res_ok(result))
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing PDF: {e}")
+    # Lấy tên file làm topic, bỏ phần ".pdf"
+    topic = os.path.splitext(file.filename)[0]
+
+    # Trích xuất song song theo nhóm trang, câu hỏi được lưu theo từng lô;
+    # header, footer, số trang lặp lại và câu gần trùng bị loại trước khi sinh câu hỏi
+    pages = get_pdf_extractor().iter_pages(file.file)
+    result = await generate_document(pages, user_id, topic, profile, new_deduplicator())
+    return JSONResponse(status_code=200, content=res_ok(result))
 
 @router.post("/image")
-async def generate_questions_from_image(request: Request, file: UploadFile = File(...)):
-    question_repo = QuestionRepository()
+async def generate_questions_from_image(request: Request, file: List[UploadFile] = File(...),
+                                        profile: DecodingProfile | None = Query(None)):
     user_id = request.state.user["uid"]
     
-    # Kiểm tra định dạng file
-    if not file.content_type.startswith("image/"):
+    # Kiểm tra định dạng file (nhiều ảnh hoặc TIFF nhiều trang trong một request)
+    if not all(upload.content_type.startswith("image/") for upload in file):
         raise HTTPException(status_code=400, detail="file.not_image")
     
     try:
-        # Đọc hình ảnh
-        image_data = await file.read()
-        image = Image.open(io.BytesIO(image_data))
-
-        # Sử dụng pytesseract để trích xuất văn bản với ngôn ngữ tiếng Việt
-        extracted_text = pytesseract.image_to_string(image, lang='vie')
-
-        # TODO: Sử dụng văn bản trích xuất để tạo câu hỏi
-        # Ví dụ giả định: sử dụng đoạn văn bản đầu tiên làm câu hỏi, các đoạn sau làm câu trả lời
-        lines = extracted_text.split('\n')
-        combined_text = ""
-        for i, line in enumerate(lines):
-            if i > 0:
-                combined_text += " "  # Thêm khoảng trắng trước mỗi dòng từ dòng thứ hai trở đi
-            combined_text += line
-
-        # Lấy tên file làm topic, bỏ phần ".png, etc"
-        topic = os.path.splitext(file.filename)[0]
-        print(topic)
-
-        # Khởi tạo danh sách kết quả trước khi vòng lặp bắt đầu
-        new_questions = []
-        error_sentences = []
-
-        # Tạo biểu thức chính quy để tìm các dấu ngắt câu
-        sentence_delimiters = r'[.!?\n]'
-
-        # Tách đoạn văn thành các câu
-        sentences = re.split(sentence_delimiters, combined_text)
-
-        # Loại bỏ các câu rỗng
-        sentences = [sentence.strip() for sentence in sentences if sentence.strip()]
-        print(sentences)
-
-        # Gửi yêu cầu cho mỗi câu và thu thập kết quả
-        for sentence in sentences:
-            try:
-                new_question = question_repo.generate_and_store_questions(ModelInput(context=sentence, uid=user_id, name=topic))
-                new_questions.append(new_question)
-            except Exception as e:
-                print(f"Lỗi khi xử lí câu: {sentence}. Lỗi: {e}")
-                error_sentences.append({'sentence': sentence, 'error': str(e)})
-                continue
-        
-        result = {
-            "success": new_questions,
-            "fail": error_sentences
-        }
-        return JSONResponse(status_code=200, content=res_ok(result))
-        
+        # OCR tiếng Việt trên process pool, ảnh đã được thu nhỏ và nhị phân hoá;
+        # truyền thẳng file tạm của upload, không đọc ảnh vào bộ nhớ
+        texts = await get_ocr_service().recognize([upload.file for upload in file])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    # Lấy tên file đầu tiên làm topic, bỏ phần ".png, etc"
+    topic = os.path.splitext(file[0].filename)[0]
+
+    # Mỗi ảnh là một trang; các câu được gom thành đoạn và sinh câu hỏi trong một lượt
+    result = await generate_document(texts, user_id, topic, profile, new_deduplicator())
+    return JSONResponse(status_code=200, content=res_ok(result))
+
 @router.post('/sentence')
 async def generate_questions_from_sentence(body: ICreateQuestion, request: Request):
     """Process user request
@@ -172,7 +129,7 @@ async def generate_questions_from_sentence(body: ICreateQuestion, request: Reque
     error_sentences = []
     model_input = ModelInput(**body.dict(), uid=user_id)
     try:
-        new_questions =  question_repo.generate_and_store_questions(model_input)
+        new_questions = await question_repo.generate_and_store_questions(model_input)
     except Exception as e:
         # Không để là model_input.context mà là request.context vì model_input.context là tiếng Anh
         print(f"Lỗi khi xử lí câu: {body.context}. Lỗi: {e}")
@@ -186,49 +143,21 @@ async def generate_questions_from_sentence(body: ICreateQuestion, request: Reque
         
 @router.post('/paragraph')
 async def generate_questions_from_paragraph(body: ICreateQuestion, request: Request):
-    # API để chia đoạn văn thành các câu và tạo ra các câu hỏi cho từng câu.
-    """Process user request by splitting the context into sentences 
-    and sending requests to the `get-question` API for each sentence.
+    # API để chia đoạn văn thành các câu và tạo ra các câu hỏi cho cả đoạn.
+    """Process user request by packing the sentences of the context into chunks
+    and generating questions for all of them in one pipeline pass.
 
     Args:
-        request (ModelInput): request model
+        body (ICreateQuestion): request model
 
     Returns:
         dict: response with status
     """
-    question_repo = QuestionRepository()
     user_id = request.state.user["uid"]
-    
 
-    # Khởi tạo danh sách kết quả trước khi vòng lặp bắt đầu
-    new_questions = []
-    error_sentences = []
-
-    # Tạo biểu thức chính quy để tìm các dấu ngắt câu
-    sentence_delimiters = r'[.!?]'
-
-    # Tách đoạn văn thành các câu
-    sentences = re.split(sentence_delimiters, request.context)
-
-    # Loại bỏ các câu rỗng
-    sentences = [sentence.strip() for sentence in sentences if sentence.strip()]
-
-    model_input = ModelInput(**body.dict(), uid=user_id)
-    # Gửi yêu cầu cho mỗi câu và thu thập kết quả
-    for sentence in sentences:
-        try:
-            result = question_repo.generate_and_store_questions(ModelInput(context=sentence, uid=model_input.uid, name=model_input.name))
-            new_questions.append(result)
-            # bg_task.add_task(process_request, ModelInput(context=sentence, uid=request.uid, name=request.name))
-        except Exception as e:
-            print(f"Lỗi khi xử lí câu: {sentence}. Lỗi: {e}")
-            error_sentences.append({'sentence': sentence, 'error': str(e)})
-            continue
-
-    result = {
-        "success": new_questions,
-        "fail": error_sentences
-    }
+    # Câu lỗi được trả về trong "fail" theo từng câu của đoạn bị lỗi
+    result = await generate_document([body.context], user_id, body.name, body.profile,
+                                      new_deduplicator())
     return JSONResponse(status_code=200, content=res_ok(result))
      
 
@@ -3,7 +3,7 @@ from fastapi.responses import JSONResponse
 
 
 from src.interface import *
-from src.routers.user import comment, question, rating, topic
+from src.routers.user import comment, job, question, rating, topic
 from src.middleware import JWTBearer
 from src.loaders.database import get_database
 from src.repositories import UserRepository
@@ -16,6 +16,7 @@ router = APIRouter(
 )
 
 router.include_router(comment.router)
+router.include_router(job.router)
 router.include_router(question.router)
 router.include_router(rating.router)
 router.include_router(topic.router)
@@ -0,0 +1,292 @@
+"""
+Background generation jobs.
+
+Generating questions from a long document takes minutes, longer than
+proxies keep a request open. A job is persisted as ``queued`` and its id
+returned at once. One of ``JOB_WORKERS`` worker tasks of this process then
+runs the document pipeline. It persists the ids of questions committed so
+far after every committed batch, and its progress (chunks done out of the
+chunks read so far) and failed sentences at most every ``JOB_HEARTBEAT_S``
+seconds as chunks finish. Clients poll the job or list theirs.
+
+Uploads are copied to temporary files before the request returns, since
+the server removes an upload's spooled file with its request. At most
+``JOB_QUEUE_SIZE`` jobs wait per process, which also bounds those copies.
+Jobs still queued or running when the process shuts down are marked
+failed. Each job records the process owning it, which renews the job's
+heartbeat every ``JOB_HEARTBEAT_S`` seconds; at startup, jobs whose
+heartbeat is older than ``JOB_STALE_AFTER_S`` belonged to a process that
+crashed or was killed and are marked failed.
+"""
+
+import asyncio
+import collections
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+
+from src import config
+from src.textprocessor.dedup import new_deduplicator
+from .ocr import get_ocr_service
+from .pdf_extraction import get_pdf_extractor
+
+_runner = None
+
+Job = collections.namedtuple('Job', 'job_id uid topic pages profile files')
+
+
+class JobQueueFull(RuntimeError):
+    """Every queue slot of the job runner is taken."""
+
+
+async def read_pdf(path):
+    """Yield the text of each page of a PDF file.
+
+    Args:
+        path (str): PDF file path.
+
+    Yields:
+        str: page text.
+    """
+    with open(path, 'rb') as stream:
+        async for page in get_pdf_extractor().iter_pages(stream):
+            yield page
+
+
+async def read_images(paths):
+    """Yield the OCR text of image files, one image per page.
+
+    Args:
+        paths (list(str)): image file paths.
+
+    Yields:
+        str: text of one image.
+    """
+    streams = [open(path, 'rb') for path in paths]
+    try:
+        for text in await get_ocr_service().recognize(streams):
+            yield text
+    finally:
+        for stream in streams:
+            stream.close()
+
+
+class JobRunner:
+    """Run generation jobs on a pool of worker tasks, persisting their state."""
+
+    def __init__(self, store, generate, workers=2, queue_size=32, heartbeat_s=2.0,
+                 stale_after_s=60.0, owner=None):
+        """Initialize runner; the workers start on the first submitted job.
+
+        Args:
+            store (JobRepository): persists job state.
+            generate (callable): ``QuestionRepository.generate_and_store_document``
+                or a function with the same signature.
+            workers (int, optional): jobs run at once. Defaults to 2.
+            queue_size (int, optional): jobs waiting for a worker. Defaults to 32.
+            heartbeat_s (float, optional): seconds between heartbeats, which also
+                persist the progress of running jobs. Defaults to 2.
+            stale_after_s (float, optional): a queued or running job without a
+                heartbeat for this long is abandoned. Defaults to 60.
+            owner (str, optional): name of this process recorded on its jobs.
+                Defaults to host name and pid.
+        """
+        if workers < 1:
+            raise ValueError(f"job runner needs at least one worker, got {workers}")
+        if stale_after_s <= heartbeat_s:
+            raise ValueError(f"stale_after_s={stale_after_s} must exceed "
+                             f"heartbeat_s={heartbeat_s}")
+        self.store = store
+        self.generate = generate
+        self.workers = workers
+        self.queue_size = queue_size
+        self.heartbeat_s = heartbeat_s
+        self.stale_after_s = stale_after_s
+        self.owner = owner or f'{socket.gethostname()}:{os.getpid()}'
+
+        self._queue = None
+        self._tasks = []
+        self._waiting = 0
+        self._owned = set()
+        self._running = {}
+        self._stats = collections.Counter()
+
+    def __start(self):
+        """Start the workers and the heartbeat on the running event loop, once."""
+        if not self._tasks:
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.ensure_future(self.__work()) for _ in range(self.workers)]
+            self._tasks.append(asyncio.ensure_future(self.__beat()))
+
+    async def recover(self):
+        """Mark failed the queued and running jobs whose process stopped heartbeating.
+
+        Returns:
+            int: jobs marked failed.
+        """
+        stale = await self.store.fail_stale(
+            datetime.utcnow() - timedelta(seconds=self.stale_after_s),
+            "interrupted: the server process running it stopped")
+        if stale:
+            logging.warning(f"Marked {stale} abandoned generation job(s) failed")
+        self._stats['recovered'] += stale
+        return stale
+
+    async def __beat(self):
+        """Renew the heartbeat of owned jobs and persist the progress of running ones."""
+        while True:
+            await asyncio.sleep(self.heartbeat_s)
+            try:
+                if self._owned:
+                    await self.store.heartbeat(list(self._owned))
+                for job_id, run in list(self._running.items()):
+                    if job_id not in self._running:   # finished while persisting another
+                        continue
+                    values = run['state']()
+                    if values != run['written']:
+                        await self.store.update(job_id, **values)
+                        run['written'] = values
+            except Exception as err:  # pylint: disable=broad-except
+                logging.error(f"Generation job heartbeat failed: {err}")
+
+    async def submit(self, uid, kind, topic, pages, profile=None, files=()):
+        """Persist a job and queue it.
+
+        Args:
+            uid (int): id of the user owning the questions.
+            kind (str): pdf, image or paragraph.
+            topic (str): topic of the questions.
+            pages (iterable or async iterable(str)): text of each page, read
+                when the job runs, e.g. ``read_pdf(path)``.
+            profile (DecodingProfile, optional): decoding profile.
+            files (tuple(str), optional): temporary files removed when the job ends.
+
+        Returns:
+            dict: queued job.
+
+        Raises:
+            JobQueueFull: ``queue_size`` jobs are already waiting.
+        """
+        if self._waiting >= self.queue_size:
+            self._stats['rejected'] += 1
+            raise JobQueueFull(f"{self._waiting} generation jobs are already waiting")
+        self._waiting += 1
+        try:
+            job = await self.store.create(uid, kind, topic, self.owner)
+        except BaseException:
+            self._waiting -= 1
+            raise
+        self._owned.add(job['job_id'])
+        self.__start()
+        self._queue.put_nowait(Job(job['job_id'], uid, topic, pages, profile, tuple(files)))
+        self._stats['submitted'] += 1
+        return job
+
+    async def __work(self):
+        """Run queued jobs one at a time."""
+        while True:
+            job = await self._queue.get()
+            self._waiting -= 1
+            try:
+                await self.__run(job)
+            finally:
+                self._owned.discard(job.job_id)
+                self.__remove_files(job)
+
+    async def __run(self, job):
+        """Run one job, persisting results after every committed batch.
+
+        The heartbeat persists progress and failed sentences in between, so
+        chunks that fail or produce no questions still show up.
+        """
+        progress, failed, question_ids = {'chunks_done': 0, 'chunks_total': 0}, [], []
+
+        def state(**values):
+            return dict(values, question_ids=list(question_ids), errors=list(failed), **progress)
+
+        self._running[job.job_id] = {'state': state, 'written': None}
+        self._stats['running'] += 1
+        try:
+            await self.store.update(job.job_id, status='running', started_at=datetime.utcnow())
+            async for batch in self.generate(job.pages, job.uid, job.topic, job.profile,
+                                             new_deduplicator(), failed=failed, progress=progress):
+                question_ids.extend(question['question_id'] for question in batch)
+                self._running[job.job_id]['written'] = state()
+                await self.store.update(job.job_id, **self._running[job.job_id]['written'])
+            await self.store.update(job.job_id, **state(status='succeeded',
+                                                        finished_at=datetime.utcnow()))
+            self._stats['succeeded'] += 1
+        except asyncio.CancelledError:
+            await self.__fail(job.job_id, "interrupted by server shutdown", **state())
+            raise
+        except Exception as err:  # pylint: disable=broad-except
+            logging.exception(f"Generation job {job.job_id} failed")
+            await self.__fail(job.job_id, str(err) or type(err).__name__, **state())
+        finally:
+            del self._running[job.job_id]
+            self._stats['running'] -= 1
+
+    async def __fail(self, job_id, error, **values):
+        """Mark a job failed, keeping the questions it committed."""
+        self._stats['failed'] += 1
+        try:
+            await self.store.update(job_id, status='failed', error=error,
+                                    finished_at=datetime.utcnow(), **values)
+        except Exception as err:  # pylint: disable=broad-except
+            logging.error(f"Could not mark generation job {job_id} failed: {err}")
+
+    @staticmethod
+    def __remove_files(job):
+        """Remove the temporary upload copies of a job."""
+        for path in job.files:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def stats(self):
+        """Return jobs waiting, running, submitted, succeeded, failed and rejected.
+
+        Returns:
+            dict: job counters of this process.
+        """
+        return dict(self._stats, waiting=self._waiting, workers=self.workers,
+                    queue_size=self.queue_size)
+
+    async def shutdown(self):
+        """Stop the workers and mark the jobs they had not finished failed."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            self._waiting -= 1
+            self._owned.discard(job.job_id)
+            await self.__fail(job.job_id, "interrupted by server shutdown")
+            self.__remove_files(job)
+
+
+def get_job_runner():
+    """Return the process-wide job runner configured from ``JOB_*`` settings.
+
+    Returns:
+        JobRunner: shared runner.
+    """
+    global _runner  # pylint: disable=global-statement
+    if _runner is None:
+        # repositories load the database models; import them only once jobs are used
+        # pylint: disable=import-outside-toplevel
+        from src.repositories import JobRepository, QuestionRepository
+        _runner = JobRunner(
+            JobRepository(), QuestionRepository().generate_and_store_document,
+            workers=config.get_int('JOB_WORKERS', 2),
+            queue_size=config.get_int('JOB_QUEUE_SIZE', 32),
+            heartbeat_s=config.get_float('JOB_HEARTBEAT_S', 2.0),
+            stale_after_s=config.get_float('JOB_STALE_AFTER_S', 60.0))
+    return _runner
+
+
+async def shutdown_job_runner():
+    """Stop the shared runner's workers, if it was created."""
+    if _runner is not None:
+        await _runner.shutdown()
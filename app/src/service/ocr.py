@@ -0,0 +1,300 @@
+"""
+OCR of uploaded images on a bounded process pool.
+
+Tesseract time grows with pixel count, and a 12MP phone photo carries far
+more pixels than its text needs. Every frame is converted to grayscale,
+downscaled to at most ``OCR_MAX_MEGAPIXELS`` and binarized with an Otsu
+threshold before OCR. Multi-page TIFFs are OCRed frame by frame. Uploads
+are passed as their spooled files, hashed block by block and handed to the
+workers as a path, so the image bytes are never copied into the API process.
+Results are cached by the SHA-256 of the image, and the pool reports OCR
+seconds per megapixel of input so that ``OCR_WORKERS`` can be sized from traffic.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pytesseract
+from PIL import Image, ImageSequence
+
+from src import config
+from src.loaders.executor import make_process_pool, run_blocking
+from .uploads import hash_file, spool_to_disk
+
+_service = None
+
+
+def otsu_threshold(histogram):
+    """Return the gray level that best separates a 256-bin histogram into two classes.
+
+    Args:
+        histogram (list(int)): pixel count per gray level.
+
+    Returns:
+        int: threshold; levels above it are background.
+    """
+    total = sum(histogram)
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    best, threshold = -1.0, 127
+    below = weighted_below = 0
+    for level, count in enumerate(histogram):
+        below += count
+        above = total - below
+        if below == 0:
+            continue
+        if above == 0:
+            break
+        weighted_below += level * count
+        mean_below = weighted_below / below
+        mean_above = (weighted_total - weighted_below) / above
+        variance = below * above * (mean_below - mean_above) ** 2
+        if variance > best:
+            best, threshold = variance, level
+    return threshold
+
+
+def normalize_image(image, max_pixels=4_000_000):
+    """Grayscale, downscale and binarize an image for OCR.
+
+    Args:
+        image (PIL.Image.Image): input frame.
+        max_pixels (int, optional): pixel budget of the output. Defaults to 4MP.
+
+    Returns:
+        PIL.Image.Image: black-and-white image of at most ``max_pixels`` pixels.
+    """
+    gray = image.convert('L')
+    pixels = gray.width * gray.height
+    if pixels > max_pixels:
+        scale = (max_pixels / pixels) ** 0.5
+        gray = gray.resize((max(1, int(gray.width * scale)), max(1, int(gray.height * scale))),
+                           Image.LANCZOS)
+    threshold = otsu_threshold(gray.histogram())
+    return gray.point([255 if level > threshold else 0 for level in range(256)])
+
+
+def iter_frames(image):
+    """Yield every frame of an image; a multi-page TIFF has one per page.
+
+    Args:
+        image (PIL.Image.Image): opened image.
+
+    Yields:
+        PIL.Image.Image: frame.
+    """
+    for frame in ImageSequence.Iterator(image):
+        yield frame
+
+
+def ocr_image(source, lang='vie', max_pixels=4_000_000, tesseract_cmd=None):
+    """OCR every frame of an encoded image in a pool worker.
+
+    Args:
+        source (str | bytes): path of an image file, or the encoded image
+            (PNG, JPEG, TIFF, ...).
+        lang (str, optional): tesseract language. Defaults to 'vie'.
+        max_pixels (int, optional): pixel budget per frame. Defaults to 4MP.
+        tesseract_cmd (str, optional): tesseract binary, for pool workers
+            that do not inherit the setting of the API process.
+
+    Returns:
+        tuple(str, int, float, float): text of all frames, frame count,
+        megapixels of the input and seconds spent.
+    """
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    begin = time.perf_counter()
+    texts, frames, megapixels = [], 0, 0.0
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as image:
+        for frame in iter_frames(image):
+            frames += 1
+            megapixels += frame.width * frame.height / 1e6
+            text = pytesseract.image_to_string(normalize_image(frame, max_pixels), lang=lang)
+            texts.append(text.strip())
+    return '\n'.join(text for text in texts if text), frames, megapixels, \
+        time.perf_counter() - begin
+
+
+class OcrService:
+    """OCR images on a bounded process pool with a cache keyed by image hash."""
+
+    def __init__(self, workers=2, lang='vie', max_megapixels=4.0, cache_items=512):
+        """Initialize service; the pool starts on first use.
+
+        Args:
+            workers (int, optional): worker processes. Defaults to 2.
+            lang (str, optional): tesseract language. Defaults to 'vie'.
+            max_megapixels (float, optional): pixel budget per frame after
+                downscaling. Defaults to 4.
+            cache_items (int, optional): OCR results kept in memory. Defaults to 512.
+        """
+        if workers < 1:
+            raise ValueError(f"OCR needs at least one worker, got {workers}")
+        self.workers = workers
+        self.lang = lang
+        self.max_pixels = int(max_megapixels * 1e6)
+        self.cache_items = cache_items
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = None
+        self._slots_loop = None
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._stats = {'images': 0, 'frames': 0, 'megapixels': 0.0, 'seconds': 0.0,
+                       'cache_hits': 0, 'skipped': 0}
+
+    def __executor(self):
+        """Return the process pool, creating it on first use."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = make_process_pool(self.workers)
+            return self._pool
+
+    @property
+    def settings(self):
+        """str: the settings that change the recognized text, e.g. ``vie-4000000``."""
+        return f'{self.lang}-{self.max_pixels}'
+
+    def __cache_key(self, digest):
+        """Key an OCR result by image content and the settings that change the text."""
+        return f'{digest}:{self.settings}'
+
+    async def __run(self, source):
+        """OCR one image in the pool, at most ``2 * workers`` images queued or running."""
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots, self._slots_loop = asyncio.Semaphore(2 * self.workers), loop
+        async with self._slots:
+            return await loop.run_in_executor(
+                self.__executor(), ocr_image, source, self.lang, self.max_pixels,
+                pytesseract.pytesseract.tesseract_cmd)
+
+    async def recognize_one(self, image):
+        """Return the text of one encoded image, all frames of a TIFF included.
+
+        Args:
+            image (bytes | file): encoded image, or a seekable binary file
+                holding it, e.g. the spooled file of an upload.
+
+        Returns:
+            str: recognized text.
+        """
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            key = self.__cache_key(hashlib.sha256(image).hexdigest())
+        else:
+            key = self.__cache_key(await run_blocking(hash_file, image))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self._stats['cache_hits'] += 1
+            return self._cache[key]
+        if key in self._pending:
+            # the same image is already being OCRed for another caller
+            self._stats['cache_hits'] += 1
+            return await asyncio.shield(self._pending[key])
+
+        self._pending[key] = asyncio.ensure_future(self.__ocr(key, image))
+        try:
+            return await asyncio.shield(self._pending[key])
+        finally:
+            self._pending.pop(key, None)
+
+    async def __ocr(self, key, image):
+        """OCR one image missing from the cache, then record its stats and cache its text."""
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            text, frames, megapixels, seconds = await self.__run(bytes(image))
+        else:
+            # workers open a copy on disk instead of receiving the bytes
+            path = await run_blocking(spool_to_disk, image)
+            try:
+                text, frames, megapixels, seconds = await self.__run(path)
+            finally:
+                os.remove(path)
+        self._stats['images'] += 1
+        self._stats['frames'] += frames
+        self._stats['megapixels'] += megapixels
+        self._stats['seconds'] += seconds
+
+        self._cache[key] = text
+        while len(self._cache) > self.cache_items:
+            self._cache.popitem(last=False)
+        return text
+
+    async def __recognize_or_skip(self, image):
+        """Return the text of one image, or '' when it cannot be decoded or OCRed."""
+        try:
+            return await self.recognize_one(image)
+        except pytesseract.TesseractNotFoundError:
+            raise
+        except (OSError, ValueError, Image.DecompressionBombError,
+                pytesseract.TesseractError) as err:
+            # an image Pillow cannot decode, e.g. a PDF filter it lacks, or tesseract rejects
+            logging.warning(f"Skipped unreadable image: {err}")
+            self._stats['skipped'] += 1
+            return ''
+
+    async def recognize(self, images, skip_unreadable=False):
+        """Return the text of several encoded images, OCRed in parallel.
+
+        Args:
+            images (list(bytes | file)): encoded images or binary files holding them.
+            skip_unreadable (bool, optional): log an image that cannot be decoded
+                or OCRed and return '' for it instead of raising. A missing
+                tesseract binary still raises. Defaults to False.
+
+        Returns:
+            list(str): recognized text per image, in input order.
+        """
+        recognize = self.__recognize_or_skip if skip_unreadable else self.recognize_one
+        return list(await asyncio.gather(*(recognize(image) for image in images)))
+
+    def stats(self):
+        """Return images, frames and megapixels OCRed, cache hits, skipped images and
+        seconds per megapixel.
+
+        Seconds are measured inside the workers, so ``seconds_per_megapixel``
+        is the cost of one worker; the pool serves ``workers`` times that rate.
+
+        Returns:
+            dict: OCR counters.
+        """
+        stats = dict(self._stats, workers=self.workers)
+        stats['seconds_per_megapixel'] = (stats['seconds'] / stats['megapixels']
+                                          if stats['megapixels'] else 0.0)
+        return stats
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+
+def get_ocr_service():
+    """Return the process-wide OCR service configured from ``OCR_*`` settings.
+
+    Returns:
+        OcrService: shared service.
+    """
+    global _service  # pylint: disable=global-statement
+    if _service is None:
+        _service = OcrService(
+            workers=config.get_int('OCR_WORKERS', 2),
+            lang=config.get_str('OCR_LANG', 'vie'),
+            max_megapixels=config.get_float('OCR_MAX_MEGAPIXELS', 4.0),
+            cache_items=config.get_int('OCR_CACHE_ITEMS', 512))
+    return _service
+
+
+def shutdown_ocr_service():
+    """Stop the shared service's worker processes, if it was created."""
+    if _service is not None:
+        _service.shutdown()
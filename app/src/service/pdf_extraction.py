@@ -0,0 +1,277 @@
+"""
+Page-parallel PDF text extraction.
+
+``extract_text`` of PyPDF2 is pure Python and CPU bound, so one large upload
+keeps a single core busy for most of its request. ``PdfExtractor`` splits the
+page range into shards of ``PDF_PAGES_PER_SHARD`` pages, extracts them on a
+process pool of ``PDF_WORKERS`` workers and yields the text back in page
+order. The images of pages without a text layer (scans) are handed to the
+OCR service as soon as their shard is extracted, so they are OCRed on its
+pool while the other shards are still being extracted. Extracted text is cached on disk by
+the SHA-256 of the file and the OCR settings, so a re-uploaded document skips extraction
+entirely, while one extracted without OCR is extracted again once OCR is on. The
+least recently used documents are evicted once the cache outgrows ``PDF_CACHE_MAX_MB``.
+"""
+
+import asyncio
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+from src import config
+from src.loaders.executor import iterate_blocking, make_process_pool, run_blocking
+from src.textprocessor.document import (
+    count_pdf_pages, extract_pdf_pages, extract_pdf_page_images)
+from .ocr import get_ocr_service
+from .uploads import hash_file, spool_to_disk
+
+_extractor = None
+
+
+def extract_shard(path, start, stop, ocr_min_chars=0):
+    """Extract a page range in a pool worker and time it.
+
+    Args:
+        path (str): PDF file path.
+        start (int): first page index.
+        stop (int): page index after the last page.
+        ocr_min_chars (int, optional): pages with fewer non-blank characters
+            also return their images. Defaults to 0, no images.
+
+    Returns:
+        tuple(list(str), dict(int, list(bytes)), float): text per page, images
+        per text-less page index and seconds spent extracting.
+    """
+    begin = time.perf_counter()
+    pages = extract_pdf_pages(path, start, stop)
+    textless = [start + offset for offset, page in enumerate(pages)
+                if len(''.join(page.split())) < ocr_min_chars]
+    images = extract_pdf_page_images(path, textless) if textless else {}
+    return pages, images, time.perf_counter() - begin
+
+
+def read_cached_pages(path):
+    """Yield the pages of a cache file, one JSON string per line."""
+    with open(path, encoding='utf-8') as cached:
+        for line in cached:
+            yield json.loads(line)
+
+
+class PdfExtractor:
+    """Extract PDF text on a process pool, shard by shard, with a content-hash cache."""
+
+    def __init__(self, workers=2, pages_per_shard=8, cache_dir=None, ocr=None, ocr_min_chars=1,
+                 cache_max_bytes=256 * 1024 * 1024):
+        """Initialize extractor; the pools start on first use.
+
+        Args:
+            workers (int, optional): worker processes. 0 extracts on the default
+                thread pool of the caller instead. Defaults to 2.
+            pages_per_shard (int, optional): pages one worker extracts per task. Defaults to 8.
+            cache_dir (str, optional): directory of the text cache. No caching when None.
+            ocr (OcrService, optional): OCRs the images of text-less pages.
+                Those pages stay empty when None.
+            ocr_min_chars (int, optional): pages with fewer non-blank characters
+                of extracted text are OCRed. Defaults to 1.
+            cache_max_bytes (int, optional): size of the text cache above which the
+                least recently used documents are evicted. Defaults to 256MB.
+        """
+        if pages_per_shard < 1:
+            raise ValueError(f"pages_per_shard must be at least 1, got {pages_per_shard}")
+        self.workers = workers
+        self.pages_per_shard = pages_per_shard
+        self.cache_dir = cache_dir or None
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self.ocr = ocr
+        self.ocr_min_chars = ocr_min_chars if ocr is not None else 0
+        self.cache_max_bytes = cache_max_bytes
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self._stats = {'documents': 0, 'pages': 0, 'shard_seconds': 0.0, 'cache_hits': 0,
+                       'cache_evictions': 0, 'ocr_pages': 0}
+
+    def __executor(self):
+        """Return the extraction pool, creating it on first use; None without workers."""
+        if self.workers < 1:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = make_process_pool(self.workers)
+            return self._pool
+
+    def __cache_path(self, digest):
+        """Return the cache file of a document hash, or None without a cache.
+
+        The text of a document depends on whether and how its text-less pages
+        are OCRed, so those settings are part of the file name.
+        """
+        if not self.cache_dir:
+            return None
+        ocr = f'ocr-{self.ocr.settings}-{self.ocr_min_chars}' if self.ocr is not None else 'text'
+        return os.path.join(self.cache_dir, f'{digest}.{ocr}.jsonl')
+
+    def __trim_cache(self):
+        """Remove the least recently used cache files until the cache fits its size cap."""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.jsonl'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in sorted(files):
+            if size <= self.cache_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # another worker evicted it first
+                pass
+            size -= file_size
+            self._stats['cache_evictions'] += 1
+
+    async def __extract_shards(self, path):
+        """Yield pages of a PDF file, extracting shards in parallel and keeping page order."""
+        total = await run_blocking(count_pdf_pages, path)
+        shards = collections.deque(
+            (start, min(start + self.pages_per_shard, total))
+            for start in range(0, total, self.pages_per_shard))
+
+        loop = asyncio.get_running_loop()
+        executor = self.__executor()
+        ocr_futures = []
+
+        async def run_ocr(images):
+            self._stats['ocr_pages'] += 1
+            # one undecodable image must not fail the whole document
+            texts = await self.ocr.recognize(images, skip_unreadable=True)
+            return '\n'.join(text for text in texts if text)
+
+        async def run_shard(start, stop):
+            pages, images, seconds = await loop.run_in_executor(
+                executor, extract_shard, path, start, stop, self.ocr_min_chars)
+            self._stats['pages'] += len(pages)
+            self._stats['shard_seconds'] += seconds
+            # OCR starts now, not when the consumer reaches this shard
+            for index, page_images in images.items():
+                if page_images:
+                    pages[index - start] = asyncio.ensure_future(run_ocr(page_images))
+                    ocr_futures.append(pages[index - start])
+            return pages
+
+        # keep every worker busy while bounding the text waiting to be consumed
+        in_flight = collections.deque()
+        try:
+            while shards or in_flight:
+                while shards and len(in_flight) < 2 * max(1, self.workers):
+                    in_flight.append(asyncio.ensure_future(run_shard(*shards.popleft())))
+                for page in await in_flight.popleft():
+                    yield await page if isinstance(page, asyncio.Future) else page
+        finally:
+            for future in [*in_flight, *ocr_futures]:
+                future.cancel()
+            await asyncio.gather(*in_flight, *ocr_futures, return_exceptions=True)
+
+    async def iter_pages(self, stream):
+        """Yield the text of each page of a PDF upload, in page order.
+
+        Args:
+            stream (file): seekable binary file holding the PDF, e.g. the spooled
+                file of an upload.
+
+        Yields:
+            str: text of one page, empty when the page has no text layer.
+        """
+        digest = await run_blocking(hash_file, stream)
+        cache_path = self.__cache_path(digest)
+
+        if cache_path and os.path.exists(cache_path):
+            try:
+                # the modification time orders evictions, so a hit renews the entry
+                os.utime(cache_path)
+            except FileNotFoundError:
+                pass
+            else:
+                self._stats['cache_hits'] += 1
+                async for page in iterate_blocking(read_cached_pages(cache_path)):
+                    yield page
+                return
+
+        path = await run_blocking(spool_to_disk, stream, '.pdf')
+        pages = 0
+        partial = f'{cache_path}.{os.getpid()}.{id(stream)}.tmp' if cache_path else None
+        cached = open(partial, 'w', encoding='utf-8') if partial else None
+        try:
+            async for page in self.__extract_shards(path):
+                if cached:
+                    cached.write(json.dumps(page) + '\n')
+                pages += 1
+                yield page
+            if cached:
+                cached.close()
+                os.replace(partial, cache_path)
+                await run_blocking(self.__trim_cache)
+        finally:
+            if cached and not cached.closed:
+                cached.close()
+            if partial and os.path.exists(partial):
+                os.remove(partial)
+            os.remove(path)
+            self._stats['documents'] += 1
+
+        logging.info(f"Extracted {pages} PDF pages "
+                     f"({self.stats()['pages_per_second']:.1f} pages/s per worker)")
+
+    def stats(self):
+        """Return documents and pages extracted, worker seconds, cache hits and pages/sec.
+
+        ``pages_per_second`` is the rate of one worker, measured inside the
+        workers so that time a document waits on generation does not count;
+        with every worker busy the pool extracts ``workers`` times as fast.
+        OCR time of scanned pages is reported by the OCR service.
+
+        Returns:
+            dict: extraction counters.
+        """
+        stats = dict(self._stats, workers=self.workers)
+        stats['pages_per_second'] = (stats['pages'] / stats['shard_seconds']
+                                     if stats['shard_seconds'] else 0.0)
+        return stats
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+
+def get_pdf_extractor():
+    """Return the process-wide PDF extractor configured from ``PDF_*`` settings.
+
+    Returns:
+        PdfExtractor: shared extractor.
+    """
+    global _extractor  # pylint: disable=global-statement
+    if _extractor is None:
+        _extractor = PdfExtractor(
+            workers=config.get_int('PDF_WORKERS', 2),
+            pages_per_shard=config.get_int('PDF_PAGES_PER_SHARD', 8),
+            cache_dir=config.get_str('PDF_CACHE_DIR', 'resources/pdf_cache'),
+            ocr=get_ocr_service() if config.get_bool('PDF_OCR', True) else None,
+            ocr_min_chars=config.get_int('PDF_OCR_MIN_CHARS', 1),
+            cache_max_bytes=config.get_int('PDF_CACHE_MAX_MB', 256) * 1024 * 1024)
+    return _extractor
+
+
+def shutdown_pdf_extractor():
+    """Stop the shared extractor's worker processes, if it was created."""
+    if _extractor is not None:
+        _extractor.shutdown()
@@ -0,0 +1,211 @@
+"""
+Size-capped upload handling.
+
+Starlette spools multipart file parts to a temporary file above 1MB, so an
+upload is held on disk, not in memory, unless a handler calls ``read()`` on
+it. Handlers therefore pass the spooled file itself to the parsers, which
+hash it block by block and hand pool workers a path instead of the bytes.
+
+Disk and parser time are still bounded: ``UploadLimitMiddleware`` reserves
+the ``Content-Length`` of every multipart request against a per-request
+cap, a per-user cap and a cap on all uploads in flight before a byte of the
+body is read, and answers 413 when a reservation does not fit. The
+reservation is held until the response is sent, since the spooled files
+live that long.
+"""
+
+import hashlib
+import json
+import tempfile
+import threading
+
+from src import config
+
+_quota = None
+
+BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(stream):
+    """Return the SHA-256 hex digest of a binary file, reading it from the start.
+
+    Args:
+        stream (file): seekable binary file.
+
+    Returns:
+        str: hex digest.
+    """
+    digest = hashlib.sha256()
+    stream.seek(0)
+    while block := stream.read(BLOCK_SIZE):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def spool_to_disk(stream, suffix=''):
+    """Copy a binary file to a named temporary file pool workers can open.
+
+    Args:
+        stream (file): seekable binary file.
+        suffix (str, optional): file name suffix, e.g. '.pdf'. Defaults to ''.
+
+    Returns:
+        str: path of the copy; the caller removes it.
+    """
+    stream.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as out:
+        while block := stream.read(BLOCK_SIZE):
+            out.write(block)
+    return out.name
+
+
+class UploadTooLarge(ValueError):
+    """An upload does not fit in the per-request, per-user or global byte cap."""
+
+
+class UploadQuota:
+    """Bytes of uploads in flight, per user and in total, with caps on both."""
+
+    def __init__(self, max_bytes=50 * 2**20, user_max_bytes=100 * 2**20,
+                 total_max_bytes=500 * 2**20):
+        """Initialize quota.
+
+        Args:
+            max_bytes (int, optional): largest single request. Defaults to 50MB.
+            user_max_bytes (int, optional): uploads of one user in flight.
+                Defaults to 100MB.
+            total_max_bytes (int, optional): uploads of all users in flight.
+                Defaults to 500MB.
+        """
+        self.max_bytes = max_bytes
+        self.user_max_bytes = user_max_bytes
+        self.total_max_bytes = total_max_bytes
+
+        self._lock = threading.Lock()
+        self._users = {}
+        self._total = 0
+        self._stats = {'accepted': 0, 'rejected': 0, 'peak_bytes': 0}
+
+    def reserve(self, user, nbytes):
+        """Reserve bytes for one upload of a user.
+
+        Args:
+            user (str): user key.
+            nbytes (int): size of the upload.
+
+        Raises:
+            UploadTooLarge: the upload does not fit in one of the caps.
+        """
+        with self._lock:
+            held = self._users.get(user, 0)
+            if nbytes > self.max_bytes:
+                reason = f"upload of {nbytes} bytes is over the {self.max_bytes} byte limit"
+            elif held + nbytes > self.user_max_bytes:
+                reason = f"user already has {held} bytes of uploads in flight"
+            elif self._total + nbytes > self.total_max_bytes:
+                reason = f"server already has {self._total} bytes of uploads in flight"
+            else:
+                self._users[user] = held + nbytes
+                self._total += nbytes
+                self._stats['accepted'] += 1
+                self._stats['peak_bytes'] = max(self._stats['peak_bytes'], self._total)
+                return
+            self._stats['rejected'] += 1
+        raise UploadTooLarge(reason)
+
+    def release(self, user, nbytes):
+        """Return the bytes of a finished upload.
+
+        Args:
+            user (str): user key passed to ``reserve``.
+            nbytes (int): size passed to ``reserve``.
+        """
+        with self._lock:
+            held = self._users.get(user, 0) - nbytes
+            if held > 0:
+                self._users[user] = held
+            else:
+                self._users.pop(user, None)
+            self._total -= nbytes
+
+    def stats(self):
+        """Return bytes in flight, caps and accepted/rejected counters.
+
+        Returns:
+            dict: quota counters.
+        """
+        with self._lock:
+            return dict(self._stats, bytes_in_flight=self._total, users=len(self._users),
+                        max_bytes=self.max_bytes, user_max_bytes=self.user_max_bytes,
+                        total_max_bytes=self.total_max_bytes)
+
+
+def client_address(scope):
+    """Key uploads by client address, for requests without a known user."""
+    client = scope.get('client')
+    return client[0] if client else ''
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware rejecting multipart requests that do not fit in the upload quota."""
+
+    def __init__(self, app, quota=None, identify=client_address):
+        """Wrap an ASGI app.
+
+        Args:
+            app (callable): ASGI app.
+            quota (UploadQuota, optional): caps to enforce. Defaults to ``get_upload_quota()``.
+            identify (callable, optional): returns the user key of an ASGI scope.
+                Defaults to the client address.
+        """
+        self.app = app
+        self.quota = quota or get_upload_quota()
+        self.identify = identify
+
+    async def __call__(self, scope, receive, send):
+        headers = dict(scope.get('headers') or []) if scope['type'] == 'http' else {}
+        if not headers.get(b'content-type', b'').startswith(b'multipart/form-data'):
+            await self.app(scope, receive, send)
+            return
+
+        length = headers.get(b'content-length', b'')
+        if not length.isdigit():
+            # chunked uploads cannot be reserved before their body is read
+            await self.__reject(send, 411, 'file.length_required')
+            return
+
+        user, nbytes = self.identify(scope), int(length)
+        try:
+            self.quota.reserve(user, nbytes)
+        except UploadTooLarge:
+            await self.__reject(send, 413, 'file.too_large')
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.quota.release(user, nbytes)
+
+    @staticmethod
+    async def __reject(send, status, detail):
+        """Answer without reading the body, in the shape of an ``HTTPException``."""
+        body = json.dumps({'detail': detail}).encode()
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'),
+                                (b'content-length', str(len(body)).encode()),
+                                (b'connection', b'close')]})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def get_upload_quota():
+    """Return the process-wide upload quota configured from ``UPLOAD_*`` settings.
+
+    Returns:
+        UploadQuota: shared quota.
+    """
+    global _quota  # pylint: disable=global-statement
+    if _quota is None:
+        _quota = UploadQuota(
+            max_bytes=config.get_int('UPLOAD_MAX_MB', 50) * 2**20,
+            user_max_bytes=config.get_int('UPLOAD_USER_MAX_MB', 100) * 2**20,
+            total_max_bytes=config.get_int('UPLOAD_TOTAL_MAX_MB', 500) * 2**20)
+    return _quota
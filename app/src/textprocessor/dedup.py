@@ -0,0 +1,287 @@
+"""This module removes repeated text from a document before generation.
+
+Running headers, footers and page numbers repeat on every page of a PDF,
+and textbooks restate the same sentence in summaries and exercises. Each
+copy would be translated, summarized and searched for keywords again, so
+``Deduplicator`` drops lines that repeat across pages (digits of short
+lines ignored, so "Trang 12" matches "Trang 13") and sentences whose word
+shingles are nearly all shared with a sentence already kept.
+
+Memory stays bounded on long documents: sentences are compared with the
+last ``window_sentences`` kept ones only, shingles as common as "one of the"
+stop being indexed once ``max_postings`` kept sentences share them, and
+lines seen on too few pages are forgotten once the lookahead has passed.
+"""
+
+import collections
+import re
+
+from src import config
+
+# a sentence runs up to a run of terminators; text after the last one is a sentence too
+_SENTENCE = re.compile(r'[^.!?]+[.!?]*')
+_WORD = re.compile(r'\w+')
+_DIGITS = re.compile(r'\d+')
+
+_totals = collections.Counter()
+
+
+def line_key(line, numbered_words=6):
+    """Return the key repeated lines share: lower case and single spaced.
+
+    Digits of short lines become '#', so page numbers and running headers
+    such as "Chương 2 - Trang 31" match on every page, while body lines that
+    differ only in their numbers stay distinct.
+
+    Args:
+        line (str): line of a page.
+        numbered_words (int, optional): lines of at most this many words
+            match regardless of digits. Defaults to 6.
+
+    Returns:
+        str: key, empty for a blank line.
+    """
+    words = line.lower().split()
+    key = ' '.join(words)
+    return _DIGITS.sub('#', key) if len(words) <= numbered_words else key
+
+
+def shingles(words, size=3):
+    """Return the hashes of the runs of ``size`` consecutive words.
+
+    Args:
+        words (list(str)): words of a sentence.
+        size (int, optional): words per shingle. Defaults to 3.
+
+    Returns:
+        set(int): shingle hashes, empty for a sentence shorter than ``size``.
+    """
+    return {hash(tuple(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+
+class Deduplicator:
+    """Drop repeated lines and near-duplicate sentences from the pages of one document."""
+
+    def __init__(self, min_pages=3, lookahead_pages=8, max_line_chars=120,
+                 shingle_size=3, similarity=0.8, window_sentences=2000, max_postings=64):
+        """Initialize deduplicator; use one instance per document.
+
+        Args:
+            min_pages (int, optional): a line on this many pages is boilerplate. Defaults to 3.
+            lookahead_pages (int, optional): pages held back before the first is
+                released, so that lines repeating on later pages are dropped
+                from the first ones too. Defaults to 8.
+            max_line_chars (int, optional): longer lines are never boilerplate. Defaults to 120.
+            shingle_size (int, optional): words per shingle; shorter sentences
+                are always kept. Defaults to 3.
+            similarity (float, optional): Jaccard similarity of shingles above
+                which a sentence is a duplicate. Defaults to 0.8.
+            window_sentences (int, optional): kept sentences a new sentence is
+                compared with, the most recent ones. Defaults to 2000.
+            max_postings (int, optional): kept sentences indexed per shingle; a
+                shingle shared by more is too common to find duplicates with.
+                Defaults to 64.
+        """
+        if min_pages < 2:
+            raise ValueError(f"min_pages must be at least 2, got {min_pages}")
+        self.min_pages = min_pages
+        self.lookahead_pages = lookahead_pages
+        self.max_line_chars = max_line_chars
+        self.shingle_size = shingle_size
+        self.similarity = similarity
+        self.window_sentences = window_sentences
+        self.max_postings = max_postings
+
+        self._held = []
+        self._released = False
+        self._line_pages = collections.Counter()
+        self._line_seen = {}
+        self._kept = collections.OrderedDict()
+        self._next_id = 0
+        self._index = collections.defaultdict(collections.deque)
+        self._stats = {'pages': 0, 'lines_removed': 0, 'sentences_removed': 0,
+                       'chars_in': 0, 'chars_removed': 0, 'model_calls_saved': 0}
+
+    def __count_lines(self, page):
+        """Count every short line of a page once."""
+        page_number = self._stats['pages']
+        keys = {line_key(line) for line in page.splitlines()}
+        for key in keys:
+            if key and len(key) <= self.max_line_chars:
+                self._line_pages[key] += 1
+                self._line_seen[key] = page_number
+
+    def __forget_lines(self):
+        """Forget lines on fewer than ``min_pages`` pages, none of them within the lookahead."""
+        oldest = self._stats['pages'] - self.lookahead_pages
+        for key in [key for key, seen in self._line_seen.items()
+                    if seen <= oldest and self._line_pages[key] < self.min_pages]:
+            del self._line_pages[key], self._line_seen[key]
+
+    def __is_duplicate(self, sentence):
+        """Return whether a sentence is close to a kept one; index it when it is not."""
+        words = _WORD.findall(sentence.lower())
+        own = shingles(words, self.shingle_size)
+        if not own:
+            return False
+        candidates = set()
+        for shingle in own:
+            postings = self._index.get(shingle)
+            if postings and len(postings) < self.max_postings:
+                candidates.update(postings)
+        for kept in candidates:
+            shared = len(own & self._kept[kept])
+            if shared / (len(own) + len(self._kept[kept]) - shared) >= self.similarity:
+                return True
+        self.__keep(own)
+        return False
+
+    def __keep(self, own):
+        """Index the shingles of a kept sentence, dropping the oldest beyond the window."""
+        sentence_id, self._next_id = self._next_id, self._next_id + 1
+        self._kept[sentence_id] = own
+        for shingle in own:
+            if len(self._index[shingle]) < self.max_postings:
+                self._index[shingle].append(sentence_id)
+        if len(self._kept) > self.window_sentences:
+            oldest, old = self._kept.popitem(last=False)
+            for shingle in old:
+                postings = self._index[shingle]
+                # ids are appended in order, so the oldest one is first
+                if postings and postings[0] == oldest:
+                    postings.popleft()
+                if not postings:
+                    del self._index[shingle]
+
+    def __clean(self, page):
+        """Return a page without boilerplate lines and duplicate sentences."""
+        lines = []
+        for line in page.splitlines():
+            if self._line_pages[line_key(line)] >= self.min_pages:
+                self._stats['lines_removed'] += 1
+                self._stats['chars_removed'] += len(line)
+            elif line.strip():
+                lines.append(line.strip())
+
+        pieces = []
+        for match in _SENTENCE.finditer(' '.join(lines)):
+            if self.__is_duplicate(match.group()):
+                self._stats['sentences_removed'] += 1
+                self._stats['chars_removed'] += len(match.group())
+            else:
+                pieces.append(match.group())
+        return ''.join(pieces).strip()
+
+    def feed(self, page):
+        """Add the next page and return the pages now ready, cleaned and in order.
+
+        Args:
+            page (str): text of the next page.
+
+        Returns:
+            list(str): cleaned pages; empty while the lookahead fills up at
+            the start of the document.
+        """
+        self._stats['pages'] += 1
+        self._stats['chars_in'] += len(page)
+        self.__count_lines(page)
+        self._held.append(page)
+        if not self._released and len(self._held) <= self.lookahead_pages:
+            return []
+        cleaned = self.flush()
+        if self._stats['pages'] % max(1, self.lookahead_pages) == 0:
+            self.__forget_lines()
+        return cleaned
+
+    def flush(self):
+        """Return the pages still held back, cleaned.
+
+        Returns:
+            list(str): cleaned pages.
+        """
+        held, self._held, self._released = self._held, [], True
+        return [self.__clean(page) for page in held]
+
+    def clean_pages(self, pages):
+        """Clean all pages of a document held in memory, e.g. the texts of uploaded images.
+
+        Args:
+            pages (list(str)): text of each page.
+
+        Returns:
+            list(str): cleaned pages.
+        """
+        cleaned = []
+        for page in pages:
+            cleaned.extend(self.feed(page))
+        return cleaned + self.flush()
+
+    async def iter_pages(self, pages):
+        """Clean the pages of a document as they stream in.
+
+        Args:
+            pages (async iterable(str)): text of each page, in order.
+
+        Yields:
+            str: cleaned page, in order.
+        """
+        async for page in pages:
+            for cleaned in self.feed(page):
+                yield cleaned
+        for cleaned in self.flush():
+            yield cleaned
+
+    def record_generation(self, chunks, chars, calls_per_chunk):
+        """Estimate the model calls the removed text would have cost.
+
+        Removed text would have been chunked like the rest of the document,
+        so it is priced at the document's own characters per chunk.
+
+        Args:
+            chunks (int): chunks generated from the cleaned document.
+            chars (int): characters of those chunks.
+            calls_per_chunk (int): model calls made for every chunk.
+
+        Returns:
+            int: estimated model calls saved.
+        """
+        saved = 0
+        if chunks and chars:
+            saved = round(self._stats['chars_removed'] * chunks / chars * calls_per_chunk)
+        self._stats['model_calls_saved'] = saved
+        _totals.update(documents=1, model_calls_saved=saved,
+                       **{key: self._stats[key] for key in
+                          ('lines_removed', 'sentences_removed', 'chars_in', 'chars_removed')})
+        return saved
+
+    def stats(self):
+        """Return pages seen, lines and sentences removed and model calls saved.
+
+        Returns:
+            dict: dedup counters of this document.
+        """
+        return dict(self._stats)
+
+
+def dedup_totals():
+    """Return dedup counters summed over every document generated by this process.
+
+    Returns:
+        dict: dedup counters.
+    """
+    return dict(_totals)
+
+
+def new_deduplicator():
+    """Return a deduplicator configured from ``DEDUP_*`` settings, or None when disabled.
+
+    Returns:
+        Deduplicator: deduplicator for one document.
+    """
+    if not config.get_bool('DEDUP_ENABLED', True):
+        return None
+    return Deduplicator(
+        min_pages=config.get_int('DEDUP_MIN_PAGES', 3),
+        lookahead_pages=config.get_int('DEDUP_LOOKAHEAD_PAGES', 8),
+        similarity=config.get_float('DEDUP_SIMILARITY', 0.8),
+        window_sentences=config.get_int('DEDUP_WINDOW_SENTENCES', 2000))
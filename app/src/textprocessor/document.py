@@ -0,0 +1,63 @@
+"""This module extracts text from uploaded documents.
+
+Functions take a file path and a page range so that pool workers can each
+open the document and extract their own shard of pages.
+"""
+
+import logging
+
+from PyPDF2 import PdfReader
+
+
+def count_pdf_pages(path):
+    """Return the number of pages of a PDF file.
+
+    Args:
+        path (str): PDF file path.
+
+    Returns:
+        int: page count.
+    """
+    return len(PdfReader(path).pages)
+
+
+def extract_pdf_pages(path, start, stop):
+    """Extract the text of a range of pages of a PDF file.
+
+    Module level so a process pool worker can run it on its own shard.
+
+    Args:
+        path (str): PDF file path.
+        start (int): first page index.
+        stop (int): page index after the last page.
+
+    Returns:
+        list(str): text per page, empty when the page has no text layer.
+    """
+    pages = PdfReader(path).pages
+    return [pages[i].extract_text() or '' for i in range(start, stop)]
+
+
+def extract_pdf_page_images(path, indices):
+    """Return the images embedded in some pages of a PDF file.
+
+    A scanned page is a single full-page image, so OCRing its embedded images
+    recovers its text without rendering the page.
+
+    Args:
+        path (str): PDF file path.
+        indices (list(int)): page indices.
+
+    Returns:
+        dict(int, list(bytes)): encoded images per page index.
+    """
+    pages = PdfReader(path).pages
+    images = {}
+    for index in indices:
+        try:
+            images[index] = [image.data for image in pages[index].images]
+        except (NotImplementedError, ValueError) as err:
+            # a filter PyPDF2 cannot decode, e.g. JBIG2
+            logging.warning(f"Skipped images of page {index} of {path}: {err}")
+            images[index] = []
+    return images
@@ -3,9 +3,12 @@
 @Author: Karthick T. Sharma
 """
 
-import nltk
 from nltk.tokenize import sent_tokenize
-nltk.download('punkt')
+
+from src.model import artifacts
+
+# sent_tokenize's data; only downloaded when it is neither installed nor in the artifact store
+artifacts.ensure_nltk_data('punkt_tab', 'tokenizers/punkt_tab/english/')
 
 
 def postprocess_summary(text):
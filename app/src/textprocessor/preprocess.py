@@ -3,6 +3,8 @@
 @Author: Karthick T. Sharma
 """
 
+import collections
+import itertools
 import re
 
 
@@ -26,6 +28,9 @@ def filter_text(context):
 def split_text(context, char_range=300):
     """Split the bulk input text into small chunks.
 
+    Each chunk runs up to the first full stop after ``char_range`` characters;
+    whatever follows the last such full stop is the final chunk.
+
     Args:
         text (str): processed string to be splitted.
 
@@ -38,17 +43,127 @@ def split_text(context, char_range=300):
         return [bulk_text]
 
     splitted_texts = []
+    start = 0
     # split whole input into $(char_range) block of meaningful text.
     # (only split after an full stop has encountered)
-    while len(bulk_text) > char_range:
-        i = char_range
-        while((i < len(bulk_text)) and (bulk_text[i] != '.')):
-            i += 1
-        splitted_texts.append(bulk_text[:(i+1)])
-        bulk_text = bulk_text.replace(bulk_text[:(i+1)], "")
+    while len(bulk_text) - start > char_range:
+        end = bulk_text.find('.', start + char_range)
+        if end == -1:
+            break
+        splitted_texts.append(bulk_text[start:end + 1].strip())
+        start = end + 1
+    remainder = bulk_text[start:].strip()
+    if remainder:
+        splitted_texts.append(remainder)
     return splitted_texts
 
 
+# a sentence ends at a run of terminators, and the quotes or brackets closing it,
+# followed by whitespace or the end of text
+_END = r'[.!?\u2026]+["\'\u201d\u2019)\]]*'
+_SENTENCE = re.compile(rf'.*?{_END}(?=\s|\Z)|.+', re.DOTALL)
+_SENTENCE_END = re.compile(rf'{_END}\Z')
+
+
+def iter_sentences(context):
+    """Yield the filtered sentences of a text, one at a time.
+
+    Args:
+        context (str): unprocessed text.
+
+    Yields:
+        str: non-empty sentence, as ``filter_text`` leaves it.
+    """
+    for match in _SENTENCE.finditer(context):
+        sentence = filter_text(match.group()).strip()
+        if sentence:
+            yield sentence
+
+
+def split_sentences(context):
+    """Split a text into sentences kept as written, in any language.
+
+    Args:
+        context (str): text.
+
+    Returns:
+        list[str]: non-empty sentences, single spaced.
+    """
+    sentences = (' '.join(match.group().split()) for match in _SENTENCE.finditer(context))
+    return [sentence for sentence in sentences if sentence]
+
+
+def ends_sentence(text):
+    """Check whether a text ends with a sentence terminator, e.g. at a page break.
+
+    Args:
+        text (str): text.
+
+    Returns:
+        bool: True if the text's last sentence is complete.
+    """
+    return bool(_SENTENCE_END.search(text.rstrip()))
+
+
+def count_words(texts):
+    """Approximate token counter: number of whitespace separated words per text."""
+    return [len(text.split()) for text in texts]
+
+
+def _measured(units, count_tokens, base, batch_size=64):
+    """Pair every unit with the tokens it adds, counting ``batch_size`` units per call."""
+    units = iter(units)
+    while batch := list(itertools.islice(units, batch_size)):
+        for unit, tokens in zip(batch, count_tokens(batch)):
+            yield unit, tokens - base
+
+
+def iter_chunks(context, max_tokens=256, count_tokens=count_words, overlap=0):
+    """Split text into chunks of whole sentences that fit a token budget.
+
+    Sentences are packed greedily in one pass over the text, so the cost is
+    linear in its length and only the chunk being built is held besides the
+    input. A sentence longer than the budget on its own is cut between words.
+
+    Args:
+        context (str): unprocessed text.
+        max_tokens (int, optional): tokens a chunk may take as model input,
+            i.e. the ``token_max_length`` of the model. Defaults to 256.
+        count_tokens (callable, optional): takes a list of texts and returns
+            their model input lengths, e.g. ``Model.count_tokens``. Tokens it
+            returns for an empty text (special tokens, prompt prefix) are
+            reserved once per chunk. Defaults to counting words.
+        overlap (int, optional): tokens of trailing sentences of a chunk that
+            are repeated at the start of the next one. Defaults to 0.
+
+    Yields:
+        str: text chunk.
+    """
+    base = count_tokens([''])[0]
+    budget = max_tokens - base
+    if budget <= 0:
+        raise ValueError(f"max_tokens={max_tokens} leaves no room for text "
+                         f"after {base} reserved tokens")
+    if not 0 <= overlap < budget:
+        raise ValueError(f"overlap must be in [0, {budget}), got {overlap}")
+
+    parts, used = collections.deque(), 0
+    for sentence, tokens in _measured(iter_sentences(context), count_tokens, base):
+        units = [(sentence, tokens)]
+        if tokens > budget:
+            units = _measured(sentence.split(), count_tokens, base)
+        for unit, tokens in units:
+            if used + tokens > budget and parts:
+                yield ' '.join(part for part, _ in parts)
+                # keep the tail worth at most `overlap` tokens that still leaves room
+                while parts and (used > overlap or used + tokens > budget):
+                    used -= parts.popleft()[1]
+            parts.append((unit, tokens))
+            used += tokens
+    if parts:
+        yield ' '.join(part for part, _ in parts)
+
+
 def change_format(false_ans):
     """Change s2v format to fair readable form. Remove '|,_' and toggle case.
 
@@ -0,0 +1,60 @@
+"""unit tests for artifacts.py"""
+
+import os
+
+import pytest
+from src.model import artifacts
+
+
+@pytest.fixture(name='store')
+def fixture_store(tmp_path, monkeypatch):
+    """empty artifact store in a temp dir"""
+    monkeypatch.setenv('ARTIFACT_DIR', str(tmp_path))
+    monkeypatch.delenv('MODEL_OFFLINE', raising=False)
+    return tmp_path
+
+
+class TestArtifacts:
+    """class holding test cases for the artifact store"""
+
+    def test_hub_name_used_without_store(self, store):
+        """without a manifest the service stays online and loads by hub name"""
+        assert not artifacts.offline()
+        assert artifacts.resolve('google-t5/t5-base') == 'google-t5/t5-base'
+        assert artifacts.resolve('s2v', fallback='/legacy/s2v_old') == '/legacy/s2v_old'
+
+    def test_stored_model_resolves_to_local_dir(self, store):
+        """a registered model must load from its store directory"""
+        dirname = artifacts.artifact_dirname('google-t5/t5-base')
+        os.makedirs(store / dirname)
+        artifacts.register('google-t5/t5-base', dirname, 'seq2seq')
+
+        assert dirname == 'google-t5--t5-base'
+        assert artifacts.resolve('google-t5/t5-base') == str(store / dirname)
+        assert artifacts.load_manifest() == {
+            'google-t5/t5-base': {'path': dirname, 'kind': 'seq2seq'}}
+
+    def test_missing_model_fails_offline(self, store):
+        """once the store exists a missing model must not fall back to the hub"""
+        artifacts.register('google-t5/t5-base', 'absent', 'seq2seq')
+        assert artifacts.offline()
+
+        with pytest.raises(FileNotFoundError, match="build_artifacts"):
+            artifacts.resolve('google-t5/t5-base')
+        with pytest.raises(FileNotFoundError):
+            artifacts.resolve('all-MiniLM-L12-v2')
+
+    def test_offline_can_be_overridden(self, store, monkeypatch):
+        """MODEL_OFFLINE must win over the manifest default"""
+        artifacts.register('google-t5/t5-base', 'absent', 'seq2seq')
+        monkeypatch.setenv('MODEL_OFFLINE', 'false')
+        assert artifacts.resolve('google-t5/t5-base') == 'google-t5/t5-base'
+
+    def test_offline_mode_sets_hub_variables(self, store, monkeypatch):
+        """hub clients must be told to stay offline"""
+        for name in ('HF_HUB_OFFLINE', 'TRANSFORMERS_OFFLINE', 'HF_HUB_DISABLE_TELEMETRY'):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv('MODEL_OFFLINE', 'true')
+
+        artifacts.enable_offline_mode()
+        assert os.environ['HF_HUB_OFFLINE'] == '1' and os.environ['TRANSFORMERS_OFFLINE'] == '1'
@@ -0,0 +1,50 @@
+"""unit tests for decoding.py"""
+
+import pytest
+from src.model import decoding
+
+
+class TestTokenBudget:
+    """class holding test cases for token_budget function"""
+
+    @pytest.mark.parametrize('input_tokens, ratio, result', [
+        (75, 0.8, 60), (4, 0.5, 8), (2000, 1.0, 512)
+    ])
+    def test_budget_follows_input_length(self, input_tokens, ratio, result):
+        """budget must scale with input length and stay inside floor and cap
+
+        Args:
+            input_tokens (int): test input
+            ratio (float): length ratio of the profile
+            result (int): test result
+        """
+        assert decoding.token_budget(input_tokens, ratio, 8, 512) == result, \
+            "Wrong token budget"
+
+    def test_budget_rounding(self):
+        """budgets must round up to the step so similar inputs share one"""
+        assert decoding.token_budget(75, 0.8, 8, 512, step=8) == 64
+        assert decoding.token_budget(78, 0.8, 8, 512, step=8) == 64
+
+
+class TestSelectProfile:
+    """class holding test cases for select_profile function"""
+
+    def test_requested_profile_wins(self):
+        """an explicitly requested profile must be used even under load"""
+        assert decoding.select_profile('quality', 1000) == 'quality'
+
+    @pytest.mark.parametrize('queue_depth, result', [(0, None), (16, 'balanced'), (64, 'fast')])
+    def test_degrades_under_load(self, queue_depth, result):
+        """model default must be replaced by cheaper profiles when the queue grows
+
+        Args:
+            queue_depth (int): test input
+            result (str): test result
+        """
+        assert decoding.select_profile(None, queue_depth) == result
+
+    def test_unknown_profile(self):
+        """unknown profile names must be rejected"""
+        with pytest.raises(ValueError, match="profile must be one of"):
+            decoding.select_profile('turbo', 0)
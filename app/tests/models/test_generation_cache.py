@@ -0,0 +1,51 @@
+"""unit tests for generation_cache.py"""
+
+from src.model.generation_cache import GenerationCache
+
+
+class TestGenerationCache:
+    """class holding test cases for GenerationCache class"""
+
+    def test_key_depends_on_model_params_and_text(self):
+        """key must change with model, params and text but not with whitespace"""
+        key = GenerationCache.make_key('t5', {'num_beams': 3}, 'a  text\n')
+        assert key == GenerationCache.make_key('t5', {'num_beams': 3}, 'a text')
+        assert key != GenerationCache.make_key('t5-small', {'num_beams': 3}, 'a text')
+        assert key != GenerationCache.make_key('t5', {'num_beams': 5}, 'a text')
+        assert key != GenerationCache.make_key('t5', {'num_beams': 3}, 'other text')
+
+    def test_memory_tier_is_lru(self):
+        """least recently used entries must leave the memory tier first"""
+        cache = GenerationCache(memory_items=2)
+        cache.put('a', 'A')
+        cache.put('b', 'B')
+        assert cache.get('a') == 'A'
+        cache.put('c', 'C')
+
+        assert cache.get('b') is None, "LRU entry was not evicted"
+        assert cache.get('a') == 'A' and cache.get('c') == 'C'
+        assert cache.stats()['memory_evictions'] == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """outputs must be served byte-identical from disk by a new process"""
+        path = str(tmp_path / 'cache.sqlite3')
+        output = 'What does NLP  enable computers to do? ünïcödé'
+        GenerationCache(path=path).put('key', output)
+
+        cache = GenerationCache(path=path)
+        assert cache.get('key') == output
+        assert cache.get('key') == output, "Disk hit was not promoted to memory"
+        assert cache.stats()['disk_hits'] == 1 and cache.stats()['memory_hits'] == 1
+
+    def test_disk_tier_respects_size_budget(self, tmp_path):
+        """disk tier must evict old entries once it grows past its budget"""
+        cache = GenerationCache(path=str(tmp_path / 'cache.sqlite3'),
+                                memory_items=1, max_bytes=2000)
+        for i in range(50):
+            cache.put(f'key-{i}', 'x' * 100)
+
+        stats = cache.stats()
+        assert stats['disk_bytes'] <= 2000, "Disk budget exceeded"
+        assert stats['disk_evictions'] > 0
+        assert cache.get('key-49') == 'x' * 100, "Newest entry was evicted"
+        assert cache.get('key-0') is None, "Oldest entry was kept"
@@ -0,0 +1,94 @@
+"""unit tests for model.py"""
+
+import pytest
+
+from src.model import model as model_module
+from src.model.model import Model
+from src.model.question_generator import QuestionGenerator
+
+
+class FakeTokenizer:
+    """stand-in for a Hugging Face tokenizer with a given vocabulary"""
+
+    def __init__(self, vocab):
+        self.vocab = vocab
+
+    def get_vocab(self):
+        """token to id mapping"""
+        return dict(self.vocab)
+
+    def __call__(self, texts, **kwargs):
+        """one id per word"""
+        return {'input_ids': [[1] * len(text.split()) for text in texts],
+                'attention_mask': [[1] * len(text.split()) for text in texts]}
+
+    def batch_decode(self, outputs, **kwargs):
+        """outputs are already text"""
+        return list(outputs)
+
+
+class FakeSeq2Seq:
+    """stand-in for a seq2seq model recording its generate() calls"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = []
+
+    def generate(self, input_ids, attention_mask, **kwargs):
+        """one output per input, tagged with the assistant model used"""
+        self.calls.append(kwargs)
+        assistant = kwargs.get('assistant_model')
+        return ([f'{self.name}+{assistant.name if assistant else "none"}']
+                * len(input_ids) * kwargs['num_return_sequences'])
+
+
+# pylint: disable=redefined-outer-name
+@pytest.fixture
+def stubbed(monkeypatch):
+    """replace tokenizer and weight loading; returns the vocabulary of each model"""
+    vocabs = {'main': {'a': 0, '<answer>': 1}, 'draft': {'a': 0, '<answer>': 1}}
+    monkeypatch.setattr(model_module.AutoTokenizer, 'from_pretrained',
+                        lambda name, **kwargs: FakeTokenizer(vocabs[name]))
+    monkeypatch.setattr(model_module.artifacts, 'resolve', lambda name: name)
+    monkeypatch.setattr(model_module, 'load_seq2seq',
+                        lambda name, backend, precision: FakeSeq2Seq(name))
+    monkeypatch.setattr(model_module, 'get_generation_cache', lambda: None)
+    return vocabs
+
+
+class TestDraftModel:
+    """class holding test cases for assisted decoding of Model class"""
+
+    def test_mismatched_vocabulary_disables_draft(self, stubbed):
+        """a draft model with another vocabulary must be ignored, not fail the load"""
+        stubbed['draft'] = {'a': 0}
+        model = Model('main', backend='torch', precision='fp32', draft_model='draft')
+
+        assert model.draft_model_name is None
+        assert model.inference_batch([{'q': 'a b'}], num_beams=1) == ['main+none']
+
+    def test_non_torch_backend_disables_draft(self, stubbed):
+        """assisted decoding must be skipped for backends that cannot run it"""
+        model = Model('main', backend='onnx', precision='fp32', draft_model='draft')
+        assert model.draft_model_name is None
+
+    def test_only_greedy_single_sequence_calls_are_assisted(self, stubbed):
+        """beam search and multiple return sequences must decode without the draft"""
+        model = Model('main', backend='torch', precision='fp32', draft_model='draft')
+        assert model.draft_model_name == 'draft'
+
+        items = [{'q': 'a'}, {'q': 'a b'}]
+        assert model.inference_batch(items, num_beams=1) == ['main+draft'] * 2
+        assert model.inference_batch(items, num_beams=4) == ['main+none'] * 2
+        assert model.inference_batch(items, num_beams=2, num_return_sequences=2) == [
+            ['main+none', 'main+none']] * 2
+
+
+class TestQuestionGenerator:
+    """class holding test cases for QuestionGenerator class"""
+
+    def test_generate_batch_needs_an_answer_per_context(self):
+        """mismatched contexts and answers must raise instead of dropping questions"""
+        generator = QuestionGenerator.__new__(QuestionGenerator)
+        with pytest.raises(ValueError):
+            generator.generate_batch(['first context', 'second context'], ['answer'])
@@ -0,0 +1,118 @@
+"""unit tests for batch_scheduler.py"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.inferencehandler.batch_scheduler import BatchScheduler
+from src.loaders.model_pool import ModelPool
+
+
+class RecordingBatchFn:
+    """batch function which records the size of every batch it receives"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items, group):
+        self.batches.append((group, list(items)))
+        return [item * 2 for item in items]
+
+
+class TestBatchScheduler:
+    """class holding test cases for BatchScheduler class"""
+
+    def test_concurrent_requests_share_batches(self):
+        """concurrent callers must be merged while each gets its own output"""
+        batch_fn = RecordingBatchFn()
+        scheduler = BatchScheduler(batch_fn, name='test', max_batch_size=4, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.gather(*(scheduler.submit(i) for i in range(10)))
+
+        assert asyncio.run(run()) == [i * 2 for i in range(10)], "Outputs mixed up"
+        assert all(len(batch) <= 4 for _, batch in batch_fn.batches), "Batch size exceeded"
+        assert len(batch_fn.batches) == 3, "Requests were not merged"
+
+        stats = scheduler.stats()
+        assert stats['items'] == 10 and stats['batch_size_histogram'] == {2: 1, 4: 2}
+
+    def test_submit_many_keeps_order(self):
+        """submit_many must return outputs in input order"""
+        scheduler = BatchScheduler(RecordingBatchFn(), name='test', max_batch_size=3)
+        assert asyncio.run(scheduler.submit_many([3, 1, 2])) == [6, 2, 4]
+
+    def test_groups_are_never_mixed(self):
+        """items of different groups must go through separate calls"""
+        batch_fn = RecordingBatchFn()
+        scheduler = BatchScheduler(batch_fn, name='test', max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.gather(scheduler.submit_many([1, 2], group='fast'),
+                                        scheduler.submit_many([3], group='quality'))
+
+        assert asyncio.run(run()) == [[2, 4], [6]]
+        assert sorted(batch_fn.batches) == [('fast', [1, 2]), ('quality', [3])]
+
+    def test_queued_items_are_regrouped_by_length(self):
+        """with a length function, batches must hold items of similar length"""
+        batch_fn = RecordingBatchFn()
+        scheduler = BatchScheduler(batch_fn, name='test', max_batch_size=2, max_wait_ms=50,
+                                   length=len, sort_window=3)
+        items = ['ccc', 'a', 'eeeee', 'bb', 'ffffff', 'dddd']
+
+        outputs = asyncio.run(scheduler.submit_many(items))
+        assert outputs == [item * 2 for item in items], "Outputs mixed up"
+        assert [batch for _, batch in batch_fn.batches] == [
+            ['a', 'bb'], ['ccc', 'dddd'], ['eeeee', 'ffffff']]
+
+    def test_errors_reach_every_caller(self):
+        """a failing batch must fail every caller waiting on it"""
+        def failing(items, group):
+            raise RuntimeError("model crashed")
+
+        scheduler = BatchScheduler(failing, name='test', max_batch_size=2)
+        with pytest.raises(RuntimeError, match="model crashed"):
+            asyncio.run(scheduler.submit_many([1, 2]))
+        assert scheduler.stats()['failures'] == 1
+
+    def test_missing_outputs_fail_their_callers(self):
+        """a batch returning fewer outputs than items must fail its callers, not hang them"""
+        scheduler = BatchScheduler(lambda items, group: items[:-1], name='test',
+                                   max_batch_size=3, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.wait_for(scheduler.submit_many([1, 2, 3]), 1)
+
+        with pytest.raises(ValueError, match="2 outputs for 3 items"):
+            asyncio.run(run())
+        assert scheduler.stats()['failures'] == 1
+
+    def test_batches_run_on_every_replica_at_once(self):
+        """with a batch in flight per replica, two replicas must be checked out together"""
+        barrier = threading.Barrier(2, timeout=5)
+        in_use = []
+
+        class BlockingModel:
+            """model whose batches only finish once two of them run at the same time"""
+
+            def summarize_batch(self, items):
+                """fake inference waiting for the other replica"""
+                in_use.append(pool.stats()['in_use'])
+                barrier.wait()
+                return [item * 2 for item in items]
+
+        pool = ModelPool('dummy', BlockingModel, replicas=2, cpus=sorted(os.sched_getaffinity(0)),
+                         set_threads=lambda count: None)
+        executor = ThreadPoolExecutor(max_workers=2)
+        scheduler = BatchScheduler(lambda items, group: pool.summarize_batch(items), name='test',
+                                   max_batch_size=1, executor=executor, max_in_flight=2)
+        try:
+            assert asyncio.run(scheduler.submit_many([1, 2])) == [2, 4]
+        finally:
+            executor.shutdown()
+            pool.shutdown()
+        assert max(in_use) == 2, "Batches did not run on both replicas at once"
+        assert pool.stats()['checkouts'] == 2
@@ -0,0 +1,142 @@
+"""unit tests for dedup.py"""
+
+import asyncio
+
+import pytest
+from src.textprocessor import dedup
+from src.textprocessor.dedup import Deduplicator
+
+
+def textbook(pages=6):
+    """pages with a running header, a page number footer and distinct body text"""
+    return [f"SÁCH GIÁO KHOA LỊCH SỬ 10\nBài {i} nói về triều đại thứ {i} của nước ta.\n"
+            f"Triều đại này kéo dài {i * 10} năm và có {i + 2} vị vua.\nTrang {i + 1}"
+            for i in range(pages)]
+
+
+class TestLineKey:
+    """class holding test cases for line_key function"""
+
+    @pytest.mark.parametrize('first, second', [
+        ('Trang 12', 'Trang 13'),
+        ('  CHƯƠNG  1 ', 'chương 2'),
+        ('- 7 -', '- 8 -'),
+    ])
+    def test_page_numbers_share_a_key(self, first, second):
+        """lines differing only in digits, case and spacing must match
+
+        Args:
+            first (str): line of one page
+            second (str): line of another page
+        """
+        assert dedup.line_key(first) == dedup.line_key(second)
+
+    def test_long_lines_keep_their_digits(self):
+        """only short lines may match regardless of digits"""
+        assert (dedup.line_key('Triều đại này kéo dài 10 năm và có 3 vị vua.')
+                != dedup.line_key('Triều đại này kéo dài 20 năm và có 4 vị vua.'))
+
+
+class TestDeduplicator:
+    """class holding test cases for Deduplicator class"""
+
+    def test_drops_headers_and_page_numbers(self):
+        """lines repeated on every page must go, body text must stay"""
+        pages = Deduplicator().clean_pages(textbook())
+
+        assert len(pages) == 6
+        for i, page in enumerate(pages):
+            assert 'SÁCH GIÁO KHOA' not in page and 'Trang' not in page
+            assert f'triều đại thứ {i}' in page and f'{i + 2} vị vua' in page
+
+    def test_lines_on_few_pages_are_kept(self):
+        """a line on fewer than min_pages pages is content"""
+        pages = Deduplicator(min_pages=3).clean_pages(['Bài tập\nA', 'Bài tập\nB', 'C'])
+        assert pages[0] == 'Bài tập A' and pages[1] == 'Bài tập B'
+
+    def test_drops_near_duplicate_sentences(self):
+        """a restated sentence must go, a sentence with a different fact must stay"""
+        pages = Deduplicator().clean_pages([
+            'Chiến thắng Điện Biên Phủ diễn ra vào năm 1954 ở Tây Bắc.',
+            'Tóm tắt: chiến thắng Điện Biên Phủ diễn ra vào năm 1954 ở Tây Bắc!',
+            'Hiệp định Genève được ký kết vào năm 1954 tại Thụy Sĩ.',
+        ])
+        assert pages[1] == ''
+        assert pages[2] == 'Hiệp định Genève được ký kết vào năm 1954 tại Thụy Sĩ.'
+
+    def test_numbers_are_kept_verbatim(self):
+        """sentence splitting must not rewrite decimals"""
+        (page,) = Deduplicator().clean_pages(['Số pi xấp xỉ 3.14 trong tính toán.'])
+        assert page == 'Số pi xấp xỉ 3.14 trong tính toán.'
+
+    def test_streams_past_the_lookahead(self):
+        """pages after the lookahead must be released one by one, in order"""
+        deduplicator = Deduplicator(lookahead_pages=2)
+        released = [len(deduplicator.feed(page)) for page in textbook(5)]
+        assert released == [0, 0, 3, 1, 1]
+
+    def test_iter_pages_matches_clean_pages(self):
+        """the streaming and in-memory entry points must agree"""
+        async def pages():
+            for page in textbook():
+                yield page
+
+        async def run():
+            return [page async for page in Deduplicator().iter_pages(pages())]
+
+        assert asyncio.run(run()) == Deduplicator().clean_pages(textbook())
+
+    def test_reports_model_calls_saved(self):
+        """removed text must be priced at the document's chars per chunk"""
+        deduplicator = Deduplicator()
+        pages = deduplicator.clean_pages(textbook())
+        removed = deduplicator.stats()['chars_removed']
+        assert deduplicator.stats()['lines_removed'] == 12
+        assert removed == sum(map(len, textbook())) - sum(map(len, pages)) - 2 * 6
+
+        chars = sum(map(len, pages))
+        saved = deduplicator.record_generation(chunks=3, chars=chars, calls_per_chunk=5)
+        assert saved == round(removed * 3 / chars * 5)
+        assert deduplicator.stats()['model_calls_saved'] == saved
+        assert dedup.dedup_totals()['model_calls_saved'] >= saved
+
+    def test_sentence_index_is_bounded_by_the_window(self):
+        """only the last window_sentences kept sentences may be indexed"""
+        deduplicator = Deduplicator(window_sentences=10)
+        deduplicator.clean_pages([f'Câu số {i} kể về sự kiện thứ {i} trong năm {1900 + i}.'
+                                  for i in range(100)])
+
+        assert len(deduplicator._kept) == 10
+        assert all(len(postings) <= 10 for postings in deduplicator._index.values())
+
+        # a sentence that left the window is no longer a duplicate
+        pages = deduplicator.clean_pages(['Câu số 0 kể về sự kiện thứ 0 trong năm 1900.',
+                                          'Câu số 99 kể về sự kiện thứ 99 trong năm 1999.'])
+        assert pages == ['Câu số 0 kể về sự kiện thứ 0 trong năm 1900.', '']
+
+    def test_common_shingles_are_not_scanned(self):
+        """a shingle shared by max_postings kept sentences must stop growing"""
+        deduplicator = Deduplicator(max_postings=4)
+        pages = deduplicator.clean_pages([f'Một trong những {word} quan trọng nhất.'
+                                          for word in ('vua', 'tướng', 'trận', 'sông', 'núi',
+                                                       'thành')])
+
+        assert all(pages), "Sentences differing in one word are not duplicates"
+        assert max(len(postings) for postings in deduplicator._index.values()) == 4
+        # an exact repeat is still found through its rare shingles
+        assert deduplicator.clean_pages(['Một trong những núi quan trọng nhất.']) == ['']
+
+    def test_rare_lines_are_forgotten_after_the_lookahead(self):
+        """lines on too few pages must not be remembered for the whole document"""
+        deduplicator = Deduplicator(lookahead_pages=2)
+        pages = [f'Header\nDòng riêng của trang {i} ở đây.' for i in range(40)]
+        cleaned = deduplicator.clean_pages(pages)
+
+        assert all('Header' not in page for page in cleaned)
+        assert len(deduplicator._line_pages) <= 4, "Lines seen once are still counted"
+        assert deduplicator._line_pages['header'] == 40
+
+    def test_bad_min_pages(self):
+        """a line on one page is never repeated"""
+        with pytest.raises(ValueError):
+            Deduplicator(min_pages=1)
@@ -0,0 +1,74 @@
+"""unit tests for executor.py"""
+
+import asyncio
+import os
+import time
+
+import httpx
+
+from main import app
+from src.loaders import executor
+from src.loaders.executor import run_in_inference_executor
+from src.repositories import AuthRepository
+
+LOGIN = {'id': 'test_id', 'password': '12345678'}
+
+
+def cpu_bound_generation(seconds):
+    """stand-in for a long generation: keeps one core busy for a while
+
+    Args:
+        seconds (float): how long to keep the core busy
+    """
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(i * i for i in range(1000))
+    return total
+
+
+async def timed_login(client):
+    """send one login request and return its latency in seconds"""
+    start = time.perf_counter()
+    res = await client.post('/auth/user/login', json=LOGIN)
+    assert res.status_code == 200, "Login failed"
+    return time.perf_counter() - start
+
+
+def test_login_latency_flat_during_generation(monkeypatch):
+    """login must keep answering quickly while a generation runs on the executor"""
+    async def authenticate_user(self, data):
+        return 'token'
+
+    monkeypatch.setattr(AuthRepository, 'authenticate_user', authenticate_user)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            baseline = max([await timed_login(client) for _ in range(5)])
+
+            generation = asyncio.ensure_future(
+                run_in_inference_executor(cpu_bound_generation, 3.0))
+            await asyncio.sleep(0.1)
+
+            during = [await timed_login(client) for _ in range(10)]
+            still_running = not generation.done()
+            await generation
+        return baseline, during, still_running
+
+    baseline, during, still_running = asyncio.run(run())
+
+    assert still_running, "Generation finished before login latency was measured"
+    assert max(during) < baseline + 0.5, "Event loop blocked by generation"
+
+
+def test_every_process_worker_runs_its_own_task(monkeypatch):
+    """a warm-up must run once in each process of a process pool, not twice in one"""
+    monkeypatch.setenv('INFERENCE_EXECUTOR', 'process')
+    monkeypatch.setenv('INFERENCE_WORKERS', '3')
+    monkeypatch.setattr(executor, '_executor', None)
+    try:
+        pids = asyncio.run(executor.run_on_every_inference_worker(os.getpid))
+    finally:
+        executor.shutdown_inference_executor()
+    assert len(set(pids)) == 3, "A worker process was left cold"
@@ -0,0 +1,78 @@
+"""unit tests for inference_handler.py"""
+
+import pytest
+from src.inferencehandler import inference_handler
+
+
+class FakeModel:
+    """stand-in for the summarizer and question generator recording every batch"""
+
+    def __init__(self, chunks=None):
+        self.chunks = chunks
+        self.batches = []
+
+    def preprocess_input(self, context):
+        """fake chunker"""
+        return self.chunks
+
+    def summarize_batch(self, contexts, profile=None):
+        """fake batched summarizer"""
+        self.batches.append(list(contexts))
+        return [context.upper() for context in contexts]
+
+    def generate_batch(self, contexts, answers, profile=None):
+        """fake batched question generator"""
+        self.batches.append(list(zip(contexts, answers)))
+        return [f'{answer}?' for answer in answers]
+
+
+class TestLengthSortedBatches:
+    """class holding test cases for length_sorted_batches function"""
+
+    @pytest.mark.parametrize('lengths, size, result', [
+        ([5, 1, 4, 2, 3], 2, [[1, 3], [4, 2], [0]]),
+        ([3, 3, 3], 3, [[0, 1, 2]]),
+        ([], 4, []),
+    ])
+    def test_batches(self, lengths, size, result):
+        """items must be sorted by length and cut into bounded batches
+
+        Args:
+            lengths (list(int)): test input
+            size (int): max batch size
+            result (list(list(int))): test result
+        """
+        assert inference_handler.length_sorted_batches(lengths, size) == result
+
+
+class TestBatchedPipeline:
+    """class holding test cases for get_all_summary and get_all_questions"""
+
+    def test_summary_is_batched_and_ordered(self):
+        """chunks must share forward passes and come back in input order"""
+        chunks = ['ccc', 'a', 'bbbbb', 'dd', 'eeee', 'f']
+        model = FakeModel(chunks)
+        summary, splitted = inference_handler.get_all_summary(model, 'text', max_batch_size=4)
+
+        assert splitted == chunks
+        assert summary == [chunk.upper() for chunk in chunks], "Order not restored"
+        assert model.batches == [['a', 'f', 'dd', 'ccc'], ['eeee', 'bbbbb']]
+
+    def test_questions_are_batched_and_ordered(self):
+        """15 pairs must take two forward passes, outputs in input order"""
+        model = FakeModel()
+        contexts = [f'context {"x" * i}' for i in range(15, 0, -1)]
+        answers = [f'answer{i}' for i in range(15)]
+        questions = inference_handler.get_all_questions(
+            model, contexts, answers, max_batch_size=8)
+
+        assert questions == [f'{answer}?' for answer in answers]
+        assert [len(batch) for batch in model.batches] == [8, 7]
+        assert model.batches[0][0] == (contexts[-1], answers[-1]), "Shortest pair not first"
+
+    def test_default_batch_size_from_config(self, monkeypatch):
+        """batch size must default to the scheduler setting of the model"""
+        monkeypatch.setenv('SUMMARIZER_MAX_BATCH_SIZE', '2')
+        model = FakeModel(['a', 'b', 'c'])
+        inference_handler.get_all_summary(model, 'text')
+        assert [len(batch) for batch in model.batches] == [2, 1]
@@ -0,0 +1,148 @@
+"""unit tests for the inference daemon protocol, server and client"""
+
+import asyncio
+
+import pytest
+from src.inferenceserver import protocol
+from src.inferenceserver.client import InferenceClient, InferenceError
+from src.inferenceserver.server import InferenceServer
+
+
+class FakeService:
+    """stand-in for InferenceService with fast fake stages"""
+
+    def __init__(self):
+        self.summarize_calls = []
+
+    async def summarize(self, contexts, profile=None):
+        """fake summarizer, slower for the first caller so answers come back out of order"""
+        self.summarize_calls.append(contexts)
+        await asyncio.sleep(0.05 if contexts == ['slow'] else 0)
+        return [f'{profile}:{context.upper()}' for context in contexts]
+
+    async def generate_false_answers(self, filtered_kws):
+        """fake stage returning a tuple"""
+        return [kws[0] for kws in filtered_kws], filtered_kws
+
+    async def extract_keywords(self, original_list, summarized_list):
+        """fake stage failing on bad input"""
+        raise ValueError("keywords need text")
+
+    async def model_status(self):
+        """fake stage crashing"""
+        raise RuntimeError("model crashed")
+
+
+async def serve(tmp_path):
+    """start a server of FakeService on a socket in tmp_path"""
+    server = InferenceServer(
+        FakeService(), str(tmp_path / 'inference.sock'),
+        methods=('summarize', 'generate_false_answers', 'extract_keywords', 'model_status'))
+    await server.start()
+    return server
+
+
+class TestProtocol:
+    """class holding test cases for message framing"""
+
+    def test_round_trip_over_socket(self, tmp_path):
+        """messages must arrive whole and in order over a real socket"""
+        path = str(tmp_path / 'echo.sock')
+        messages = [{'id': 1, 'text': 'xin chào'}, {'id': 2, 'items': list(range(1000))}]
+
+        async def echo(reader, writer):
+            while (message := await protocol.read_message(reader)) is not None:
+                await protocol.write_message(writer, message)
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_unix_server(echo, path=path)
+            reader, writer = await asyncio.open_unix_connection(path)
+            for message in messages:
+                await protocol.write_message(writer, message)
+            received = [await protocol.read_message(reader) for _ in messages]
+            writer.write_eof()
+            eof = await protocol.read_message(reader)
+            writer.close()
+            server.close()
+            return received, eof
+
+        received, eof = asyncio.run(run())
+        assert received == messages and eof is None
+
+    @pytest.mark.parametrize('frame', [
+        protocol.HEADER.pack(protocol.MAX_MESSAGE_BYTES + 1),
+        protocol.HEADER.pack(10) + b'{"id"',
+        protocol.HEADER.pack(2) + b'[]',
+        b'\x00\x00',
+    ])
+    def test_bad_frames_are_rejected(self, frame):
+        """oversized, truncated and non-object frames must raise ProtocolError
+
+        Args:
+            frame (bytes): test input
+        """
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(frame)
+            reader.feed_eof()
+            return await protocol.read_message(reader)
+
+        with pytest.raises(protocol.ProtocolError):
+            asyncio.run(run())
+
+
+class TestInferenceServer:
+    """class holding test cases for InferenceServer and InferenceClient"""
+
+    def test_concurrent_calls_share_one_connection(self, tmp_path):
+        """concurrent calls must each get their own answer, even out of order"""
+        async def run():
+            server = await serve(tmp_path)
+            client = InferenceClient(server.path)
+            results = await asyncio.gather(
+                client.summarize(['slow'], 'fast'),
+                client.summarize(['a', 'b']),
+                client.generate_false_answers([['x', 'y'], ['z']]))
+            await client.close()
+            await server.close()
+            return results
+
+        slow, fast, answers = asyncio.run(run())
+        assert slow == ['fast:SLOW'] and fast == ['None:A', 'None:B']
+        assert answers == (['x', 'z'], [['x', 'y'], ['z']])
+        assert not (tmp_path / 'inference.sock').exists(), "Socket file left behind"
+
+    def test_errors_reach_the_caller(self, tmp_path):
+        """bad input must raise ValueError, other failures InferenceError"""
+        async def run():
+            server = await serve(tmp_path)
+            client = InferenceClient(server.path)
+            try:
+                with pytest.raises(ValueError, match="keywords need text"):
+                    await client.extract_keywords(['a'], ['b'])
+                with pytest.raises(InferenceError, match="model crashed"):
+                    await client.model_status()
+                with pytest.raises(ValueError, match="unknown method"):
+                    await client.call('split_context', context='a')
+                # the connection survives failed calls
+                assert await client.summarize(['a']) == ['None:A']
+            finally:
+                await client.close()
+                await server.close()
+
+        asyncio.run(run())
+
+    def test_stale_socket_is_replaced(self, tmp_path):
+        """a socket file left by a crashed daemon must not stop a new one"""
+        (tmp_path / 'inference.sock').write_bytes(b'')
+
+        async def run():
+            server = await serve(tmp_path)
+            client = InferenceClient(server.path)
+            result = await client.summarize(['a'])
+            await client.close()
+            await server.close()
+            return result
+
+        assert asyncio.run(run()) == ['None:A']
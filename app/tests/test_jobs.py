@@ -0,0 +1,185 @@
+"""unit tests for jobs.py"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from src.service.jobs import JobQueueFull, JobRunner
+
+
+class FakeStore:
+    """stand-in for JobRepository keeping jobs and every update in memory"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.updates = []
+
+    async def create(self, uid, kind, topic, owner=None):
+        """persist a queued job"""
+        job_id = f'job-{len(self.jobs)}'
+        self.jobs[job_id] = {'job_id': job_id, 'user_id': uid, 'kind': kind, 'topic': topic,
+                             'status': 'queued', 'owner': owner,
+                             'heartbeat_at': datetime.utcnow()}
+        return dict(self.jobs[job_id])
+
+    async def update(self, job_id, **values):
+        """persist new job state"""
+        self.jobs[job_id].update(values)
+        self.updates.append((job_id, dict(values)))
+
+    async def heartbeat(self, job_ids):
+        """renew the heartbeat of jobs"""
+        for job_id in job_ids:
+            self.jobs[job_id]['heartbeat_at'] = datetime.utcnow()
+
+    async def fail_stale(self, cutoff, error):
+        """fail queued and running jobs without a heartbeat since cutoff"""
+        stale = [job for job in self.jobs.values()
+                 if job['status'] in ('queued', 'running') and job['heartbeat_at'] < cutoff]
+        for job in stale:
+            job.update(status='failed', error=error)
+        return len(stale)
+
+
+def fake_generate(batches, fail_after=None, delay=0):
+    """generate_and_store_document stand-in committing batches of question ids"""
+    async def generate(pages, uid, topic, profile, dedup, failed, progress):
+        texts = [page async for page in pages] if hasattr(pages, '__aiter__') else list(pages)
+        progress['chunks_total'] = len(batches)
+        for done, ids in enumerate(batches, 1):
+            await asyncio.sleep(delay)
+            if done == fail_after:
+                raise RuntimeError("database went away")
+            progress['chunks_done'] = done
+            if not ids:
+                failed.append({'sentence': texts[0], 'error': 'model crashed'})
+                continue
+            yield [{'question_id': question_id} for question_id in ids]
+    return generate
+
+
+async def drain(runner):
+    """wait until the runner has no job waiting or running"""
+    while runner.stats()['waiting'] or runner.stats().get('running'):
+        await asyncio.sleep(0.01)
+
+
+class TestJobRunner:
+    """class holding test cases for JobRunner class"""
+
+    def test_job_persists_progress_and_results(self):
+        """every committed batch must be persisted, then the job must succeed"""
+        store = FakeStore()
+        runner = JobRunner(store, fake_generate([[1, 2], [], [3]]))
+
+        async def run():
+            job = await runner.submit(7, 'paragraph', 'Lịch sử', ['Câu một.'])
+            assert job['status'] == 'queued'
+            await drain(runner)
+            await runner.shutdown()
+            return job['job_id']
+
+        job = store.jobs[asyncio.run(run())]
+        assert job['status'] == 'succeeded' and job['finished_at'] is not None
+        assert job['question_ids'] == [1, 2, 3]
+        assert job['chunks_done'] == job['chunks_total'] == 3
+        assert job['errors'] == [{'sentence': 'Câu một.', 'error': 'model crashed'}]
+
+        progress = [values['question_ids'] for _, values in store.updates
+                    if 'question_ids' in values]
+        assert progress[0] == [1, 2], "Partial results must be persisted while the job runs"
+
+    def test_failed_job_keeps_partial_results(self):
+        """an error must fail the job without losing the committed questions"""
+        store = FakeStore()
+        runner = JobRunner(store, fake_generate([[1], [2], [3]], fail_after=3))
+
+        async def run():
+            job = await runner.submit(7, 'pdf', 'Sinh học', [])
+            await drain(runner)
+            return job['job_id']
+
+        job = store.jobs[asyncio.run(run())]
+        assert job['status'] == 'failed' and job['error'] == 'database went away'
+        assert job['question_ids'] == [1, 2]
+        assert runner.stats()['failed'] == 1
+
+    def test_full_queue_rejects_without_persisting(self):
+        """a submission over queue_size must raise before a job row is written"""
+        store = FakeStore()
+        runner = JobRunner(store, fake_generate([[1]], delay=0.2), workers=1, queue_size=1)
+
+        async def run():
+            await runner.submit(7, 'paragraph', 'a', [])   # taken by the worker
+            await asyncio.sleep(0.05)
+            await runner.submit(7, 'paragraph', 'b', [])   # waits
+            with pytest.raises(JobQueueFull):
+                await runner.submit(7, 'paragraph', 'c', [])
+            await runner.shutdown()
+
+        asyncio.run(run())
+        assert [job['topic'] for job in store.jobs.values()] == ['a', 'b']
+        assert runner.stats()['rejected'] == 1
+
+    def test_shutdown_fails_unfinished_jobs(self, tmp_path):
+        """running and queued jobs must be marked failed and their files removed"""
+        store = FakeStore()
+        runner = JobRunner(store, fake_generate([[1], [2]], delay=0.5), workers=1)
+
+        async def run(tmp_files):
+            await runner.submit(7, 'pdf', 'a', [], files=tmp_files[:1])
+            await asyncio.sleep(0.05)
+            await runner.submit(7, 'pdf', 'b', [], files=tmp_files[1:])
+            await runner.shutdown()
+
+        files = [str(tmp_path / name) for name in ('a.pdf', 'b.pdf')]
+        for path in files:
+            open(path, 'wb').close()
+        asyncio.run(run(files))
+
+        assert [job['status'] for job in store.jobs.values()] == ['failed', 'failed']
+        assert all('shutdown' in job['error'] for job in store.jobs.values())
+        assert not any(os.path.exists(path) for path in files)
+
+    def test_progress_is_persisted_between_commits(self):
+        """chunks that commit nothing must still show up as progress while the job runs"""
+        store = FakeStore()
+        runner = JobRunner(store, fake_generate([[1], [], [], [2]], delay=0.1),
+                           heartbeat_s=0.05, stale_after_s=1)
+
+        async def run():
+            job = await runner.submit(7, 'pdf', 'a', ['Câu một.'])
+            await drain(runner)
+            await runner.shutdown()
+            return job['job_id']
+
+        job_id = asyncio.run(run())
+        written = [values for _, values in store.updates
+                   if 'status' not in values and values['question_ids'] == [1]]
+        assert [values['chunks_done'] for values in written][-1] == 3, \
+            "Chunks that committed nothing were not persisted"
+        assert len(written[-1]['errors']) == 2
+        assert store.jobs[job_id]['owner'] == runner.owner
+
+    def test_recover_fails_abandoned_jobs(self):
+        """queued or running jobs without a recent heartbeat must be marked failed"""
+        store = FakeStore()
+        runner = JobRunner(store, fake_generate([]), stale_after_s=60)
+        long_ago = datetime.utcnow() - timedelta(minutes=5)
+        store.jobs = {
+            'dead': {'job_id': 'dead', 'status': 'running', 'heartbeat_at': long_ago},
+            'lost': {'job_id': 'lost', 'status': 'queued', 'heartbeat_at': long_ago},
+            'done': {'job_id': 'done', 'status': 'succeeded', 'heartbeat_at': long_ago},
+            'live': {'job_id': 'live', 'status': 'running', 'heartbeat_at': datetime.utcnow()},
+        }
+
+        assert asyncio.run(runner.recover()) == 2
+        assert {job_id: job['status'] for job_id, job in store.jobs.items()} == {
+            'dead': 'failed', 'lost': 'failed', 'done': 'succeeded', 'live': 'running'}
+        assert 'stopped' in store.jobs['dead']['error']
+
+    def test_needs_a_worker(self):
+        """a runner without workers never runs a job"""
+        with pytest.raises(ValueError):
+            JobRunner(FakeStore(), fake_generate([]), workers=0)
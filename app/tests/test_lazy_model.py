@@ -0,0 +1,98 @@
+"""unit tests for lazy_model.py"""
+
+import threading
+
+import pytest
+from src.loaders.lazy_model import LazyModel, PENDING, LOADED, WARMING, READY, FAILED, EVICTED
+
+
+class DummyModel:
+    """stand-in for a heavy model"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def summarize(self, text):
+        """fake inference"""
+        self.calls += 1
+        return text.upper()
+
+
+class TestLazyModel:
+    """class holding test cases for LazyModel class"""
+
+    def test_loads_on_first_use(self):
+        """model must only be built when it is first used"""
+        built = []
+        handle = LazyModel('dummy', lambda: built.append(1) or DummyModel())
+
+        assert handle.state == PENDING and not built, "Model loaded at construction"
+        assert handle.summarize('abc') == 'ABC'
+        assert handle.state == READY and len(built) == 1
+
+    def test_concurrent_first_use_builds_once(self):
+        """concurrent first calls must share a single build"""
+        built = []
+        barrier = threading.Barrier(8)
+        handle = LazyModel('dummy', lambda: built.append(1) or DummyModel())
+
+        def use():
+            barrier.wait()
+            handle.summarize('x')
+
+        threads = [threading.Thread(target=use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(built) == 1, "Model built more than once"
+
+    def test_warm_up_runs_dummy_inference(self):
+        """warm-up must load the model and run one inference"""
+        handle = LazyModel('dummy', DummyModel, warm_up=lambda model: model.summarize('x'))
+        handle.warm_up()
+
+        status = handle.status()
+        assert status['state'] == READY and status['warm_up_seconds'] is not None
+        assert handle.get().calls == 1
+
+    def test_ready_only_after_warm_up(self):
+        """a loaded model must not report ready before its warm-up inference ran"""
+        states = []
+        handle = LazyModel('dummy', DummyModel,
+                           warm_up=lambda model: states.append(handle.state))
+        handle.get()
+        assert handle.state == LOADED, "Model reported ready before warm-up"
+
+        handle.warm_up()
+        assert states == [WARMING] and handle.state == READY
+
+    def test_failed_warm_up_is_reported(self):
+        """a failing warm-up must keep the model from reporting ready"""
+        def broken(model):
+            raise RuntimeError("bad kernel")
+
+        handle = LazyModel('dummy', DummyModel, warm_up=broken)
+        with pytest.raises(RuntimeError):
+            handle.warm_up()
+        assert handle.state == FAILED and handle.status()['error'] == "bad kernel"
+
+    def test_failed_load_is_reported(self):
+        """a failing factory must be reported and retried on next use"""
+        def broken():
+            raise OSError("weights missing")
+
+        handle = LazyModel('dummy', broken)
+        with pytest.raises(OSError):
+            handle.get()
+        assert handle.state == FAILED and handle.status()['error'] == "weights missing"
+
+    def test_unloaded_model_is_rebuilt(self):
+        """an unloaded model must be rebuilt on next use and counted as a reload"""
+        handle = LazyModel('dummy', DummyModel)
+        assert not handle.unload(), "Unloaded a model that was never built"
+        handle.summarize('x')
+
+        assert handle.unload() and handle.state == EVICTED and not handle.loaded
+        assert handle.summarize('abc') == 'ABC'
+        assert handle.status()['reloads'] == 1 and handle.status()['evictions'] == 1
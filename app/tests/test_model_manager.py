@@ -0,0 +1,84 @@
+"""unit tests for model_manager.py"""
+
+import pytest
+from src.loaders.lazy_model import LazyModel, EVICTED, READY
+from src.loaders.model_manager import ModelManager
+
+MB = 1024 * 1024
+
+
+class DummyModel:
+    """stand-in for a model occupying 100MB"""
+
+    size = 100 * MB
+
+    def summarize(self, text):
+        """fake inference"""
+        return text.upper()
+
+
+def make_manager(names, budget_mb):
+    """handles of DummyModel managed under a budget, with memory measured from what is loaded"""
+    handles = [LazyModel(name, DummyModel) for name in names]
+    manager = ModelManager(
+        handles, budget_mb * MB,
+        measure=lambda: sum(DummyModel.size for h in handles if h.loaded),
+        release=lambda: None)
+    return manager, handles
+
+
+class TestModelManager:
+    """class holding test cases for ModelManager class"""
+
+    def test_least_recently_used_model_is_evicted(self):
+        """loading past the budget must unload the model used longest ago"""
+        manager, (first, second, third) = make_manager(['a', 'b', 'c'], 250)
+        first.summarize('x')
+        second.summarize('x')
+        first.summarize('x')
+        third.summarize('x')
+
+        assert second.state == EVICTED, "LRU model was not evicted"
+        assert first.state == READY and third.state == READY
+        assert manager.used_bytes == 200 * MB and manager.stats()['evictions'] == 1
+
+    def test_evicted_model_reloads_on_demand(self):
+        """an evicted model must come back on its next use and its reload be recorded"""
+        manager, (first, second) = make_manager(['a', 'b'], 150)
+        first.summarize('x')
+        second.summarize('x')
+        assert first.summarize('abc') == 'ABC'
+
+        stats = manager.stats()['models']
+        assert stats['a']['reloads'] == 1 and stats['a']['evictions'] == 1
+        assert stats['b']['evictions'] == 1 and stats['a']['size_bytes'] == 100 * MB
+        assert manager.used_bytes <= 150 * MB
+
+    def test_known_size_is_evicted_before_loading(self):
+        """a reload must make room first instead of peaking above the budget"""
+        peaks = []
+        handles = [LazyModel(name, DummyModel) for name in ('a', 'b')]
+
+        def measure():
+            peaks.append(sum(DummyModel.size for h in handles if h.loaded))
+            return peaks[-1]
+
+        ModelManager(handles, 150 * MB, measure=measure, release=lambda: None)
+        for handle in handles:
+            handle.get()
+        peaks.clear()
+
+        handles[0].get()
+        assert handles[0].reloads == 1 and max(peaks) <= 150 * MB
+
+    def test_failed_load_does_not_block_others(self):
+        """a failing factory must not keep the next load waiting"""
+        def broken():
+            raise OSError("weights missing")
+
+        manager, (handle,) = make_manager(['a'], 150)
+        failing = LazyModel('broken', broken)
+        failing.manager = manager
+        with pytest.raises(OSError):
+            failing.get()
+        assert handle.summarize('abc') == 'ABC'
@@ -0,0 +1,116 @@
+"""unit tests for model_pool.py"""
+
+import os
+import threading
+import time
+
+import pytest
+from src.loaders.model_pool import ModelPool, parse_cpus, split_cpus
+
+
+class SlowModel:
+    """stand-in for a model whose inference takes a while"""
+
+    def __init__(self):
+        self.thread = None
+
+    def summarize(self, text):
+        """fake inference recording the thread it ran on"""
+        self.thread = threading.current_thread().name
+        time.sleep(0.05)
+        return text.upper()
+
+
+class RecordingThreads:
+    """thread count setter which records every call"""
+
+    def __init__(self):
+        self.counts = []
+
+    def __call__(self, count):
+        self.counts.append(count)
+
+
+def make_pool(replicas, **kwargs):
+    """pool of SlowModel replicas pinned to the CPUs this process may use"""
+    cpus = sorted(os.sched_getaffinity(0))
+    return ModelPool('dummy', SlowModel, replicas=replicas, cpus=cpus,
+                     set_threads=kwargs.pop('set_threads', RecordingThreads()), **kwargs)
+
+
+class TestCpuSlices:
+    """class holding test cases for CPU list helpers"""
+
+    @pytest.mark.parametrize('spec, result', [
+        ("0-3", [0, 1, 2, 3]),
+        ("0,2, 4-5", [0, 2, 4, 5]),
+        ("7", [7]),
+    ])
+    def test_parse_cpus(self, spec, result):
+        """CPU lists must accept ids and ranges
+
+        Args:
+            spec (str): test input
+            result (list(int)): test result
+        """
+        assert parse_cpus(spec) == result
+
+    def test_split_is_balanced(self):
+        """slices must cover every CPU once and differ in size by at most one"""
+        slices = split_cpus(range(10), 4)
+        assert [len(s) for s in slices] == [3, 3, 2, 2]
+        assert sum(slices, []) == list(range(10))
+
+    def test_split_wraps_with_few_cpus(self):
+        """more replicas than CPUs must still give every replica a CPU"""
+        assert split_cpus([0, 1], 3) == [[0], [1], [0]]
+
+
+class TestModelPool:
+    """class holding test cases for ModelPool class"""
+
+    def test_calls_run_concurrently_on_separate_replicas(self):
+        """concurrent callers must each get their own replica"""
+        pool = make_pool(2)
+        start = time.perf_counter()
+        threads = [threading.Thread(target=pool.summarize, args=('abc',)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert time.perf_counter() - start < 0.09, "Replicas ran one after the other"
+        assert {r.handle.get().thread for r in pool.replicas} == {'dummy[0]_0', 'dummy[1]_0'}
+        pool.shutdown()
+
+    def test_checkout_waits_for_checkin(self):
+        """a caller must wait while every replica is checked out"""
+        pool = make_pool(1)
+        with pool.checkout():
+            with pytest.raises(TimeoutError):
+                with pool.checkout(timeout=0.01):
+                    pass
+        assert pool.summarize('abc') == 'ABC'
+
+        stats = pool.stats()
+        assert stats['checkouts'] == 2 and stats['timeouts'] == 1 and stats['in_use'] == 0
+        assert 0 < stats['utilization'] <= 1
+        pool.shutdown()
+
+    def test_replica_threads_are_pinned(self):
+        """each replica thread must set its own thread count"""
+        set_threads = RecordingThreads()
+        pool = make_pool(1, set_threads=set_threads)
+        pool.summarize('abc')
+        assert set_threads.counts == [len(os.sched_getaffinity(0))]
+        pool.shutdown()
+
+    def test_warm_up_loads_every_replica(self):
+        """warm-up must build and warm every replica"""
+        pool = make_pool(2, warm_up=lambda model: model.summarize('x'))
+        assert pool.warm_up_seconds is None
+        pool.warm_up()
+
+        assert pool.loaded and pool.warm_up_seconds is not None
+        assert pool.status()['state'] == 'ready' and len(pool.status()['replicas']) == 2
+        pool.shutdown()
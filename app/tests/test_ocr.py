@@ -0,0 +1,122 @@
+"""unit tests for ocr.py"""
+
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image, ImageDraw
+from src.service import ocr
+from src.service.ocr import OcrService
+
+
+def encode(image, fmt='PNG', **kwargs):
+    """encode a PIL image to bytes"""
+    out = io.BytesIO()
+    image.save(out, fmt, **kwargs)
+    return out.getvalue()
+
+
+def text_like(size=(400, 300), ink=40, paper=220):
+    """gray image with dark strokes on light paper"""
+    image = Image.new('L', size, paper)
+    draw = ImageDraw.Draw(image)
+    for y in range(20, size[1] - 20, 30):
+        draw.rectangle([20, y, size[0] - 20, y + 8], fill=ink)
+    return image
+
+
+class TestNormalizeImage:
+    """class holding test cases for normalize_image function"""
+
+    def test_downscales_to_pixel_budget(self):
+        """a large photo must be shrunk to the budget, keeping its aspect ratio"""
+        image = ocr.normalize_image(text_like((4000, 3000)), max_pixels=1_000_000)
+        assert image.width * image.height <= 1_000_000
+        assert abs(image.width / image.height - 4 / 3) < 0.01
+
+    def test_small_image_keeps_its_size(self):
+        """an image under the budget must not be resized"""
+        assert ocr.normalize_image(text_like(), max_pixels=1_000_000).size == (400, 300)
+
+    def test_binarizes_between_ink_and_paper(self):
+        """output must be pure black and white, ink black and paper white"""
+        image = ocr.normalize_image(text_like(ink=90, paper=160).convert('RGB'))
+        assert image.mode == 'L'
+        assert set(image.getdata()) == {0, 255}
+        assert image.getpixel((30, 24)) == 0 and image.getpixel((5, 5)) == 255
+
+    @pytest.mark.parametrize('histogram, low, high', [
+        ([0] * 40 + [100] + [0] * 179 + [300] + [0] * 35, 40, 220),
+        ([10] * 256, 0, 255),
+    ])
+    def test_otsu_threshold(self, histogram, low, high):
+        """threshold must fall between the two classes
+
+        Args:
+            histogram (list(int)): test input
+            low (int): lowest valid threshold
+            high (int): highest valid threshold
+        """
+        assert low <= ocr.otsu_threshold(histogram) < high
+
+
+class TestIterFrames:
+    """class holding test cases for iter_frames function"""
+
+    def test_multipage_tiff(self):
+        """every page of a TIFF must be a frame"""
+        pages = [text_like(), text_like(ink=0), text_like(paper=255)]
+        data = encode(pages[0], 'TIFF', save_all=True, append_images=pages[1:])
+        with Image.open(io.BytesIO(data)) as image:
+            assert sum(1 for _ in ocr.iter_frames(image)) == 3
+
+
+class TestOcrService:
+    """class holding test cases for OcrService class"""
+
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        """run OCR on threads with a fake worker function recording its input"""
+        calls = []
+
+        def fake_ocr(data, lang, max_pixels, tesseract_cmd):
+            calls.append(data)
+            return f'text {len(calls)}', 1, 2.0, 0.5
+
+        monkeypatch.setattr(ocr, 'make_process_pool', ThreadPoolExecutor)
+        monkeypatch.setattr(ocr, 'ocr_image', fake_ocr)
+        return calls
+
+    def test_repeated_images_hit_the_cache(self, calls):
+        """an image OCRed before must not be OCRed again"""
+        service = OcrService(workers=2)
+        first, second = encode(text_like()), encode(text_like(ink=0))
+        texts = asyncio.run(service.recognize([first, second, first]))
+        texts += asyncio.run(service.recognize([second]))
+
+        assert texts[0] == texts[2] and texts[1] == texts[3]
+        assert len(calls) == 2
+        assert service.stats()['cache_hits'] == 2
+
+    def test_reports_seconds_per_megapixel(self, calls):
+        """stats must divide worker seconds by input megapixels"""
+        service = OcrService(workers=1)
+        asyncio.run(service.recognize([encode(text_like()), encode(text_like(ink=0))]))
+
+        stats = service.stats()
+        assert stats['images'] == 2 and stats['megapixels'] == 4.0
+        assert stats['seconds_per_megapixel'] == pytest.approx(0.25)
+
+    def test_cache_is_bounded(self, calls):
+        """the oldest result must be evicted past cache_items"""
+        service = OcrService(workers=1, cache_items=1)
+        first, second = encode(text_like()), encode(text_like(ink=0))
+        for data in (first, second, first):
+            asyncio.run(service.recognize([data]))
+        assert len(calls) == 3
+
+    def test_needs_a_worker(self):
+        """a pool without workers must be rejected"""
+        with pytest.raises(ValueError):
+            OcrService(workers=0)
@@ -0,0 +1,178 @@
+"""unit tests for pdf_extraction.py"""
+
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytesseract
+import pytest
+from PIL import Image
+from scripts.corpus import make_pdf
+from src.service import ocr as ocr_module, pdf_extraction
+from src.service.ocr import OcrService
+from src.service.pdf_extraction import PdfExtractor
+
+PAGES = [f'Page {i} talks about topic number {i}.' for i in range(9)] + ['']
+
+
+class FakeOcr:
+    """stand-in for OcrService counting calls"""
+
+    def __init__(self, delay=0, settings='fake'):
+        self.delay = delay
+        self.settings = settings
+        self.calls = 0
+
+    async def recognize(self, images, skip_unreadable=False):
+        """fake OCR: one numbered text per call"""
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        return [f'scanned {call}' for _ in images]
+
+
+def extract(extractor, data):
+    """run extractor.iter_pages over PDF bytes and return every page"""
+    async def run():
+        return [page async for page in extractor.iter_pages(io.BytesIO(data))]
+    return asyncio.run(run())
+
+
+def words(pages):
+    """whitespace-insensitive view of page texts"""
+    return [page.split() for page in pages]
+
+
+class TestPdfExtractor:
+    """class holding test cases for PdfExtractor class"""
+
+    @pytest.mark.parametrize('workers, pages_per_shard', [(0, 3), (2, 2)])
+    def test_pages_come_back_in_order(self, workers, pages_per_shard):
+        """shards extracted in parallel must be reassembled in page order
+
+        Args:
+            workers (int): pool size
+            pages_per_shard (int): shard size
+        """
+        extractor = PdfExtractor(workers=workers, pages_per_shard=pages_per_shard)
+        try:
+            assert words(extract(extractor, make_pdf(PAGES))) == words(PAGES)
+        finally:
+            extractor.shutdown()
+
+        stats = extractor.stats()
+        assert stats['pages'] == len(PAGES) and stats['documents'] == 1
+        assert stats['pages_per_second'] > 0
+
+    def test_reupload_skips_extraction(self, tmp_path, monkeypatch):
+        """a document already extracted must be served from the cache"""
+        extractor = PdfExtractor(workers=0, cache_dir=str(tmp_path))
+        data = make_pdf(PAGES)
+        first = extract(extractor, data)
+
+        def fail(*args):
+            raise AssertionError("extraction ran again")
+        monkeypatch.setattr(pdf_extraction, 'extract_shard', fail)
+
+        assert extract(extractor, data) == first
+        assert extractor.stats()['cache_hits'] == 1
+        assert not list(tmp_path.glob('*.tmp')), "Partial cache file left behind"
+
+    def test_enabling_ocr_misses_the_text_only_cache(self, tmp_path):
+        """pages cached empty without OCR must be OCRed once OCR is turned on"""
+        data = make_pdf(['Text page.', Image.new('L', (60, 40), 200)])
+        without_ocr = PdfExtractor(workers=0, cache_dir=str(tmp_path))
+        assert words(extract(without_ocr, data)) == [['Text', 'page.'], []]
+
+        ocr = FakeOcr()
+        with_ocr = PdfExtractor(workers=0, cache_dir=str(tmp_path), ocr=ocr, ocr_min_chars=5)
+        assert words(extract(with_ocr, data)) == [['Text', 'page.'], ['scanned', '1']]
+        assert ocr.calls == 1 and with_ocr.stats()['cache_hits'] == 0
+
+        # other OCR settings can recognize other text
+        ocr.settings = 'eng'
+        extract(with_ocr, data)
+        assert ocr.calls == 2
+
+    def test_cache_evicts_least_recently_used(self, tmp_path):
+        """documents must be evicted oldest use first once the cache passes its cap"""
+        documents = [make_pdf([f'Document {i} has its own text.']) for i in range(3)]
+        extractor = PdfExtractor(workers=0, cache_dir=str(tmp_path))
+        extract(extractor, documents[0])
+        extractor.cache_max_bytes = 2 * max(path.stat().st_size for path in tmp_path.iterdir())
+
+        extract(extractor, documents[1])
+        time.sleep(0.01)
+        extract(extractor, documents[0])   # renews document 0
+        time.sleep(0.01)
+        extract(extractor, documents[2])   # evicts document 1
+
+        assert len(list(tmp_path.iterdir())) == 2
+        assert extractor.stats()['cache_evictions'] == 1
+        hits = extractor.stats()['cache_hits']
+        extract(extractor, documents[0])
+        assert extractor.stats()['cache_hits'] == hits + 1, "Recently used document evicted"
+
+    def test_failed_extraction_is_not_cached(self, tmp_path):
+        """a broken file must raise and leave no cache entry"""
+        extractor = PdfExtractor(workers=0, cache_dir=str(tmp_path))
+        with pytest.raises(Exception):
+            extract(extractor, b'%PDF-1.4 not really a pdf')
+        assert not list(tmp_path.iterdir())
+
+    def test_scanned_pages_are_ocred_in_place(self):
+        """scanned pages must get OCR text at their own position, text pages must not be OCRed"""
+        ocr = FakeOcr()
+        extractor = PdfExtractor(workers=0, pages_per_shard=3, ocr=ocr, ocr_min_chars=5)
+        scan = Image.new('L', (60, 40), 200)
+        pages = extract(extractor, make_pdf(['Text page.', scan, 'Pg 3', 'More text here.']))
+
+        assert words(pages) == words(['Text page.', 'scanned 1', 'Pg 3', 'More text here.'])
+        assert ocr.calls == 1, "Only the page with an image can be OCRed"
+        assert extractor.stats()['ocr_pages'] == 1
+
+    def test_ocr_overlaps_extraction(self):
+        """OCR of an early page must not wait for the consumer to reach it"""
+        extractor = PdfExtractor(workers=0, pages_per_shard=1, ocr=FakeOcr(delay=0.2))
+        scan = Image.new('L', (60, 40), 200)
+
+        start = time.perf_counter()
+        pages = extract(extractor, make_pdf([scan] * 4))
+        assert sorted(pages) == [f'scanned {i}' for i in range(1, 5)]
+        # sequential OCR would take 0.8s
+        assert time.perf_counter() - start < 0.6
+
+    @pytest.fixture
+    def real_ocr(self, monkeypatch):
+        """OcrService decoding images for real on threads, with a fake tesseract"""
+        monkeypatch.setattr(ocr_module, 'make_process_pool', ThreadPoolExecutor)
+        monkeypatch.setattr(pytesseract, 'image_to_string', lambda image, lang: 'recognized')
+        return OcrService(workers=1)
+
+    def test_undecodable_image_is_skipped(self, real_ocr, monkeypatch):
+        """one image that cannot be decoded must leave its page empty, not fail the PDF"""
+        png = io.BytesIO()
+        Image.new('L', (60, 40), 200).save(png, 'PNG')
+        monkeypatch.setattr(pdf_extraction, 'extract_pdf_page_images', lambda path, indices: {
+            0: [png.getvalue()], 1: [b'not an image'], 2: [png.getvalue()]})
+        extractor = PdfExtractor(workers=0, pages_per_shard=3, ocr=real_ocr, ocr_min_chars=5)
+
+        pages = extract(extractor, make_pdf(['', '', '', 'Text page.']))
+        assert words(pages) == [['recognized'], [], ['recognized'], ['Text', 'page.']]
+        assert real_ocr.stats()['skipped'] == 1
+
+    def test_missing_tesseract_fails_the_pdf(self, real_ocr, monkeypatch):
+        """without a tesseract binary, scanned pages must not silently come back empty"""
+        def missing(image, lang):
+            raise pytesseract.TesseractNotFoundError()
+
+        monkeypatch.setattr(pytesseract, 'image_to_string', missing)
+        extractor = PdfExtractor(workers=0, ocr=real_ocr, ocr_min_chars=5)
+        with pytest.raises(pytesseract.TesseractNotFoundError):
+            extract(extractor, make_pdf([Image.new('L', (60, 40), 200)]))
+
+    def test_bad_shard_size(self):
+        """a shard must hold at least one page"""
+        with pytest.raises(ValueError):
+            PdfExtractor(pages_per_shard=0)
@@ -0,0 +1,295 @@
+"""unit tests for pipeline.py"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from src.inferencehandler.pipeline import (
+    Pipeline, Stage, isolate_errors, question_pipeline, stream_chunks, translate_within_budget)
+from src.inferenceserver.service import InferenceService
+
+
+def sleeping_stage(name, seconds, workers=1):
+    """fake stage sleeping for a while and appending its name to the item"""
+    async def run(item):
+        await asyncio.sleep(seconds)
+        return item + [name]
+    return Stage(name, run, workers)
+
+
+class FakeInference:
+    """stand-in for InferenceService with instant fake stages"""
+
+    async def summarize(self, contexts, profile=None):
+        """fake summarizer"""
+        return [f's({context})' for context in contexts]
+
+    async def extract_keywords(self, original_list, summarized_list):
+        """fake keyword extractor: every word of the chunk"""
+        return [original.split() for original in original_list]
+
+    async def generate_false_answers(self, filtered_kws):
+        """fake distractors: drop keywords starting with 'x'"""
+        answers = [kw for kws in filtered_kws for kw in kws if not kw.startswith('x')]
+        return answers, [[answer, 'd1', 'd2', 'd3'] for answer in answers]
+
+    async def generate_questions(self, pairs, profile=None):
+        """fake question generator"""
+        return [f'{answer} in {context}?' for context, answer in pairs]
+
+
+class BlockingModels:
+    """stand-in for the four models, blocking their thread like real inference"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.active = set()
+        self.max_overlap = 0
+        self._lock = threading.Lock()
+
+    def run(self, stage, output):
+        """hold a thread for a while, recording which stages run at once"""
+        with self._lock:
+            self.active.add(stage)
+            self.max_overlap = max(self.max_overlap, len(self.active))
+        time.sleep(self.seconds)
+        with self._lock:
+            self.active.discard(stage)
+        return output
+
+    def summarize_batch(self, contexts, profile=None):
+        """fake summarizer"""
+        return self.run('summarize', list(contexts))
+
+    def get_keywords(self, original_list, summarized_list):
+        """fake keyword extractor"""
+        return self.run('keywords', [original.split() for original in original_list])
+
+    def get_output(self, filtered_kws):
+        """fake distractor generator"""
+        answers = [kw for kws in filtered_kws for kw in kws]
+        return self.run('distractors', (answers, [[answer] * 4 for answer in answers]))
+
+    def generate_batch(self, contexts, answers, profile=None):
+        """fake question generator"""
+        return self.run('questions', [f'{answer}?' for answer in answers])
+
+
+
+class TestPipeline:
+    """class holding test cases for Pipeline class"""
+
+    def test_outputs_keep_input_order(self):
+        """every item must pass every stage and come back in input order"""
+        pipeline = Pipeline([sleeping_stage('a', 0, workers=3), sleeping_stage('b', 0)])
+        outputs = asyncio.run(pipeline.run([[i] for i in range(10)]))
+
+        assert outputs == [[i, 'a', 'b'] for i in range(10)]
+        assert pipeline.stats()['a']['items'] == 10 and pipeline.stats()['b']['items'] == 10
+
+    def test_stages_overlap(self):
+        """latency must approach the slowest stage, not the sum of stages"""
+        stages = [sleeping_stage(name, 0.02) for name in ('a', 'b', 'c', 'd')]
+        start = time.perf_counter()
+        asyncio.run(Pipeline(stages).run([[i] for i in range(8)]))
+
+        # sequential: 8 items * 4 stages * 20ms = 640ms; pipelined: (8 + 3) * 20ms = 220ms
+        assert time.perf_counter() - start < 0.4
+
+    def test_queues_are_bounded(self):
+        """a fast stage must not run further ahead of a slow one than the queue allows"""
+        ahead = []
+
+        async def fast(item):
+            ahead.append((ahead[-1] if ahead else 0) + 1)
+            return item
+
+        async def slow(item):
+            ahead.append(ahead[-1] - 1)
+            await asyncio.sleep(0.01)
+            return item
+
+        pipeline = Pipeline([Stage('fast', fast), Stage('slow', slow)], max_queue_size=2)
+        asyncio.run(pipeline.run(list(range(10))))
+
+        # queued items, plus one in the hands of slow and one fast is trying to put
+        assert max(ahead) <= 2 + 2
+        assert pipeline.stats()['slow']['max_queue_depth'] <= 2
+
+    def test_stage_error_stops_pipeline(self):
+        """a failing stage must fail the run"""
+        async def broken(item):
+            raise RuntimeError("model crashed")
+
+        pipeline = Pipeline([sleeping_stage('a', 0), Stage('b', broken)])
+        with pytest.raises(RuntimeError, match="model crashed"):
+            asyncio.run(pipeline.run([[1], [2]]))
+
+    def test_isolated_error_fails_only_its_item(self):
+        """with isolate_errors a failing item must be marked and skip later stages"""
+        async def broken(item):
+            if item['n'] == 1:
+                raise RuntimeError("model crashed")
+            return dict(item, b=True)
+
+        async def after(item):
+            return dict(item, c=True)
+
+        pipeline = Pipeline(isolate_errors([Stage('b', broken), Stage('c', after)]))
+        outputs = asyncio.run(pipeline.run([{'n': n} for n in range(3)]))
+
+        assert outputs[1] == {'n': 1, 'error': 'model crashed'}
+        assert outputs[0] == outputs[2] | {'n': 0} == {'n': 0, 'b': True, 'c': True}
+
+    def test_stream_yields_before_input_ends(self):
+        """the first output must arrive while later items are not yet produced"""
+        produced = []
+
+        async def items():
+            for i in range(100):
+                produced.append(i)
+                yield [i]
+
+        async def first_output():
+            pipeline = Pipeline([sleeping_stage('a', 0)], max_queue_size=2)
+            async for output in pipeline.stream(items()):
+                return output, len(produced)
+
+        output, pulled = asyncio.run(first_output())
+        assert output == [0, 'a']
+        assert pulled < 10, "Input read far ahead of the stages"
+
+
+class TestQuestionPipeline:
+    """class holding test cases for question_pipeline function"""
+
+    def test_questions_pair_answers_with_their_chunk(self):
+        """each answer must get a question against its own chunk's summary"""
+        chunks = asyncio.run(question_pipeline(FakeInference()).run(['cat xdog', 'sun']))
+
+        assert [chunk['crct_ans'] for chunk in chunks] == [['cat'], ['sun']]
+        assert chunks[0]['questions'] == ['cat in s(cat xdog)?']
+        assert chunks[1]['questions'] == ['sun in s(sun)?']
+
+    def test_dict_chunks_keep_their_keys(self):
+        """provenance carried on a chunk dict must come out with its questions"""
+        (chunk,) = asyncio.run(question_pipeline(FakeInference()).run(
+            [{'chunk': 'sun', 'sentences': ['Mặt trời.']}]))
+        assert chunk['sentences'] == ['Mặt trời.'] and chunk['questions'] == ['sun in s(sun)?']
+
+    def test_model_stages_overlap_with_default_settings(self, monkeypatch):
+        """on the inference executor, different chunks must be in different stages at once"""
+        models = BlockingModels(0.05)
+        for name in ('summarizer', 'keyword_extractor', 'false_ans_gen', 'question_gen'):
+            monkeypatch.setattr(f'src.loaders.{name}', models)
+
+        start = time.perf_counter()
+        chunks = asyncio.run(question_pipeline(InferenceService()).run(
+            [f'word{i}' for i in range(6)]))
+
+        assert [chunk['questions'] for chunk in chunks] == [[f'word{i}?'] for i in range(6)]
+        assert models.max_overlap >= 3, "Stages ran one after another"
+        # sequential: 6 chunks * 4 stages * 50ms = 1.2s; pipelined: (6 + 3) * 50ms = 450ms
+        assert time.perf_counter() - start < 0.9
+
+    def test_chunk_without_answers_skips_question_generation(self):
+        """a chunk whose keywords all fail must produce no questions"""
+        (chunk,) = asyncio.run(question_pipeline(FakeInference()).run(['xa xb']))
+        assert chunk['questions'] == [] and chunk['all_answers'] == []
+
+
+class TestTranslateWithinBudget:
+    """class holding test cases for translate_within_budget function"""
+
+    class BudgetInference:
+        """stand-in for the summarizer chunker with a budget of 6 words"""
+
+        async def split_context(self, context):
+            """fake token-aware chunker"""
+            words = context.split()
+            return [' '.join(words[i:i + 6]) for i in range(0, len(words), 6)]
+
+    @staticmethod
+    async def translate(text):
+        """fake translation doubling the word count, as longer English text would"""
+        return ' '.join(f'{word} en' for word in text.split())
+
+    def fit(self, sentences):
+        """translate a chunk of sentences starting at sentence 10"""
+        chunk = {'chunk': ' '.join(sentences), 'sentences': sentences, 'first': 10}
+        return asyncio.run(translate_within_budget(self.BudgetInference(), self.translate, chunk))
+
+    def test_chunk_that_fits_is_translated_once(self):
+        """a translation within budget must stay one part"""
+        (part,) = self.fit(['Một hai.', 'Ba.'])
+        assert part == {'chunk': 'Một en hai. en Ba. en', 'sentences': ['Một hai.', 'Ba.'],
+                        'first': 10}
+
+    def test_long_translation_is_split_between_sentences(self):
+        """a translation over budget must be re-split, each part naming its own sentences"""
+        sentences = ['Một hai.', 'Ba bốn.', 'Năm.', 'Sáu bảy.']
+        parts = self.fit(sentences)
+
+        assert all(len(part['chunk'].split()) <= 6 for part in parts), "Part over budget"
+        assert [part['sentences'] for part in parts] == [['Một hai.'], ['Ba bốn.'],
+                                                         ['Năm.', 'Sáu bảy.']]
+        assert [part['first'] for part in parts] == [10, 11, 12]
+
+    def test_long_sentence_is_cut_by_the_chunker(self):
+        """a single sentence over budget must be cut, not truncated"""
+        parts = self.fit(['một hai ba bốn năm'])
+        assert [part['chunk'] for part in parts] == ['một en hai en ba en', 'bốn en năm en']
+        assert all(part['sentences'] == ['một hai ba bốn năm'] for part in parts)
+
+
+class TestStreamChunks:
+    """class holding test cases for stream_chunks function"""
+
+    @staticmethod
+    async def pages(texts):
+        """async iterable of page texts"""
+        for text in texts:
+            yield text
+
+    def collect(self, texts, max_words):
+        """run stream_chunks over pages and return every chunk"""
+        async def run():
+            return [chunk async for chunk in stream_chunks(self.pages(texts), max_words)]
+        return asyncio.run(run())
+
+    def test_sentence_across_pages_stays_whole(self):
+        """a sentence cut by a page break must come out whole"""
+        chunks = self.collect(['First one. Second', 'half of it. Third.'], max_words=4)
+        assert [chunk['sentences'] for chunk in chunks] == [
+            ['First one.'], ['Second half of it.'], ['Third.']]
+
+    def test_sentences_are_packed_up_to_the_budget(self):
+        """a 100-sentence paragraph must take a few chunks, not 100"""
+        sentences = [f'Câu số {i} nói về lịch sử Việt Nam.' for i in range(100)]
+        chunks = self.collect([' '.join(sentences)], max_words=150)
+
+        # 9 words a sentence, 16 sentences a chunk
+        assert len(chunks) == 7
+        assert all(len(chunk['chunk'].split()) <= 150 for chunk in chunks)
+        assert [s for chunk in chunks for s in chunk['sentences']] == sentences, \
+            "Sentences must be kept as written, diacritics included"
+
+    def test_vietnamese_pages_are_not_filtered(self):
+        """pages must be chunked as written, before translation, diacritics included"""
+        chunks = self.collect(['Đây là trang một. Câu này tiếp', 'tục ở trang hai…'],
+                              max_words=20)
+        assert [chunk['chunk'] for chunk in chunks] == [
+            'Đây là trang một. Câu này tiếp tục ở trang hai…']
+
+    def test_provenance_indexes_sentences(self):
+        """each chunk must name the position of its first sentence in the document"""
+        texts = [f'Page {i} starts here. Page {i} ends here.' for i in range(5)]
+        chunks = self.collect(texts, max_words=8)
+        assert [chunk['first'] for chunk in chunks] == [0, 2, 4, 6, 8]
+        assert ' '.join(chunk['chunk'] for chunk in chunks).split() == ' '.join(texts).split()
+
+    def test_long_sentence_is_cut_between_words(self):
+        """text without punctuation, e.g. OCR output, must still fit the budget"""
+        chunks = self.collect([' '.join(['từ'] * 25)], max_words=10)
+        assert [len(chunk['chunk'].split()) for chunk in chunks] == [10, 10, 5]
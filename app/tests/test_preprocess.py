@@ -93,6 +93,112 @@ class TestSplitText:
         assert preprocess.split_text(
             text, 25)[0] == result[0], "Need to split after period."
 
+    def test_remainder_is_kept(self):
+        """text after the last split must end up in the final chunk"""
+        text = "First sentence is here. Second one follows. Tail without a stop"
+        assert preprocess.split_text(text, 10) == [
+            "First sentence is here.", "Second one follows.", "Tail without a stop"]
+
+    def test_repeated_text_is_not_deleted(self):
+        """a chunk repeated later in the document must appear every time"""
+        text = "Same words again. " * 6
+        assert preprocess.split_text(text, 16) == ["Same words again."] * 6
+
+
+class TestSplitSentences:
+    """class holding test cases for split_sentences and ends_sentence functions"""
+
+    @pytest.mark.parametrize('text, result', [
+        ("Hà Nội là thủ đô. Nó có nhiều hồ!", ["Hà Nội là thủ đô.", "Nó có nhiều hồ!"]),
+        ("Ông nói: “Đi thôi.” Rồi   ông\nđi…  Xong?", ["Ông nói: “Đi thôi.”", "Rồi ông đi…",
+                                                     "Xong?"]),
+        ("Giá là 3.5 triệu đồng", ["Giá là 3.5 triệu đồng"]),
+        ("", []),
+    ])
+    def test_sentences_are_kept_as_written(self, text, result):
+        """sentences must keep their diacritics and punctuation, split only at terminators
+
+        Args:
+            text (str): test input
+            result (list(str)): test result
+        """
+        assert preprocess.split_sentences(text) == result
+
+    @pytest.mark.parametrize('text, result', [
+        ("Câu đã xong.", True), ("Câu đã xong.”", True), ("Còn tiếp…", True),
+        ("Câu chưa xong", False), ("Giá 3.5", False),
+    ])
+    def test_ends_sentence(self, text, result):
+        """a page ending mid-sentence must be told apart from one ending a sentence
+
+        Args:
+            text (str): test input
+            result (bool): test result
+        """
+        assert preprocess.ends_sentence(text) == result
+
+
+class TestIterChunks:
+    """class holding test cases for iter_chunks function"""
+
+    @staticmethod
+    def count_with_prefix(texts):
+        """fake tokenizer: one token per word plus a prompt token and an EOS token"""
+        return [len(text.split()) + 2 for text in texts]
+
+    def test_packs_whole_sentences_up_to_budget(self):
+        """chunks must hold whole sentences and never exceed the budget"""
+        text = "One two three. Four five. Six seven eight nine. Ten."
+        chunks = list(preprocess.iter_chunks(text, max_tokens=7,
+                                             count_tokens=self.count_with_prefix))
+
+        assert chunks == ["One two three. Four five.", "Six seven eight nine. Ten."]
+        assert max(self.count_with_prefix(chunks)) <= 7
+
+    def test_long_sentence_is_cut_between_words(self):
+        """a sentence over the budget must be cut, not truncated by the model"""
+        text = "a b c d e f g h. Short one."
+        chunks = list(preprocess.iter_chunks(text, max_tokens=3))
+        assert chunks == ["a b c", "d e f", "g h.", "Short one."]
+
+    def test_overlap_repeats_trailing_sentences(self):
+        """the tail of a chunk within the overlap must start the next chunk"""
+        text = "A b. C d. E f. G h."
+        chunks = list(preprocess.iter_chunks(text, max_tokens=6, overlap=2))
+        assert chunks == ["A b. C d. E f.", "E f. G h."]
+
+    @pytest.mark.parametrize('text', ["", "   ", "!!!"])
+    def test_empty_text_yields_nothing(self, text):
+        """text without words must not produce empty chunks
+
+        Args:
+            text (str): test input
+        """
+        assert not list(preprocess.iter_chunks(text))
+
+    def test_no_text_is_lost(self):
+        """every word must appear in the chunks, in order"""
+        text = " ".join(f"Sentence {i} has 3.5 words." for i in range(500))
+        chunks = preprocess.iter_chunks(text, max_tokens=37)
+        assert " ".join(chunks).split() == preprocess.filter_text(text).split()
+
+    def test_is_a_generator(self):
+        """chunks must be produced lazily"""
+        chunks = preprocess.iter_chunks("One. Two.", max_tokens=1)
+        assert next(chunks) == "One."
+
+    @pytest.mark.parametrize('max_tokens, overlap', [(2, 0), (5, 3), (6, -1)])
+    def test_bad_budget(self, max_tokens, overlap):
+        """a budget without room for text or overlap must raise ValueError
+
+        Args:
+            max_tokens (int): test budget
+            overlap (int): test overlap
+        """
+        with pytest.raises(ValueError):
+            next(preprocess.iter_chunks("Some text.", max_tokens, self.count_with_prefix,
+                                        overlap))
+
 
 @pytest.mark.parametrize('query, result', [
     ([('bat|NOUN', 0.0), ('Karthick|PRONOUN', 0.0)], ['Bat', 'Karthick']),
@@ -0,0 +1,191 @@
+"""unit tests for uploads.py"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.service import ocr, uploads
+from src.service.ocr import OcrService
+from src.service.uploads import UploadLimitMiddleware, UploadQuota, UploadTooLarge
+
+MB = 2**20
+
+
+def spooled_upload(nbytes):
+    """spooled file the way Starlette holds an upload, rolled over to disk"""
+    upload = tempfile.SpooledTemporaryFile(max_size=MB)
+    block = os.urandom(MB)
+    for _ in range(nbytes // MB):
+        upload.write(block)
+    upload.seek(0)
+    return upload
+
+
+def call(middleware, headers, client=('10.0.0.1', 5000)):
+    """send one request through a middleware; return status, whether the body was read, messages"""
+    scope = {'type': 'http', 'client': client,
+             'headers': [(name.encode(), value.encode()) for name, value in headers.items()]}
+    read, messages = [], []
+
+    async def receive():
+        read.append(True)
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    status = next(m['status'] for m in messages if m['type'] == 'http.response.start')
+    return status, bool(read), messages
+
+
+def upload_headers(nbytes, content_type='multipart/form-data; boundary=x'):
+    """headers of a multipart request of nbytes"""
+    return {'content-type': content_type, 'content-length': str(nbytes)}
+
+
+async def echo_app(scope, receive, send):
+    """ASGI app reading the body and answering 200"""
+    await receive()
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+class TestUploadQuota:
+    """class holding test cases for UploadQuota class"""
+
+    @pytest.mark.parametrize('held, nbytes', [
+        ([], 11),              # over the per-request cap
+        ([('a', 10)], 10),     # over the per-user cap
+        ([('b', 10), ('c', 10)], 10),  # over the global cap
+    ])
+    def test_rejects_over_cap(self, held, nbytes):
+        """an upload over any cap must be rejected and reserve nothing
+
+        Args:
+            held (list(tuple(str, int))): uploads already in flight
+            nbytes (int): size of the new upload of user 'a'
+        """
+        quota = UploadQuota(max_bytes=10, user_max_bytes=15, total_max_bytes=25)
+        for user, size in held:
+            quota.reserve(user, size)
+        with pytest.raises(UploadTooLarge):
+            quota.reserve('a', nbytes)
+        assert quota.stats()['bytes_in_flight'] == sum(size for _, size in held)
+        assert quota.stats()['rejected'] == 1
+
+    def test_release_frees_the_reservation(self):
+        """bytes of a finished upload must be available again"""
+        quota = UploadQuota(max_bytes=10, user_max_bytes=10, total_max_bytes=10)
+        quota.reserve('a', 10)
+        quota.release('a', 10)
+        quota.reserve('b', 10)
+        assert quota.stats()['users'] == 1 and quota.stats()['peak_bytes'] == 10
+
+    def test_is_a_value_error(self):
+        """routes map ValueError to a client error"""
+        assert issubclass(UploadTooLarge, ValueError)
+
+
+class TestUploadLimitMiddleware:
+    """class holding test cases for UploadLimitMiddleware class"""
+
+    def test_oversized_upload_is_rejected_before_reading(self):
+        """a request over the cap must get 413 without its body being read"""
+        middleware = UploadLimitMiddleware(echo_app, UploadQuota(max_bytes=10 * MB))
+        status, read, messages = call(middleware, upload_headers(11 * MB))
+
+        assert status == 413 and not read
+        assert json.loads(messages[-1]['body']) == {'detail': 'file.too_large'}
+
+    def test_chunked_upload_needs_a_length(self):
+        """a multipart request without Content-Length cannot be reserved"""
+        middleware = UploadLimitMiddleware(echo_app, UploadQuota())
+        status, read, _ = call(middleware, {'content-type': 'multipart/form-data; boundary=x'})
+        assert status == 411 and not read
+
+    def test_other_requests_pass_through(self):
+        """JSON bodies must not count against the upload quota"""
+        quota = UploadQuota(max_bytes=1)
+        status, read, _ = call(UploadLimitMiddleware(echo_app, quota),
+                               upload_headers(100, 'application/json'))
+        assert status == 200 and read
+        assert quota.stats()['accepted'] == 0
+
+    def test_reservation_is_held_until_the_response(self):
+        """the bytes of an upload must stay reserved while the app handles it"""
+        quota = UploadQuota(max_bytes=10 * MB, user_max_bytes=15 * MB)
+        inner = []
+
+        async def app(scope, receive, send):
+            inner.append(quota.stats()['bytes_in_flight'])
+            with pytest.raises(UploadTooLarge):
+                quota.reserve('10.0.0.1', 10 * MB)
+            await echo_app(scope, receive, send)
+
+        assert call(UploadLimitMiddleware(app, quota), upload_headers(10 * MB))[0] == 200
+        assert inner == [10 * MB]
+        assert quota.stats()['bytes_in_flight'] == 0
+
+    def test_reservation_is_released_on_errors(self):
+        """a failing handler must not leak its reservation"""
+        quota = UploadQuota()
+
+        async def app(scope, receive, send):
+            raise RuntimeError("handler failed")
+
+        with pytest.raises(RuntimeError):
+            call(UploadLimitMiddleware(app, quota), upload_headers(MB))
+        assert quota.stats()['bytes_in_flight'] == 0
+
+    def test_users_have_separate_caps(self):
+        """the per-user cap must be keyed by the identify function"""
+        quota = UploadQuota(max_bytes=10, user_max_bytes=10, total_max_bytes=100)
+        quota.reserve('10.0.0.1', 10)
+        middleware = UploadLimitMiddleware(echo_app, quota)
+        assert call(middleware, upload_headers(10))[0] == 413
+        assert call(middleware, upload_headers(10), client=('10.0.0.2', 5000))[0] == 200
+
+
+class TestUploadMemory:
+    """class holding test cases measuring memory used per upload"""
+
+    @pytest.fixture
+    def sources(self, monkeypatch):
+        """run OCR on threads with a fake worker function recording its input"""
+        sources = []
+
+        def fake_ocr(source, lang, max_pixels, tesseract_cmd):
+            sources.append(source)
+            return 'text', 1, 1.0, 0.1
+
+        monkeypatch.setattr(ocr, 'make_process_pool', ThreadPoolExecutor)
+        monkeypatch.setattr(ocr, 'ocr_image', fake_ocr)
+        return sources
+
+    def test_spooled_image_is_not_copied_into_memory(self, sources):
+        """OCR of a 32MB upload must allocate a few blocks, not the image"""
+        upload = spooled_upload(32 * MB)
+        service = OcrService(workers=1)
+
+        tracemalloc.start()
+        try:
+            asyncio.run(service.recognize([upload]))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < 4 * MB, f"Peak Python memory for a 32MB upload: {peak / MB:.1f}MB"
+        assert isinstance(sources[0], str), "Workers must get a path, not the bytes"
+        assert not os.path.exists(sources[0]), "Worker copy left behind"
+
+    def test_hash_matches_in_memory_digest(self):
+        """block-wise hashing must give the digest of the whole file"""
+        upload = spooled_upload(3 * MB)
+        data = upload.read()
+        assert uploads.hash_file(upload) == hashlib.sha256(data).hexdigest()